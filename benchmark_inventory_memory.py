@@ -0,0 +1,93 @@
+#!/usr/bin/env python
+"""Benchmark memory used by normal and compact inventories.
+
+Builds a synthetic inventory with the given number of files and versions,
+where each version adds new files and changes some existing files so that
+there are many repeated logical paths across versions. Reports the memory
+allocated for the normal dict based ocfl.Inventory and for the compact form
+from ocfl.Inventory.compact(), measured with tracemalloc.
+
+Typical usage:
+> ./benchmark_inventory_memory.py --files 100000 --versions 20
+"""
+import argparse
+import gc
+import hashlib
+import time
+import tracemalloc
+
+import ocfl
+
+
+def synthetic_inventory_data(num_files, num_versions, digest_algorithm="sha512"):
+    """Inventory data with num_files in the first version then num_versions.
+
+    Each later version changes 1% of the existing files and adds 1% more new
+    files.
+    """
+    manifest = {}
+    versions = {}
+    state = {}  # logical_path -> digest
+    next_file = 0
+    for vnum in range(1, num_versions + 1):
+        vdir = "v%d" % vnum
+        if vnum == 1:
+            new_files, changed_files = num_files, 0
+        else:
+            new_files = changed_files = max(1, num_files // 100)
+        paths = ["dir%03d/subdir%02d/file%08d.dat" % (n % 1000, n % 17, n)
+                 for n in range(next_file, next_file + new_files)]
+        next_file += new_files
+        paths += list(state.keys())[:changed_files]
+        for logical_path in paths:
+            digest = hashlib.new(digest_algorithm, (vdir + logical_path).encode("utf-8")).hexdigest()
+            manifest[digest] = [vdir + "/content/" + logical_path]
+            state[logical_path] = digest
+        version_state = {}
+        for logical_path, digest in state.items():
+            version_state.setdefault(digest, []).append(logical_path)
+        versions[vdir] = {"created": "2026-01-01T00:00:00Z",
+                          "message": "Version %d" % vnum,
+                          "user": {"name": "A Person", "address": "mailto:a@example.org"},
+                          "state": version_state}
+    return {"id": "info:synthetic",
+            "type": "https://ocfl.io/1.1/spec/#inventory",
+            "digestAlgorithm": digest_algorithm,
+            "head": "v%d" % num_versions,
+            "manifest": manifest,
+            "versions": versions}
+
+
+def measure(func):
+    """Run func and return (result, bytes allocated and kept)."""
+    gc.collect()
+    tracemalloc.start()
+    result = func()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, size
+
+
+def main():
+    """Run benchmark with command line arguments."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n", maxsplit=1)[0])
+    parser.add_argument("--files", type=int, default=100000,
+                        help="number of files in the first version")
+    parser.add_argument("--versions", type=int, default=10,
+                        help="number of versions")
+    args = parser.parse_args()
+    inv, inv_size = measure(lambda: ocfl.Inventory(synthetic_inventory_data(args.files, args.versions)))
+    print("Inventory with %d manifest entries and %d state entries in %d versions"
+          % (len(inv.manifest), sum(len(v.state) for v in inv.versions()), args.versions))
+    print("Normal:  %8.1f MB" % (inv_size / 1e6))
+    compact_inv, compact_size = measure(inv.compact)
+    start = time.perf_counter()
+    inv.compact()
+    seconds = time.perf_counter() - start
+    print("Compact: %8.1f MB (%.1f%% of normal, built in %.2fs)"
+          % (compact_size / 1e6, 100.0 * compact_size / inv_size, seconds))
+    assert sorted(compact_inv.version(inv.head).logical_paths) == sorted(inv.version(inv.head).logical_paths)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+#!/usr/bin/env python
+"""Benchmark the CPU time taken by ocfl.InventoryValidator.
+
+Uses synthetic inventories from benchmark_inventory_memory.py, with the
+given number of files in the first version and then the given number of
+versions, each of which changes and adds files. Reports the time for
+complete validation of the inventory, and for the main per-path and
+per-version checks separately so that the hot loops can be compared.
+
+Typical usage:
+> ./benchmark_inventory_validator.py --files 100000 --versions 10 --repeat 3
+"""
+import argparse
+import time
+
+import ocfl
+from ocfl.validation_logger import ValidationLogger
+
+from benchmark_inventory_memory import synthetic_inventory_data
+
+
+def best_time(func, repeat):
+    """Best wall clock time in seconds for func over repeat runs."""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        seconds = time.perf_counter() - start
+        if best is None or seconds < best:
+            best = seconds
+    return best
+
+
+def new_validator():
+    """Create an InventoryValidator with a quiet logger."""
+    return ocfl.InventoryValidator(log=ValidationLogger(log_warnings=True))
+
+
+def main():
+    """Run benchmark with command line arguments."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n", maxsplit=1)[0])
+    parser.add_argument("--files", type=int, default=100000,
+                        help="number of files in the first version")
+    parser.add_argument("--versions", type=int, default=10,
+                        help="number of versions")
+    parser.add_argument("--repeat", type=int, default=3,
+                        help="number of runs of each benchmark, the best is reported")
+    args = parser.parse_args()
+    data = synthetic_inventory_data(args.files, args.versions)
+    manifest = data["manifest"]
+    head_state = data["versions"][data["head"]]["state"]
+    content_paths = [p for paths in manifest.values() for p in paths]
+    logical_paths = [p for paths in head_state.values() for p in paths]
+    print("Inventory with %d manifest entries and %d state entries in %d versions"
+          % (len(content_paths), sum(sum(len(p) for p in v["state"].values()) for v in data["versions"].values()), args.versions))
+
+    def validate():
+        validator = new_validator()
+        assert validator.validate(data), str(validator.log)
+
+    def check_content_paths():
+        validator = new_validator()
+        seen_paths, seen_dirs = set(), set()
+        for path in content_paths:
+            validator._check_content_path(path, seen_paths, seen_dirs)  # pylint: disable=protected-access
+
+    def check_logical_paths():
+        validator = new_validator()
+        seen_paths, seen_dirs = set(), set()
+        for path in logical_paths:
+            validator._check_logical_path(path, "v1", seen_paths, seen_dirs)  # pylint: disable=protected-access
+
+    def validate_manifest():
+        new_validator()._validate_manifest(manifest)  # pylint: disable=protected-access
+
+    def validate_versions():
+        validator = new_validator()
+        validator.inventory = data
+        unnormalized_digests = set(manifest.keys())
+        validator._validate_versions(data["versions"], list(data["versions"].keys()), unnormalized_digests)  # pylint: disable=protected-access
+
+    for name, func in (("validate", validate),
+                       ("_validate_manifest", validate_manifest),
+                       ("_validate_versions", validate_versions),
+                       ("_check_content_path", check_content_paths),
+                       ("_check_logical_path", check_logical_paths)):
+        print("%-20s %8.3fs" % (name, best_time(func, args.repeat)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+#!/usr/bin/env python
+"""Benchmark identifier to path mapping throughput for each layout.
+
+Uses the given number of synthetic urn:uuid: identifiers, which are valid
+for all of the layouts in ocfl.layout_registry, and reports the number
+of identifiers mapped per second with single identifier_to_path() calls,
+with a first identifiers_to_paths() batch that fills the memo, and with
+a second batch where every identifier is found in the memo.
+
+Typical usage:
+> ./benchmark_layouts.py --ids 1000000 --repeat 3
+"""
+import argparse
+import time
+import uuid
+
+from ocfl.layout_registry import get_layout, layout_names
+
+
+def best_time(func, repeat):
+    """Best wall clock time in seconds for func over repeat runs."""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        seconds = time.perf_counter() - start
+        if best is None or seconds < best:
+            best = seconds
+    return best
+
+
+def main():
+    """Run benchmark with command line arguments."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n", maxsplit=1)[0])
+    parser.add_argument("--ids", type=int, default=100000,
+                        help="number of identifiers to map")
+    parser.add_argument("--repeat", type=int, default=3,
+                        help="number of runs of each benchmark, the best is reported")
+    args = parser.parse_args()
+    identifiers = ["urn:uuid:" + str(uuid.UUID(int=n * 7919)) for n in range(args.ids)]
+    print("Mapping %d identifiers" % (len(identifiers)))
+    seen = set()
+    for name in layout_names():
+        layout = get_layout(name)
+        if layout.NAME in seen:
+            continue  # Skip aliases
+        seen.add(layout.NAME)
+        layout.memo_size = len(identifiers)
+
+        def single(layout=layout):
+            for identifier in identifiers:
+                layout.identifier_to_path(identifier)
+
+        def batch_cold(layout=layout):
+            layout.memo_size = len(identifiers)
+            layout._memo = None  # pylint: disable=protected-access
+            for _ in layout.identifiers_to_paths(identifiers):
+                pass
+
+        def batch_warm(layout=layout):
+            for _ in layout.identifiers_to_paths(identifiers):
+                pass
+
+        for label, func in (("identifier_to_path", single),
+                            ("identifiers_to_paths", batch_cold),
+                            ("  (memoized)", batch_warm)):
+            seconds = best_time(func, args.repeat)
+            print("%-40s %-22s %12.0f ids/s" % (layout.NAME, label, len(identifiers) / seconds))
+
+
+if __name__ == "__main__":
+    main()
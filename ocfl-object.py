@@ -6,6 +6,7 @@ and requirements around them. It is designed to manipulate
 OCFL Objects or just Inventory files alone.
 """
 import argparse
+import json
 import logging
 import sys
 
@@ -13,6 +14,7 @@ import ocfl
 from ocfl.command_line_utils import add_version_arg, check_version_arg, \
     add_version_metadata_args, add_object_args, add_verbosity_args, \
     check_verbosity_args, validate_object
+from ocfl.extract import update_extracted
 
 
 class FatalError(Exception):
@@ -83,6 +85,21 @@ def parse_arguments():
                                help="source directory path")
     update_parser.add_argument("--srcbag", action="store",
                                help="source Bagit bag path (alternative to --srcdir)")
+    update_parser.add_argument("--detect-changes", action="store_true",
+                               help="digest only files in --srcdir that are new, have a different "
+                                    "size, or have been modified since the latest version inventory was "
+                                    "written, assuming other files are unchanged. This is a heuristic "
+                                    "based on modification times: a change that keeps the file size and "
+                                    "leaves an earlier modification time (e.g. a restored or copied file, "
+                                    "or clock skew between the source and object storage) is not detected, "
+                                    "use --paranoid when that matters")
+    update_parser.add_argument("--paranoid", action="store_true",
+                               help="digest every file in --srcdir, overriding --detect-changes")
+    update_parser.add_argument("--changes", action="store",
+                               help="JSON file with a list of add, replace, delete and rename "
+                                    "changes to apply to the current version state, with the "
+                                    "paths of added or replaced files relative to --srcdir "
+                                    "(default current directory). Only changed files are digested")
 
     add_parser = subparsers.add_parser(
         "show",
@@ -111,6 +128,12 @@ def parse_arguments():
                                      "date portion of the created time of the object version")
     extract_parser.add_argument("--logical-path", "--path", action="store", default=None,
                                 help="if specified, extract just the file at the specified logical path into --dstdir")
+    extract_parser.add_argument("--from-objver", action="store", default=None,
+                                help="if specified, --dstdir already holds an extracted copy of this "
+                                     "object version and will be updated in place to --objver")
+    extract_parser.add_argument("--check-base", action="store_true",
+                                help="with --from-objver, check the existing copy in --dstdir against "
+                                     "the digests of --from-objver before updating")
 
     args = parser.parse_args()
     check_version_arg(args)
@@ -136,7 +159,8 @@ def do_object_operation(args):
                       forward_delta=not args.no_forward_delta,
                       dedupe=not args.no_dedupe,
                       lax_digests=args.lax_digests,
-                      fixity=args.fixity)
+                      fixity=args.fixity,
+                      workers=args.workers)
     if args.cmd == "create":
         srcdir = args.srcdir
         metadata = ocfl.VersionMetadata(created=args.created,
@@ -179,13 +203,32 @@ def do_object_operation(args):
                                         message=args.message,
                                         name=args.name,
                                         address=args.address)
-        if args.srcbag is not None:
-            srcdir = ocfl.bag_as_source(args.srcbag, metadata)
-        elif args.srcdir is None:
-            raise FatalError("Must specify either --srcdir or --srcbag containing new version files when updating an OCFL object!")
-        inv = obj.add_version_with_content(objdir=args.objdir,
-                                           srcdir=srcdir,
-                                           metadata=metadata)
+        if args.changes is not None:
+            if args.srcbag is not None:
+                raise FatalError("Cannot use --srcbag with --changes, use --srcdir for the location of changed files.")
+            try:
+                with open(args.changes, "r", encoding="utf-8") as fh:
+                    changes = json.load(fh)
+            except (OSError, json.JSONDecodeError) as e:
+                raise FatalError("Failed to read changes from %s: %s" % (args.changes, str(e)))
+            if not isinstance(changes, list):
+                raise FatalError("Changes file %s must contain a JSON list of changes" % (args.changes))
+            try:
+                inv = obj.update_with_changes(objdir=args.objdir,
+                                              srcdir=srcdir or ".",
+                                              changes=changes,
+                                              metadata=metadata)
+            except ocfl.NewVersionException as e:
+                raise FatalError(str(e))
+        else:
+            if args.srcbag is not None:
+                srcdir = ocfl.bag_as_source(args.srcbag, metadata)
+            elif args.srcdir is None:
+                raise FatalError("Must specify either --srcdir or --srcbag containing new version files when updating an OCFL object!")
+            inv = obj.add_version_with_content(objdir=args.objdir,
+                                               srcdir=srcdir,
+                                               metadata=metadata,
+                                               detect_changes=args.detect_changes and not args.paranoid)
         print("Updated object %s to %s" % (inv.id, inv.head))
     elif args.cmd == "show":
         print("Object tree" + (" for %s" % (obj.id) if obj.id is not None else ""))
@@ -201,6 +244,16 @@ def do_object_operation(args):
                                         logical_path=args.logical_path,
                                         dstdir=args.dstdir)
             print("Extracted %s in %s to %s" % (args.logical_path, metadata.version, args.dstdir))
+        elif args.from_objver:
+            if args.dstbag:
+                raise FatalError("Cannot update an extracted Bagit bag.")
+            metadata = update_extracted(obj,
+                                        objdir=args.objdir,
+                                        dstdir=args.dstdir,
+                                        from_version=args.from_objver,
+                                        to_version=args.objver,
+                                        check_base=args.check_base)
+            print("Updated content in %s from %s to %s" % (args.dstdir, args.from_objver, metadata.version))
         else:
             if args.dstdir and args.dstbag:
                 args.dstdir = None  # Override dstdir if dstbag specified
@@ -1,14 +1,22 @@
 #!/usr/bin/env python
 """OCFL Storage Root Command Line Tool."""
 import argparse
+import csv
+import json
 import logging
 import os.path
 import sys
 
 import ocfl  # pylint: disable=import-self; this isn"t actually self import
 from ocfl.command_line_utils import add_version_arg, add_verbosity_args, \
-    check_version_arg, check_verbosity_args
+    check_version_arg, check_verbosity_args, add_rate_limit_args, check_rate_limit_args, \
+    add_version_metadata_args
+from ocfl.catalog import catalog_records
 from ocfl.constants import DEFAULT_SPEC_VERSION
+from ocfl.content_index import ContentIndex, ContentIndexException
+from ocfl.replication import sync_storage_root, compare_storage_roots
+
+CATALOG_FIELDS = ("id", "version", "logical_path", "content_path", "digest", "size")
 
 
 def add_common_args(parser):
@@ -49,6 +57,8 @@ def parse_arguments():
         "list",
         help="List contents of storage root")
     add_common_args(list_parser)
+    list_parser.add_argument("--read-inventory", action="store_true",
+                             help="read each object identifier from the inventory rather than from the object path")
 
     validate_parser = subparsers.add_parser(
         "validate",
@@ -60,11 +70,16 @@ def parse_arguments():
                                  help="if validating each object, also check all digest (MAY TAKE LOTS OF TIME)")
     validate_parser.add_argument("--max_errors", default=100,
                                  help="maximum number of errors to record/show")
+    add_rate_limit_args(validate_parser)
 
     add_parser = subparsers.add_parser("add", help="Add object at --src to the storage root")
     add_common_args(add_parser)
-    add_parser.add_argument("--src", default=None,
-                            help="source path of object or version")
+    add_parser.add_argument("--src", action="append", default=[],
+                            help="source path of object or version (repeatable)")
+    add_parser.add_argument("--src-list", default=None,
+                            help="file with source paths of objects to add, one per line")
+    add_parser.add_argument("--workers", type=int, default=1,
+                            help="number of objects to add concurrently")
 
     purge_parser = subparsers.add_parser(
         "purge",
@@ -87,6 +102,86 @@ def parse_arguments():
     path_parser.add_argument("--id", default=None,
                              help="identifier of object")
 
+    migrate_parser = subparsers.add_parser(
+        "migrate-digests",
+        help="Add a new version to every object to change digest algorithm and/or add fixity")
+    add_common_args(migrate_parser)
+    migrate_parser.add_argument("--to", default=None,
+                                help="new digest algorithm for content addressing, the old one is kept as fixity")
+    migrate_parser.add_argument("--add-fixity", action="append", default=[],
+                                help="fixity type to add (repeatable)")
+    migrate_parser.add_argument("--workers", type=int, default=1,
+                                help="number of objects to migrate concurrently")
+    migrate_parser.add_argument("--digest-workers", type=int, default=1,
+                                help="number of threads reading content files within each object")
+    migrate_parser.add_argument("--check-digests", action="store_true",
+                                help="also check content against the existing digests while reading it")
+    migrate_parser.add_argument("--checkpoint", default=None,
+                                help="local file to record progress in, run again with the same file to resume")
+    add_version_metadata_args(migrate_parser)
+    add_rate_limit_args(migrate_parser)
+
+    sync_parser = subparsers.add_parser(
+        "sync",
+        help="Replicate the storage root to --dst, copying only versions missing from the destination")
+    add_common_args(sync_parser)
+    sync_parser.add_argument("--dst", default=None,
+                             help="destination storage root path, created if it does not exist")
+    sync_parser.add_argument("--workers", type=int, default=1,
+                             help="number of objects to sync concurrently")
+    sync_parser.add_argument("--version-workers", type=int, default=1,
+                             help="number of version directories to copy concurrently within each object")
+    sync_parser.add_argument("--level", choices=ocfl.VALIDATION_LEVELS + ("none",), default="inventory",
+                             help="validation level used to check each updated object in the destination, none to not check")
+    sync_parser.add_argument("--report", default=None,
+                             help="only sync objects reported as missing or with missing versions in this report from compare --report")
+    add_rate_limit_args(sync_parser)
+
+    compare_parser = subparsers.add_parser(
+        "compare",
+        help="Compare objects with a replica storage root --other using root inventory sidecars and inventories, without reading content")
+    add_common_args(compare_parser)
+    compare_parser.add_argument("--other", default=None,
+                                help="other storage root to compare with")
+    compare_parser.add_argument("--workers", type=int, default=1,
+                                help="number of objects to compare concurrently")
+    compare_parser.add_argument("--report", default=None,
+                                help="file to write a JSON line for each object that differs, usable with sync --report")
+    add_rate_limit_args(compare_parser)
+
+    catalog_parser = subparsers.add_parser(
+        "export-catalog",
+        help="Export a catalog with a line for every file in every version of every object")
+    add_common_args(catalog_parser)
+    catalog_parser.add_argument("--output", default=None,
+                                help="file to write the catalog to, default is to write to standard output")
+    catalog_parser.add_argument("--format", choices=("jsonl", "csv"), default="jsonl",
+                                help="catalog format, JSON lines or CSV with a header line")
+    catalog_parser.add_argument("--workers", type=int, default=1,
+                                help="number of objects to read concurrently")
+    add_rate_limit_args(catalog_parser)
+
+    index_parser = subparsers.add_parser(
+        "index",
+        help="Create or update a content index of the digests and logical paths of files in all objects")
+    add_common_args(index_parser)
+    index_parser.add_argument("--index", default=None,
+                              help="local SQLite file for the content index")
+    index_parser.add_argument("--workers", type=int, default=1,
+                              help="number of objects to read concurrently")
+    add_rate_limit_args(index_parser)
+
+    find_parser = subparsers.add_parser(
+        "find",
+        help="Find files by --digest or --logical-path using a content index built with the index command")
+    add_verbosity_args(find_parser)
+    find_parser.add_argument("--index", default=None,
+                             help="local SQLite file for the content index")
+    find_parser.add_argument("--digest", default=None,
+                             help="digest of the file content to find")
+    find_parser.add_argument("--logical-path", default=None,
+                             help="logical path of the file to find")
+
     validate_object_parser = subparsers.add_parser("validate-object", help="Validate an OCFL object")
     validate_object_parser.add_argument("--id", default=None,
                                         help="identifier of object")
@@ -96,6 +191,7 @@ def parse_arguments():
     if args.cmd is None:
         raise ocfl.StorageRootException("No command, nothing to do (use -h to show help)")
     check_verbosity_args(args)
+    check_rate_limit_args(args)
     return args
 
 
@@ -144,8 +240,66 @@ def get_storage_root(args):
     sys.exit(1)
 
 
+def do_index_operation(args):
+    """Do operation using the content index based on args."""
+    if not args.index:
+        raise ocfl.StorageRootException("Must specify content index file with --index")
+    with ContentIndex(args.index) as index:
+        if args.cmd == "index":
+            store = ocfl.StorageRoot(root=get_storage_root(args),
+                                     layout_name=args.layout,
+                                     lax_digests=args.lax_digests)
+            counts = index.update(store, workers=args.workers)
+            print("Indexed %d objects in %s: %d added, %d updated, %d unchanged, %d removed, %d failed"
+                  % (sum(counts.values()) - counts["removed"], args.index, counts["added"], counts["updated"],
+                     counts["unchanged"], counts["removed"], counts["error"]))
+            stats = index.stats()
+            print("Index has %d objects with %d content files, %d bytes of which %d bytes are duplicates"
+                  % (stats["objects"], stats["files"], stats["bytes"], stats["duplicate_bytes"]))
+            if counts["error"] > 0:
+                sys.exit(1)
+        else:
+            if args.digest is not None:
+                results = index.find_digest(args.digest)
+            elif args.logical_path is not None:
+                results = index.find_logical_path(args.logical_path)
+            else:
+                raise ocfl.StorageRootException("Must specify --digest or --logical-path to find")
+            for r in results:
+                print("%s %s %s -- id=%s content_path=%s"
+                      % (r["object_path"], r["version"], r["logical_path"], r["id"], r["content_path"]))
+            print("Found %d files" % (len(results)))
+
+
+def export_catalog(store, args):
+    """Write catalog of all files in store to --output or stdout."""
+    fh = sys.stdout if args.output is None else open(args.output, "w", encoding="utf-8", newline="")  # pylint: disable=consider-using-with
+    try:
+        if args.format == "csv":
+            writer = csv.DictWriter(fh, fieldnames=CATALOG_FIELDS)
+            writer.writeheader()
+            write = writer.writerow
+        else:
+            def write(record):
+                fh.write(json.dumps(record) + "\n")
+        num_records = 0
+        for record in catalog_records(store, workers=args.workers):
+            write(record)
+            num_records += 1
+    finally:
+        if fh is not sys.stdout:
+            fh.close()
+    logging.info("Exported %d records for %d objects", num_records, store.num_objects)
+    if len(store.errors) > 0:
+        logging.error("Failed to read %d objects", len(store.errors))
+        sys.exit(1)
+
+
 def do_store_operation(args):
     """Do operation on store based on args."""
+    if args.cmd in ("index", "find"):
+        do_index_operation(args)
+        return
     store = ocfl.StorageRoot(root=get_storage_root(args),
                              layout_name=args.layout,
                              lax_digests=args.lax_digests)
@@ -153,16 +307,95 @@ def do_store_operation(args):
         store.initialize(spec_version=args.spec_version, layout_params=args.layout_params)
         print("Created OCFL storage root %s" % (store.root))
     elif args.cmd == "list":
-        for (dirpath, identifier) in store.list_objects():
+        for (dirpath, identifier) in store.list_objects(read_inventory=args.read_inventory):
             print("%s -- id=%s" % (dirpath, identifier))
         print("Found %d OCFL Objects under root %s" % (store.num_objects, store.root))
     elif args.cmd == "validate":
         validate(store, args)
     elif args.cmd == "add":
-        if not args.src:
-            raise ocfl.StorageRootException("Must specify object path with --src")
-        (identifier, path) = store.add(object_path=args.src)
-        print("Added object %s at path %s" % (identifier, path))
+        srcs = list(args.src)
+        if args.src_list is not None:
+            with open(args.src_list, "r", encoding="utf-8") as fh:
+                srcs.extend(line.strip() for line in fh if line.strip() != "")
+        if len(srcs) == 0:
+            raise ocfl.StorageRootException("Must specify object path with --src or --src-list")
+        if len(srcs) == 1 and args.src_list is None:
+            (identifier, path) = store.add(object_path=srcs[0])
+            print("Added object %s at path %s" % (identifier, path))
+        else:
+            num_errors = 0
+            for (_, identifier, path, error) in store.add_many(srcs, workers=args.workers):
+                if error is None:
+                    print("Added object %s at path %s" % (identifier, path))
+                else:
+                    num_errors += 1
+            print("Added %d objects, %d failed" % (len(srcs) - num_errors, num_errors))
+            if num_errors > 0:
+                sys.exit(1)
+    elif args.cmd == "migrate-digests":
+        if args.to is None and len(args.add_fixity) == 0:
+            raise ocfl.StorageRootException("Must specify --to and/or --add-fixity for migrate-digests")
+        metadata = None
+        if args.message is not None or args.name is not None or args.address is not None or args.created is not None:
+            metadata = ocfl.VersionMetadata(created=args.created,
+                                            message=args.message,
+                                            name=args.name,
+                                            address=args.address)
+        counts = store.migrate_digests(digest_algorithm=args.to,
+                                       add_fixity=args.add_fixity,
+                                       metadata=metadata,
+                                       workers=args.workers,
+                                       digest_workers=args.digest_workers,
+                                       check_digests=args.check_digests,
+                                       checkpoint=args.checkpoint)
+        print("Migrated %d objects, %d needed no change, %d already done (checkpoint), %d failed"
+              % (counts["migrated"], counts["skipped"], counts["done"], counts["error"]))
+        if counts["error"] > 0:
+            sys.exit(1)
+    elif args.cmd == "sync":
+        if not args.dst:
+            raise ocfl.StorageRootException("Must specify destination storage root with --dst")
+        object_paths = None
+        if args.report is not None:
+            object_paths = []
+            with open(args.report, "r", encoding="utf-8") as fh:
+                for line in fh:
+                    entry = json.loads(line)
+                    if entry["status"] in ("missing", "missing-versions"):
+                        object_paths.append(entry["path"])
+        counts = sync_storage_root(store, args.dst,
+                                   workers=args.workers,
+                                   version_workers=args.version_workers,
+                                   level=None if args.level == "none" else args.level,
+                                   object_paths=object_paths)
+        print("Synced to %s: %d objects updated, %d unchanged, %d failed"
+              % (args.dst, counts["updated"], counts["unchanged"], counts["error"]))
+        if counts["error"] > 0:
+            sys.exit(1)
+    elif args.cmd == "compare":
+        if not args.other:
+            raise ocfl.StorageRootException("Must specify other storage root with --other")
+        counts = {}
+        report = None if args.report is None else open(args.report, "w", encoding="utf-8")  # pylint: disable=consider-using-with
+        try:
+            for entry in compare_storage_roots(store, args.other, workers=args.workers):
+                counts[entry["status"]] = counts.get(entry["status"], 0) + 1
+                if entry["status"] == "same":
+                    continue
+                print("%s -- %s%s" % (entry["path"], entry["status"],
+                                      "" if "message" not in entry else " (%s)" % entry["message"]))
+                if report is not None:
+                    report.write(json.dumps(entry) + "\n")
+        finally:
+            if report is not None:
+                report.close()
+        print("Compared %d objects with %s: %s"
+              % (sum(counts.values()), args.other,
+                 ", ".join("%d %s" % (n, status) for status, n in sorted(counts.items()))))
+        if counts.get("same", 0) != sum(counts.values()):
+            sys.exit(1)
+    elif args.cmd == "export-catalog":
+        export_catalog(store, args)
     elif args.cmd == "purge":
         logging.error("purge not implemented")
     elif args.cmd in ("show", "path", "validate_object"):
@@ -189,6 +422,6 @@ if __name__ == "__main__":
     try:
         aargs = parse_arguments()
         do_store_operation(aargs)
-    except (ocfl.StorageRootException, ocfl.ObjectException) as e:
+    except (ocfl.StorageRootException, ocfl.ObjectException, ContentIndexException) as e:
         logging.error(str(e))
         sys.exit(1)
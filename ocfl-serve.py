@@ -0,0 +1,69 @@
+#!/usr/bin/env python
+"""Persistent server for OCFL operations over a Unix socket.
+
+Keeps filesystems, parsed inventories and storage root layouts warm between
+requests, see ocfl.server for the JSON-RPC protocol.
+"""
+import argparse
+import logging
+import sys
+
+from ocfl.command_line_utils import add_version_arg, check_version_arg, add_verbosity_args, check_verbosity_args, \
+    add_rate_limit_args, check_rate_limit_args
+from ocfl.server import OcflServer, ServerException
+
+
+def parse_arguments():
+    """Parse command line arguments.
+
+    Will display message and exit if --help/-h or --version arguments are
+    supplied.
+
+    Returns Namespace object from argparse parsing of command line arguments.
+    """
+    parser = argparse.ArgumentParser(
+        description="Run a persistent server that accepts JSON-RPC requests to "
+        "validate, extract, update, list and find the paths of OCFL objects over "
+        "a Unix socket. Requests on separate connections are handled concurrently.")
+    parser.add_argument("--socket", required=True,
+                        help="path of the Unix socket to create and listen on")
+    parser.add_argument("--root", action="append", default=[],
+                        help="OCFL storage root to open and check at startup so that it "
+                        "is warm for the first request (repeatable)")
+    parser.add_argument("--lax-digests", action="store_true",
+                        help="allow use of any known digest")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="number of threads used to read version inventories "
+                        "ahead of validation within each request (default 1)")
+    add_rate_limit_args(parser)
+
+    add_version_arg(parser)
+    add_verbosity_args(parser)
+    args = parser.parse_args()
+    check_version_arg(args)
+    check_verbosity_args(args)
+    check_rate_limit_args(args)
+    return args
+
+
+def main():
+    """Run from command line."""
+    args = parse_arguments()
+    try:
+        server = OcflServer(args.socket, lax_digests=args.lax_digests, workers=args.workers)
+    except (ServerException, OSError) as e:
+        logging.error("Cannot start server: %s", str(e))
+        sys.exit(1)
+    try:
+        for root in args.root:
+            server.storage_root(root)
+        logging.info("Listening on %s", args.socket)
+        server.serve_forever()
+    except KeyboardInterrupt:
+        logging.info("Interrupted, shutting down")
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -10,7 +10,8 @@ import logging
 import sys
 
 import ocfl
-from ocfl.command_line_utils import add_version_arg, check_version_arg, add_verbosity_args, check_verbosity_args, validate_object, validate_object_inventory
+from ocfl.command_line_utils import add_version_arg, check_version_arg, add_verbosity_args, check_verbosity_args, \
+    add_rate_limit_args, check_rate_limit_args, validate_object, validate_object_inventory
 
 
 def parse_arguments():
@@ -34,12 +35,30 @@ def parse_arguments():
                         help="allow use of any known digest")
     parser.add_argument("--no-check-digests", action="store_true",
                         help="do not check digest values")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="number of threads used to read version inventories "
+                        "ahead of validation, useful for remote storage (default 1)")
+    parser.add_argument("--max-memory", type=int, default=None,
+                        help="approximate limit in MB on memory used for listings of "
+                        "content files and digests when checking content, beyond which "
+                        "they are spilled to temporary files (default no limit)")
+    parser.add_argument("--level", choices=ocfl.VALIDATION_LEVELS, default=None,
+                        help="validation level for objects, each level also does the checks "
+                        "of the levels before it: declaration (object declaration and root "
+                        "inventory sidecar match), inventory (all inventories and object "
+                        "structure), content (presence of content files), digests (content "
+                        "digests), fixity (digests for all fixity algorithms). Default is "
+                        "fixity, or content with --no-check-digests")
+    parser.add_argument("--fail-fast", action="store_true",
+                        help="stop validating each object at its first error")
+    add_rate_limit_args(parser)
 
     add_version_arg(parser)
     add_verbosity_args(parser)
     args = parser.parse_args()
     check_version_arg(args)
     check_verbosity_args(args)
+    check_rate_limit_args(args)
     return args
 
 
@@ -54,6 +73,7 @@ def do_validation(args):
     if len(args.path) == 0:
         print("No OCFL paths specified, nothing to do! (Use -h for help)")
 
+    max_memory = args.max_memory * 1024 * 1024 if args.max_memory else None
     num = 0
     num_good = 0
     num_paths = len(args.path)
@@ -68,7 +88,11 @@ def do_validation(args):
             if validate_object(obj, path,
                                log_warnings=log_warnings,
                                log_errors=log_errors,
-                               check_digests=not args.no_check_digests):
+                               check_digests=not args.no_check_digests,
+                               workers=args.workers,
+                               max_memory=max_memory,
+                               level=args.level,
+                               fail_fast=args.fail_fast):
                 num_good += 1
         elif path_type == "root":
             logging.debug("Validating OCFL Storage Root at %s", path)
@@ -76,7 +100,11 @@ def do_validation(args):
                                      lax_digests=args.lax_digests)
             if store.validate(log_warnings=log_warnings,
                               log_errors=log_errors,
-                              check_digests=not args.no_check_digests):
+                              check_digests=not args.no_check_digests,
+                              workers=args.workers,
+                              max_memory=max_memory,
+                              level=args.level,
+                              fail_fast=args.fail_fast):
                 num_good += 1
         elif path_type == "file":
             logging.debug("Validating separate OCFL Inventory at %s", path)
@@ -10,6 +10,7 @@ from .new_version import NewVersion, NewVersionException
 from .object import Object
 from .object_utils import find_path_type, ObjectException
 from .storage_root import StorageRoot, StorageRootException
+from .version_fs import OCFLVersionFileSystem
 from .version_metadata import VersionMetadata
 
 if sys.version_info < (3, 8):  # pragma: no cover
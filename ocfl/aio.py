@@ -0,0 +1,662 @@
+"""Asyncio API for OCFL objects and storage roots.
+
+The rest of ocfl-py uses the synchronous interface of fsspec filesystems,
+so concurrent access to storage can only come from threads. This module
+provides coroutine versions of the main operations that instead await the
+coroutine methods of fsspec filesystems in asynchronous mode, such as S3,
+for listing (``_ls()``), ranged reads (``_cat_file()``) and uploads
+(``_pipe_file()``, ``_put_file()``). A single process can then keep very
+many requests in flight. Filesystems without an async implementation,
+including local files, are used from threads with asyncio.to_thread().
+
+Requests are made through an AsyncFs, which limits the number of requests
+in flight with an asyncio.Semaphore.
+
+    validate_object()  reads the listing, inventories, sidecars and, at
+                       the digests and fixity levels, the content digests
+                       of an object concurrently, then runs the usual
+                       ocfl.Validator checks on what was read
+    extract()          downloads the files of a version concurrently
+    create()           uploads the content files of a new object
+                       concurrently, then the inventories and declaration
+    object_paths()     traverses a storage root one level of directories
+    list_objects()     at a time, listing the directories of each level
+                       concurrently
+
+Example:
+    >>> import asyncio
+    >>> import ocfl.aio
+    >>> passed, validator = asyncio.run(ocfl.aio.validate_object("fixtures/1.1/good-objects/spec-ex-full"))
+    >>> passed
+    True
+"""
+import asyncio
+from collections import deque
+import io
+import json
+import logging
+import os
+import re
+import shutil
+
+from .constants import INVENTORY_FILENAME
+from .digest import MultiDigester, bytes_digest
+from .fsw import AbstractFileSystem, fsw_openfs_async, fsw_closefs_async, fsw_opendir_as_fs
+from .inventory_cache import parse_inventory_bytes
+from .new_version import NewVersion
+from .object_utils import ObjectException
+from .validator import Validator
+from .version_metadata import VersionMetadata
+
+DEFAULT_MAX_REQUESTS = 64
+RANGE_SIZE = 1024 * 1024  # Bytes read in each request for digests
+MAX_READ_AHEAD = 1000  # Objects with identifiers pending in list_objects()
+
+
+class AsyncFs():
+    """Coroutine methods for a filesystem with a limit on requests in flight.
+
+    Calls on a filesystem in asynchronous mode await its coroutine methods
+    directly, calls on any other filesystem are run in threads. Paths are
+    relative to the root of the filesystem.
+
+    Attributes:
+        fs (AbstractFileSystem): the filesystem
+        semaphore (asyncio.Semaphore): limit on requests in flight, shared
+            with AsyncFs instances from opendir()
+    """
+
+    def __init__(self, fs, max_requests=DEFAULT_MAX_REQUESTS, semaphore=None):
+        """Initialize AsyncFs.
+
+        Arguments:
+            fs (AbstractFileSystem): the filesystem
+            max_requests (int): maximum number of requests in flight
+            semaphore (asyncio.Semaphore or None): semaphore to share with
+                another AsyncFs, else None (default) for a new semaphore
+                with max_requests
+        """
+        self.fs = fs
+        self.semaphore = asyncio.Semaphore(max_requests) if semaphore is None else semaphore
+        self.is_async = getattr(fs, "async_impl", False) and getattr(fs, "asynchronous", False)
+
+    @classmethod
+    async def open(cls, fs_url, max_requests=DEFAULT_MAX_REQUESTS):
+        """Open AsyncFs for fs_url, see ocfl.fsw.fsw_openfs_async().
+
+        Raises:
+            FileNotFoundError: if the path or filesystem cannot be opened
+        """
+        return cls(await fsw_openfs_async(fs_url), max_requests=max_requests)
+
+    async def close(self):
+        """Close any client session of the filesystem."""
+        await fsw_closefs_async(self.fs)
+
+    def opendir(self, path):
+        """Open the directory path as an AsyncFs sharing the semaphore."""
+        return AsyncFs(fsw_opendir_as_fs(self.fs, path), semaphore=self.semaphore)
+
+    async def _call(self, name, *args, **kwargs):
+        """Call filesystem method name, waiting on the semaphore."""
+        async with self.semaphore:
+            if self.is_async:
+                return await getattr(self.fs, "_" + name)(*args, **kwargs)
+            return await asyncio.to_thread(getattr(self.fs, name), *args, **kwargs)
+
+    async def _makedirs(self, path):
+        """Make parent directories for path where the filesystem needs them."""
+        parent = os.path.dirname(path)
+        if not self.is_async and parent != "":
+            await self._call("makedirs", parent, exist_ok=True)
+
+    async def ls(self, path=""):
+        """List directory path.
+
+        Returns:
+            dict: of name relative to path -> info dict
+        """
+        entries = {}
+        for info in await self._call("ls", path, detail=True):
+            name = os.path.basename(info["name"].rstrip("/"))
+            if name not in ("", ".", ".."):
+                entries[name] = info
+        return entries
+
+    async def walk(self, path=""):
+        """All files and directories under path.
+
+        The directories at each level below path are listed concurrently.
+
+        Returns:
+            dict: of path relative to path -> info dict, with the "type"
+                of each either "file" or "directory"
+        """
+        entries = {}
+        level = [""]
+        while len(level) > 0:
+            listings = await asyncio.gather(*(self.ls(os.path.join(path, dirpath)) for dirpath in level))
+            next_level = []
+            for dirpath, listing in zip(level, listings):
+                for name, info in listing.items():
+                    relpath = os.path.join(dirpath, name)
+                    entries[relpath] = info
+                    if info["type"] == "directory":
+                        next_level.append(relpath)
+            level = next_level
+        return entries
+
+    async def exists(self, path):
+        """Return True if path exists."""
+        return await self._call("exists", path)
+
+    async def cat(self, path, start=None, end=None):
+        """Bytes of file path, or of the range start to end."""
+        return await self._call("cat_file", path, start=start, end=end)
+
+    async def pipe(self, path, data):
+        """Write bytes data to file path."""
+        await self._makedirs(path)
+        await self._call("pipe_file", path, data)
+
+    async def put_file(self, local_path, path):
+        """Upload local file local_path to path."""
+        await self._makedirs(path)
+        await self._call("put_file", local_path, path)
+
+    async def get_file(self, path, local_path):
+        """Download path to local file local_path."""
+        await self._call("get_file", path, local_path)
+
+    async def digests(self, path, digest_types, size=None):
+        """Digests of file path read in ranges of RANGE_SIZE bytes.
+
+        Arguments:
+            path (str): path of file
+            digest_types (list): digest types to compute
+            size (int or None): size of the file if known, else None to
+                read the whole file at once
+
+        Returns:
+            dict: of digest type -> digest
+        """
+        digester = MultiDigester(digest_types)
+        if size is None or size <= RANGE_SIZE:
+            digester.update(await self.cat(path))
+        else:
+            for start in range(0, size, RANGE_SIZE):
+                data = await self.cat(path, start=start, end=min(start + RANGE_SIZE, size))
+                await asyncio.to_thread(digester.update, data)
+        return digester.digests()
+
+
+async def _open(objdir, max_requests):
+    """Return an AsyncFs for objdir and whether it was opened here."""
+    if isinstance(objdir, AsyncFs):
+        return objdir, False
+    return await AsyncFs.open(objdir, max_requests=max_requests), True
+
+
+class _SnapshotFileSystem(AbstractFileSystem):
+    """Read-only filesystem of an object listing and files read ahead.
+
+    Files not read ahead are read when opened with read_file(path).
+    """
+
+    protocol = "ocfl-snapshot"
+    root_marker = ""
+    cachable = False
+
+    def __init__(self, *args, **storage_options):
+        """Initialize empty _SnapshotFileSystem, see load()."""
+        super().__init__(*args, **storage_options)
+        self.name = None
+        self._entries = {}
+        self._data = {}
+        self._read_file = None
+        self._children = {"": []}
+
+    def load(self, name, entries, data, read_file):
+        """Set contents after creation, avoiding tokenizing them as arguments.
+
+        Arguments:
+            name (str): description of the object for messages
+            entries (dict): path -> info dict for each file and directory
+            data (dict): path -> bytes for files read ahead
+            read_file (callable): function to read any other file
+        """
+        self.name = name
+        self._entries = entries
+        self._data = data
+        self._read_file = read_file
+        self._children = {"": []}
+        for path in sorted(entries):
+            self._children.setdefault(os.path.dirname(path), []).append(path)
+            if entries[path]["type"] == "directory":
+                self._children.setdefault(path, [])
+        return self
+
+    @classmethod
+    def _strip_protocol(cls, path):
+        """Remove any protocol prefix and leading and trailing slashes."""
+        path = super()._strip_protocol(path)
+        return path.strip("/")
+
+    def to_json(self, **kwargs):  # pylint: disable=unused-argument
+        """Return the description used by Validator in messages."""
+        return self.name
+
+    def info(self, path, **kwargs):
+        """Details of path."""
+        path = self._strip_protocol(path)
+        if path == "":
+            return {"name": "", "type": "directory", "size": 0}
+        if path not in self._entries:
+            raise FileNotFoundError(path)
+        info = self._entries[path]
+        return {"name": path, "type": info["type"], "size": info.get("size", 0)}
+
+    def ls(self, path, detail=True, **kwargs):
+        """List directory path, or a single file."""
+        path = self._strip_protocol(path)
+        if path in self._children:
+            paths = self._children[path]
+        elif path in self._entries:
+            paths = [path]
+        else:
+            raise FileNotFoundError(path)
+        if detail:
+            return [self.info(p) for p in paths]
+        return list(paths)
+
+    def _open(self, path, mode="rb", block_size=None, autocommit=True,
+              cache_options=None, **kwargs):
+        """Open file path for reading."""
+        if mode != "rb":
+            raise PermissionError("_SnapshotFileSystem is read-only")
+        path = self._strip_protocol(path)
+        if path not in self._data:
+            if self.info(path)["type"] != "file":
+                raise FileNotFoundError(path)
+            return io.BytesIO(self._read_file(path))
+        return io.BytesIO(self._data[path])
+
+
+class _PrefetchedValidator(Validator):
+    """Validator that uses content digests computed ahead of validation."""
+
+    def __init__(self, **kwargs):
+        """Initialize _PrefetchedValidator, see ocfl.Validator."""
+        super().__init__(**kwargs)
+        self.digests = {}  # (filepath, digest_algorithm) -> digest
+
+    def content_digest(self, filepath, digest_algorithm):
+        """Digest from self.digests, else read the file."""
+        digest = self.digests.get((filepath, digest_algorithm))
+        if digest is None:
+            digest = super().content_digest(filepath, digest_algorithm)
+        return digest
+
+
+def _is_metadata_file(path):
+    """Return True if path is a declaration, inventory or sidecar to read ahead."""
+    name = os.path.basename(path)
+    return path.count("/") <= 1 and (name.startswith(INVENTORY_FILENAME) or name.startswith("0="))
+
+
+def _supported(digest_algorithm):
+    """Return True if digest_algorithm can be computed."""
+    try:
+        bytes_digest(b"", digest_algorithm)
+    except (ValueError, TypeError):
+        return False
+    return True
+
+
+async def _read_digests(afs, entries, data, level):
+    """Content digests needed to validate an object at level.
+
+    Arguments:
+        afs (AsyncFs): the object filesystem
+        entries (dict): path -> info for the object
+        data (dict): path -> bytes of the metadata files read
+        level (str): validation level, "digests" or "fixity"
+
+    Returns:
+        dict: (content path, digest algorithm) -> digest
+    """
+    inventories = []
+    for path in sorted(data):
+        if os.path.basename(path) == INVENTORY_FILENAME:
+            try:
+                inventory = json.loads(data[path])
+            except ValueError:
+                continue
+            if isinstance(inventory, dict):
+                inventories.append((path, inventory))
+    root = dict(inventories).get(INVENTORY_FILENAME)
+    if root is None:
+        return {}
+    algorithms = set([root.get("digestAlgorithm")])
+    if level == "fixity":
+        for _, inventory in inventories:
+            algorithms.add(inventory.get("digestAlgorithm"))
+            if isinstance(inventory.get("fixity"), dict):
+                algorithms.update(inventory["fixity"].keys())
+    algorithms = sorted(a for a in algorithms if isinstance(a, str) and _supported(a))
+    content_directory = root.get("contentDirectory", "content")
+    content = re.compile(r"v\d+/" + re.escape(str(content_directory)) + "/")
+    paths = [path for path, info in entries.items() if info["type"] == "file" and content.match(path)]
+
+    async def _digests(path):
+        try:
+            return await afs.digests(path, algorithms, size=entries[path].get("size"))
+        except (OSError, ValueError) as e:
+            logging.warning("Failed to read %s ahead of validation (%s)", path, str(e))
+            return {}
+
+    digests = {}
+    if len(algorithms) > 0:
+        for path, path_digests in zip(paths, await asyncio.gather(*(_digests(p) for p in paths))):
+            for digest_algorithm, digest in path_digests.items():
+                digests[(path, digest_algorithm)] = digest
+    return digests
+
+
+async def validate_object(objdir, *, log_warnings=True, log_errors=True,
+                          check_digests=True, lax_digests=False, level=None,
+                          fail_fast=False, max_requests=DEFAULT_MAX_REQUESTS):
+    """Validate OCFL object at objdir.
+
+    The object listing, the declaration, inventory and sidecar files, and
+    content digests if needed for level, are read concurrently. Validation
+    of what was read is then done by ocfl.Validator in a thread so that the
+    checks and messages are the same as for ocfl.Object.validate().
+
+    Arguments:
+        objdir (str or AsyncFs): path or fsw filesystem URL of the object,
+            or an AsyncFs for it
+        log_warnings (bool): True (default) to include warnings in the
+            validation log
+        log_errors (bool): True (default) to include errors in the
+            validation log
+        check_digests (bool): True (default) to check content file digests,
+            ignored if level is set
+        lax_digests (bool): allow use of any known digest
+        level (str or None): validation level from
+            ocfl.constants.VALIDATION_LEVELS, default None to use
+            check_digests
+        fail_fast (bool): True to stop at the first error, default False
+        max_requests (int): maximum number of requests in flight if objdir
+            is opened here
+
+    Returns:
+        tuple: ``(passed, validator)`` as for ocfl.Object.validate()
+    """
+    validator = _PrefetchedValidator(log_warnings=log_warnings,
+                                     log_errors=log_errors,
+                                     check_digests=check_digests,
+                                     lax_digests=lax_digests,
+                                     level=level,
+                                     fail_fast=fail_fast)
+    name = objdir if isinstance(objdir, str) else str(objdir.fs)
+    try:
+        afs, opened = await _open(objdir, max_requests)
+    except FileNotFoundError:
+        validator.log.error("E003e", path=name)
+        return False, validator
+    try:
+        try:
+            entries = await afs.walk()
+        except FileNotFoundError:
+            validator.log.error("E003e", path=name)
+            return False, validator
+        paths = [path for path, info in entries.items() if info["type"] == "file" and _is_metadata_file(path)]
+        data = dict(zip(paths, await asyncio.gather(*(afs.cat(path) for path in paths))))
+        if validator.check_digests:
+            validator.digests = await _read_digests(afs, entries, data, validator.level)
+        loop = asyncio.get_running_loop()
+
+        def _read_file(path):
+            return asyncio.run_coroutine_threadsafe(afs.cat(path), loop).result()
+
+        snapshot = _SnapshotFileSystem().load(name, entries, data, _read_file)
+        passed = await asyncio.to_thread(validator.validate_object, snapshot)
+    finally:
+        if opened:
+            await afs.close()
+    return passed, validator
+
+
+async def extract(objdir, version, dstdir, *, max_requests=DEFAULT_MAX_REQUESTS):
+    """Extract version from object at objdir into local directory dstdir.
+
+    Files are downloaded concurrently. Where several logical paths have the
+    same content the file is downloaded once and copied locally.
+
+    Arguments:
+        objdir (str or AsyncFs): path or fsw filesystem URL of the object,
+            or an AsyncFs for it
+        version (str): version to be extracted ("v1", etc.) or "head" for
+            latest
+        dstdir (str): local directory to create with extracted version,
+            it may exist if it is empty and its parent directory must exist
+        max_requests (int): maximum number of requests in flight if objdir
+            is opened here
+
+    Returns:
+        ocfl.VersionMetadata: metadata object for the version extracted
+
+    Raises:
+        ObjectException: if the object or version cannot be read, or if
+            dstdir cannot be used
+    """
+    afs, opened = await _open(objdir, max_requests)
+    try:
+        try:
+            inventory, _ = parse_inventory_bytes(await afs.cat(INVENTORY_FILENAME))
+        except (OSError, ValueError) as e:
+            raise ObjectException("Failed to read inventory of object at %s (%s)" % (objdir, str(e)))
+        if version == "head":
+            version = inventory.head
+        elif version not in inventory.version_directories:
+            raise ObjectException("Object at %s does not include a version '%s'" % (objdir, version))
+        # Check the destination
+        parentdir = os.path.dirname(os.path.normpath(dstdir))
+        if not os.path.isdir(parentdir or "."):
+            raise ObjectException("Destination parent %s does not exist" % (parentdir))
+        if os.path.isdir(dstdir):
+            if len(os.listdir(dstdir)) > 0:
+                raise ObjectException("Target directory %s already exists and is not empty, aborting!" % (dstdir))
+        else:
+            os.mkdir(dstdir)
+        manifest = inventory.manifest
+
+        async def _extract(content_path, logical_files):
+            local_paths = [os.path.join(dstdir, logical_file) for logical_file in logical_files]
+            for local_path in local_paths:
+                os.makedirs(os.path.dirname(local_path), exist_ok=True)
+            logging.debug("Downloading %s -> %s", content_path, logical_files[0])
+            await afs.get_file(content_path, local_paths[0])
+            for local_path in local_paths[1:]:
+                shutil.copyfile(local_paths[0], local_path)
+
+        await asyncio.gather(*(_extract(manifest[digest][0], logical_files)
+                               for digest, logical_files in inventory.version(version).state.items()))
+    finally:
+        if opened:
+            await afs.close()
+    logging.info("Extracted %s into %s", version, dstdir)
+    return VersionMetadata(inventory=inventory.data, version=version)
+
+
+async def create(obj, srcdir, objdir, metadata=None, *, max_requests=DEFAULT_MAX_REQUESTS):
+    """Create a new OCFL object with v1 content from local directory srcdir.
+
+    The inventory is built from srcdir as for ocfl.Object.create(), in a
+    thread. Content files are then uploaded concurrently, followed by the v1
+    inventory and sidecar, the object declaration, and finally the root
+    inventory and sidecar, so that an incomplete upload is not a valid
+    object.
+
+    Arguments:
+        obj (ocfl.Object): object with the identifier and settings (digest
+            algorithm, fixity, etc.) to use
+        srcdir (str): local source directory with content for v1
+        objdir (str): path or fsw filesystem URL for the object, which must
+            not exist or be empty. Its parent must exist
+        metadata (ocfl.VersionMetadata): metadata object for v1
+        max_requests (int): maximum number of requests in flight
+
+    Returns:
+        ocfl.Inventory: inventory of the new object
+
+    Raises:
+        ObjectException: if the identifier is not set or objdir is not empty
+    """
+    if obj.id is None:
+        raise ObjectException("Identifier is not set!")
+
+    def _build():
+        nv = NewVersion.first_version(srcdir=srcdir,
+                                      identifier=obj.id,
+                                      spec_version=obj.spec_version,
+                                      digest_algorithm=obj.digest_algorithm,
+                                      content_directory=obj.content_directory,
+                                      metadata=metadata,
+                                      fixity=obj.fixity,
+                                      dedupe=obj.dedupe,
+                                      content_path_normalization=obj.content_path_normalization,
+                                      workers=obj.workers)
+        nv.add_from_srcdir()
+        return nv
+
+    nv = await asyncio.to_thread(_build)
+    inventory = nv.inventory
+    parent, name = os.path.split(objdir.rstrip("/"))
+    parent = parent or "."
+    try:
+        parent_afs = await AsyncFs.open(parent, max_requests=max_requests)
+    except FileNotFoundError as e:
+        raise ObjectException("Failed to open object parent directory %s (%s)" % (parent, str(e)))
+    try:
+        if await parent_afs.exists(name) and len(await parent_afs.ls(name)) > 0:
+            raise ObjectException("Object directory %s already exists and is not empty" % (objdir))
+        afs = parent_afs.opendir(name)
+        await asyncio.gather(*(afs.put_file(os.path.join(srcdir, srcpath), objpath)
+                               for srcpath, objpath in nv.files_to_copy.items()))
+        fh = io.StringIO()
+        inventory.write_json(fh)
+        data = fh.getvalue().encode("utf-8")
+        sidecar_name = INVENTORY_FILENAME + "." + obj.digest_algorithm
+        sidecar = (bytes_digest(data, obj.digest_algorithm) + " " + INVENTORY_FILENAME + "\n").encode("utf-8")
+        await asyncio.gather(afs.pipe("v1/" + INVENTORY_FILENAME, data),
+                             afs.pipe("v1/" + sidecar_name, sidecar))
+        declaration = obj.object_declaration_object()
+        await afs.pipe(declaration.filename, (declaration.content + "\n").encode("utf-8"))
+        await afs.pipe(INVENTORY_FILENAME, data)
+        await afs.pipe(sidecar_name, sidecar)
+    finally:
+        await parent_afs.close()
+    logging.info("Created OCFL object %s in %s", obj.id, objdir)
+    return inventory
+
+
+async def object_paths(store, afs=None):
+    """Generate object paths for every object in an OCFL Storage Root.
+
+    Async version of ocfl.StorageRoot.object_paths(). The directories at
+    each level of the hierarchy are listed concurrently, so objects are
+    generated level by level and in sorted order within each level, rather
+    than in depth-first order. Traversal errors are recorded in store.
+
+    Arguments:
+        store (ocfl.StorageRoot): the storage root, which is opened and
+            checked if that has not already been done
+        afs (AsyncFs or None): AsyncFs for the storage root, else None
+            (default) to open one for store.root
+
+    Yields:
+        str: the path to the directory for each object, relative to the
+            storage root
+    """
+    if store.root_fs is None or not store._root_structure_checked:  # pylint: disable=protected-access
+        await asyncio.to_thread(store.open_root_fs)
+        await asyncio.to_thread(store.check_root_structure)
+    root_afs, opened = (afs, False) if afs is not None else (await AsyncFs.open(store.root), True)
+    try:
+        listing = await root_afs.ls("")
+        if "extensions" in listing:
+            await asyncio.to_thread(store.validate_extensions_dir)
+        level = sorted(name for name, info in listing.items()
+                       if info["type"] == "directory" and name != "extensions")
+        while len(level) > 0:
+            listings = await asyncio.gather(*(root_afs.ls(dirpath) for dirpath in level))
+            next_level = []
+            for dirpath, listing in zip(level, listings):
+                dirs = sorted(name for name, info in listing.items() if info["type"] == "directory")
+                files = sorted(name for name, info in listing.items() if info["type"] != "directory")
+                if store.is_object_directory(dirpath, dirs, files):
+                    yield dirpath
+                if len(files) == 0:
+                    next_level += [dirpath + "/" + name for name in dirs]
+            level = next_level
+    finally:
+        if opened:
+            await root_afs.close()
+
+
+async def list_objects(store, read_inventory=False, afs=None):
+    """List the objects in an OCFL Storage Root.
+
+    Async version of ocfl.StorageRoot.list_objects(). Where identifiers are
+    read from inventories, the inventories of the objects found at each
+    level of the hierarchy are read concurrently.
+
+    Arguments:
+        store (ocfl.StorageRoot): the storage root
+        read_inventory (bool): if True then always read the identifier
+            from the object inventory. Default False to take the
+            identifier from the object path where the layout is reversible
+        afs (AsyncFs or None): AsyncFs for the storage root, else None
+            (default) to open one for store.root
+
+    Yields:
+        tuple: for each object, which contains (dirpath, identifier)
+    """
+    root_afs, opened = (afs, False) if afs is not None else (await AsyncFs.open(store.root), True)
+
+    async def _identifier(dirpath):
+        try:
+            inventory = json.loads(await root_afs.cat(dirpath + "/" + INVENTORY_FILENAME))
+            return inventory["id"] if isinstance(inventory.get("id"), str) else "UNKNOWN-ID"
+        except (OSError, ValueError, AttributeError):
+            return "UNKNOWN-ID"
+
+    loop = asyncio.get_running_loop()
+    store.num_objects = 0
+    pending = deque()  # (dirpath, future identifier) in order
+    try:
+        async for dirpath in object_paths(store, afs=root_afs):
+            identifier = None
+            if not read_inventory and store.layout is not None:
+                identifier = store.layout.path_to_identifier(dirpath)
+            if identifier is None:
+                future = asyncio.ensure_future(_identifier(dirpath))
+            else:
+                future = loop.create_future()
+                future.set_result(identifier)
+            pending.append((dirpath, future))
+            while len(pending) > MAX_READ_AHEAD or (len(pending) > 0 and pending[0][1].done()):
+                dirpath, future = pending.popleft()
+                store.num_objects += 1
+                yield (dirpath, await future)
+        while len(pending) > 0:
+            dirpath, future = pending.popleft()
+            store.num_objects += 1
+            yield (dirpath, await future)
+    finally:
+        for _, future in pending:
+            future.cancel()
+        if opened:
+            await root_afs.close()
@@ -0,0 +1,98 @@
+"""Catalog of the files in all objects in an OCFL Storage Root.
+
+For analytics it is useful to have a flat table with one record for every
+logical file in every version of every object, with the content path,
+digest and size. The catalog_records() function generates these records
+by reading each object's root inventory and one listing of the object for
+the file sizes, no content files are read. Objects are read in parallel
+with bounded read-ahead so that the records can be streamed to a JSON
+lines or CSV file for any number of objects.
+
+Example:
+    >>> import ocfl
+    >>> from ocfl.catalog import catalog_records
+    >>> store = ocfl.StorageRoot(root="extra_fixtures/1.0/good-storage-roots/simple-root")
+    >>> len(list(catalog_records(store, workers=4)))
+    11
+"""
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+import logging
+
+from .fsw import fsw_opendir_as_fs, fsw_walk_files_info, FswException
+from .inventory import InventoryException
+from .object import Object
+from .object_utils import ObjectException
+
+
+def catalog_records(store, workers=1):
+    """Generate a catalog record for every file in every object version in store.
+
+    Objects are read on workers threads, each with one read of the
+    inventory and one listing of the object to get file sizes. At most
+    2 * workers objects are read ahead of the records being consumed so
+    that memory use is bounded however many objects there are. Objects
+    that cannot be read are logged and skipped.
+
+    Arguments:
+        store (ocfl.StorageRoot): the storage root
+        workers (int): number of objects to read concurrently
+
+    Yields:
+        dict: for each logical file in each version of each object, a dict
+            with "id", "version", "logical_path", "content_path", "digest"
+            and "size" keys. Records for each object are together and in
+            version order
+
+    Raises:
+        StorageRootException: if the storage root is not valid
+
+    Side effects:
+        store.num_objects is set to the number of objects read and
+        store.errors to a list of (dirpath, message) pairs for the objects
+        that could not be read
+    """
+    store.open_root_fs()
+    store.check_root_structure()
+    store.num_objects = 0
+    store.errors = []
+
+    def _read(dirpath):
+        obj_fs = fsw_opendir_as_fs(fs=store.root_fs, path=dirpath)
+        try:
+            inventory = Object(obj_fs=obj_fs, lax_digests=store.lax_digests).parse_inventory()
+            sizes = {path: info.get("size") for path, info in fsw_walk_files_info(obj_fs, "/").items()}
+        except (ObjectException, InventoryException, FswException, OSError, ValueError) as e:
+            logging.error("Failed to read object at %s: %s", dirpath, str(e))
+            store.errors.append((dirpath, str(e)))
+            return None
+        return inventory, sizes
+
+    def _records(future):
+        result = future.result()
+        if result is None:
+            return
+        store.num_objects += 1
+        inventory, sizes = result
+        for vdir in inventory.version_directories:
+            for digest, logical_paths in inventory.version(vdir).state.items():
+                content_path = inventory.content_path_for_digest(digest)
+                for logical_path in logical_paths:
+                    yield {"id": inventory.id,
+                           "version": vdir,
+                           "logical_path": logical_path,
+                           "content_path": content_path,
+                           "digest": digest,
+                           "size": sizes.get(content_path)}
+
+    executor = ThreadPoolExecutor(max_workers=workers)
+    pending = deque()
+    try:
+        for dirpath in store.object_paths():
+            pending.append(executor.submit(_read, dirpath))
+            if len(pending) >= 2 * workers:
+                yield from _records(pending.popleft())
+        while len(pending) > 0:
+            yield from _records(pending.popleft())
+    finally:
+        executor.shutdown(cancel_futures=True)
@@ -1,11 +1,13 @@
 # -*- coding: utf-8 -*-
 """Utility functions for OCFL command line tools."""
+import argparse
 import logging
 import sys
 
 import os.path
 
 from ._version import __version__
+from .fsw import fsw_set_rate_limit
 
 
 NORMALIZATIONS = ["uri", "md5"]  # Must match possibilities in map_filepaths()
@@ -74,6 +76,9 @@ def add_object_args(parser):
     # Validation settings
     parser.add_argument("--lax-digests", action="store_true",
                         help="allow use of any known digest")
+    # Performance
+    parser.add_argument("--workers", type=int, default=1,
+                        help="number of threads used to digest files")
 
 
 def add_verbosity_args(parser):
@@ -107,13 +112,79 @@ def check_verbosity_args(args):
     logging.basicConfig(level=level)
 
 
+def parse_byte_rate(value):
+    """Parse bytes per second value with optional K, M or G suffix.
+
+    Suffixes are for multiples of 1024 and may be followed by "B" or "iB",
+    so "10M", "10MB" and "10MiB" are all 10485760.
+
+    Arguments:
+        value (str): value to parse
+
+    Returns:
+        float: bytes per second
+
+    Raises:
+        argparse.ArgumentTypeError: if value is not a positive number with
+            optional suffix
+    """
+    multipliers = {"": 1, "K": 1024, "M": 1024 ** 2, "G": 1024 ** 3}
+    v = value.strip().upper()
+    for ending in ("IB", "B"):
+        if v.endswith(ending) and len(v) > len(ending) and v[-len(ending) - 1] in multipliers:
+            v = v[:-len(ending)]
+            break
+    suffix = v[-1:] if v[-1:] in ("K", "M", "G") else ""
+    try:
+        rate = float(v[:len(v) - len(suffix)]) * multipliers[suffix]
+    except ValueError:
+        rate = 0
+    if rate <= 0:
+        raise argparse.ArgumentTypeError("bad bytes per second value '%s'" % (value))
+    return rate
+
+
+def add_rate_limit_args(parser):
+    """Add arguments to limit the rate of storage access.
+
+    Arguments:
+        parser: argparse.ArgumentParser() object.
+    """
+    parser.add_argument("--max-bytes-per-sec", type=parse_byte_rate, default=None,
+                        help="limit on bytes read and written per second, with optional "
+                        "K, M or G suffix for multiples of 1024 (default no limit)")
+    parser.add_argument("--max-ops-per-sec", type=float, default=None,
+                        help="limit on storage operations such as opening files and "
+                        "listing directories per second (default no limit)")
+
+
+def check_rate_limit_args(args):
+    """Check rate limit arguments and set the global rate limit.
+
+    Arguments:
+        args (Namespace): Namespace object with arguments from argparse, of
+            which max_bytes_per_sec and max_ops_per_sec are used if present.
+    """
+    bytes_per_sec = getattr(args, "max_bytes_per_sec", None)
+    ops_per_sec = getattr(args, "max_ops_per_sec", None)
+    if bytes_per_sec is not None or ops_per_sec is not None:
+        logging.info("Limiting storage access to %s bytes/s and %s operations/s",
+                     bytes_per_sec or "unlimited", ops_per_sec or "unlimited")
+        fsw_set_rate_limit(bytes_per_sec=bytes_per_sec, ops_per_sec=ops_per_sec)
+
+
 def validate_object(obj, objdir, log_warnings=True,
-                    log_errors=True, check_digests=True):
+                    log_errors=True, check_digests=True, *, workers=1,
+                    max_memory=None, level=None, fail_fast=False):
     """Validate object with control of console output.
 
     Arguments:
         obj: Object() instance
         path: Path to object
+        workers: number of threads used to read version inventories
+        max_memory: approximate memory limit in bytes for checking content
+        level: validation level, None to use check_digests
+        fail_fast: True to stop at the first error
 
     Returns True if passed validation, False if failed.
 
@@ -125,7 +196,11 @@ def validate_object(obj, objdir, log_warnings=True,
     passed, validator = obj.validate(objdir=objdir,
                                      log_warnings=log_warnings,
                                      log_errors=log_errors,
-                                     check_digests=check_digests)
+                                     check_digests=check_digests,
+                                     workers=workers,
+                                     max_memory=max_memory,
+                                     level=level,
+                                     fail_fast=fail_fast)
     messages = str(validator)
     if messages != "":
         print(messages)
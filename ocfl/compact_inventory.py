@@ -0,0 +1,298 @@
+"""Compact read-only storage for OCFL inventory data.
+
+The normal ocfl.Inventory storage is the dict structure from parsing the
+inventory JSON. For objects with millions of files and many versions this
+takes a lot of memory because every content path repeats the version and
+content directory prefix, every logical path is stored again for each version
+it appears in, and every digest is a long hex string.
+
+This module builds an alternative representation of the same data where:
+
+  * paths are stored as nodes in a trie of interned path components so that
+    common prefixes and repeated names are stored only once
+  * digests are stored in binary form in a single sorted bytes object, and
+    the manifest, fixity and state blocks refer to them by index using arrays
+    of integers
+  * version blocks are records with __slots__
+
+The manifest, fixity and state blocks are read-only Mapping objects that
+produce the same digest -> [paths] view as the JSON dicts, so the read
+methods of ocfl.Inventory and ocfl.Version work unchanged. Use
+ocfl.Inventory.compact() rather than calling this module directly.
+
+Example:
+    >>> import ocfl
+    >>> inv = ocfl.Inventory(filepath="fixtures/1.1/good-objects/spec-ex-full/inventory.json")
+    >>> cinv = inv.compact()
+    >>> cinv.version("v2").content_path_for_logical_path("foo/bar.xml")
+    'v2/content/foo/bar.xml'
+"""
+from array import array
+from bisect import bisect_left
+from collections.abc import Mapping
+import re
+
+HEX_DIGEST_REGEX = re.compile(r"""^(?:[0-9a-f]{2})+$""")
+
+
+class DigestTable():
+    """Sorted table of unique digests.
+
+    Lowercase hex digests of the same length are stored in binary form in one
+    bytes object, other digests are stored as a sorted list of strings.
+    """
+
+    __slots__ = ("_width", "_digests", "_size", "_lookup")
+
+    def __init__(self, digests):
+        """Initialize DigestTable with an iterable of digest strings."""
+        digests = sorted(set(digests))
+        self._lookup = {d: n for n, d in enumerate(digests)}  # only used while building
+        lengths = set(len(d) for d in digests)
+        if (len(lengths) == 1
+                and all(HEX_DIGEST_REGEX.match(d) for d in digests)):
+            self._width = lengths.pop() // 2
+            self._digests = b"".join(bytes.fromhex(d) for d in digests)
+        else:
+            self._width = 0
+            self._digests = digests
+        self._size = len(digests)
+
+    def freeze(self):
+        """Drop the index used while building blocks."""
+        self._lookup = None
+
+    def __len__(self):
+        """Return the number of digests in the table."""
+        return self._size
+
+    def __getitem__(self, index):
+        """Digest string at index."""
+        if self._width == 0:
+            return self._digests[index]
+        if index < 0 or index >= self._size:
+            raise IndexError(index)
+        return self._digests[index * self._width:(index + 1) * self._width].hex()
+
+    def index(self, digest):
+        """Index of digest in the table.
+
+        Raises:
+            KeyError: if the digest is not in the table
+        """
+        if self._lookup is not None:
+            return self._lookup[digest]
+        if self._width == 0:
+            key = digest
+            values = self._digests
+        else:
+            if len(digest) != self._width * 2 or not HEX_DIGEST_REGEX.match(digest):
+                raise KeyError(digest)
+            key = bytes.fromhex(digest)
+            values = None
+        lo, hi = 0, self._size
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if values is None:
+                value = self._digests[mid * self._width:(mid + 1) * self._width]
+            else:
+                value = values[mid]
+            if value < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo < self._size and self[lo] == digest:
+            return lo
+        raise KeyError(digest)
+
+
+class PathTable():
+    """Trie of paths with interned path components.
+
+    Each path is identified by an integer node id, node 0 is the empty root
+    path. Nodes are stored as the index of their parent node and their last
+    path component.
+    """
+
+    __slots__ = ("_names", "_parents", "_nodes", "_interned")
+
+    def __init__(self):
+        """Initialize PathTable with just the root node."""
+        self._names = [""]
+        self._parents = array("i", [-1])
+        self._nodes = {}  # (parent, name) -> node, only used while adding
+        self._interned = {}  # name -> name, only used while adding
+
+    def add(self, path):
+        """Add path to the table if not already present.
+
+        Returns:
+            int: the node id for path
+        """
+        node = 0
+        for name in path.split("/"):
+            child = self._nodes.get((node, name))
+            if child is None:
+                child = len(self._names)
+                self._names.append(self._interned.setdefault(name, name))
+                self._parents.append(node)
+                self._nodes[(node, name)] = child
+            node = child
+        return node
+
+    def freeze(self):
+        """Drop the indexes used while adding paths."""
+        self._nodes = None
+        self._interned = None
+
+    def path(self, node):
+        """Path string for node."""
+        names = []
+        while node > 0:
+            names.append(self._names[node])
+            node = self._parents[node]
+        return "/".join(reversed(names))
+
+
+class CompactBlock(Mapping):
+    """Read-only digest -> [paths] mapping for a manifest, fixity or state block.
+
+    Entries are held in sorted digest index order as an array of digest
+    indexes, with an array of offsets into an array of path node ids.
+    """
+
+    __slots__ = ("_digest_table", "_path_table", "_digest_ids", "_offsets", "_path_ids")
+
+    def __init__(self, block, digest_table, path_table):
+        """Initialize CompactBlock.
+
+        Arguments:
+            block (dict): digest -> [paths] data to store
+            digest_table (DigestTable): table that includes all the digests
+                in block
+            path_table (PathTable): table to add paths to
+
+        Raises:
+            KeyError: if a digest in block is not in digest_table
+        """
+        self._digest_table = digest_table
+        self._path_table = path_table
+        self._digest_ids = array("i")
+        self._offsets = array("i", [0])
+        self._path_ids = array("i")
+        for digest_id, paths in sorted((digest_table.index(d), p) for d, p in block.items()):
+            self._digest_ids.append(digest_id)
+            for path in paths:
+                self._path_ids.append(path_table.add(path))
+            self._offsets.append(len(self._path_ids))
+
+    def _position(self, digest):
+        """Position of digest in this block, else None."""
+        try:
+            digest_id = self._digest_table.index(digest)
+        except KeyError:
+            return None
+        pos = bisect_left(self._digest_ids, digest_id)
+        if pos < len(self._digest_ids) and self._digest_ids[pos] == digest_id:
+            return pos
+        return None
+
+    def __getitem__(self, digest):
+        """List of paths for digest."""
+        pos = self._position(digest)
+        if pos is None:
+            raise KeyError(digest)
+        path = self._path_table.path
+        return [path(p) for p in self._path_ids[self._offsets[pos]:self._offsets[pos + 1]]]
+
+    def __contains__(self, digest):
+        """Return True if digest is in this block."""
+        return self._position(digest) is not None
+
+    def __iter__(self):
+        """Iterate over the digests in this block."""
+        for digest_id in self._digest_ids:
+            yield self._digest_table[digest_id]
+
+    def __len__(self):
+        """Return the number of digests in this block."""
+        return len(self._digest_ids)
+
+
+class CompactVersionBlock(Mapping):
+    """Read-only record for the data in one version block."""
+
+    __slots__ = ("created", "message", "user", "state", "_other")
+
+    KEYS = ("created", "message", "user", "state")
+
+    def __init__(self, data, digest_table, path_table):
+        """Initialize CompactVersionBlock from the dict data for a version."""
+        self.created = data.get("created")
+        self.message = data.get("message")
+        self.user = dict(data["user"]) if "user" in data else None
+        self.state = CompactBlock(data["state"], digest_table, path_table) if "state" in data else None
+        other = {k: v for k, v in data.items() if k not in self.KEYS}
+        self._other = other if other else None
+
+    def __getitem__(self, key):
+        """Value of key in the version block."""
+        value = getattr(self, key, None) if key in self.KEYS else None
+        if value is None:
+            if self._other is None:
+                raise KeyError(key)
+            return self._other[key]
+        return value
+
+    def __iter__(self):
+        """Iterate over keys present in the version block."""
+        for key in self.KEYS:
+            if getattr(self, key) is not None:
+                yield key
+        if self._other is not None:
+            yield from self._other
+
+    def __len__(self):
+        """Return the number of keys present in the version block."""
+        return sum(1 for _ in self)
+
+
+def compact_inventory_data(data):
+    """Build compact inventory data from inventory dict data.
+
+    The inventory should be valid and have normalized digests. In
+    particular, every state digest must be in the manifest. Blocks iterate
+    over digests in sorted order rather than the order in data.
+
+    Arguments:
+        data (dict): the JSON data of an inventory
+
+    Returns:
+        dict: top level inventory data with compact manifest, fixity and
+            versions blocks, other top level values are shared with data
+
+    Raises:
+        KeyError: if a digest in a version state is not in the manifest
+    """
+    path_table = PathTable()
+    compact = {}
+    for key, value in data.items():
+        if key not in ("manifest", "fixity", "versions"):
+            compact[key] = value
+    manifest = data.get("manifest", {})
+    digest_table = DigestTable(manifest.keys())
+    if "manifest" in data:
+        compact["manifest"] = CompactBlock(manifest, digest_table, path_table)
+    if "fixity" in data:
+        compact["fixity"] = {}
+        for digest_algorithm, block in data["fixity"].items():
+            fixity_table = DigestTable(block.keys())
+            compact["fixity"][digest_algorithm] = CompactBlock(block, fixity_table, path_table)
+            fixity_table.freeze()
+    if "versions" in data:
+        compact["versions"] = {}
+        for vdir, version_data in data["versions"].items():
+            compact["versions"][vdir] = CompactVersionBlock(version_data, digest_table, path_table)
+    digest_table.freeze()
+    path_table.freeze()
+    return compact
@@ -14,3 +14,16 @@ DEFAULT_DIGEST_ALGORITHM = "sha512"
 
 DEFAULT_CONTENT_DIRECTORY = "content"
 """str: default content directy name if none is specified."""
+
+VALIDATION_LEVELS = ("declaration", "inventory", "content", "digests", "fixity")
+"""tuple of str: object validation levels in increasing order of work done.
+
+  * declaration: object declaration, and that the root inventory sidecar is
+    present and matches the inventory, without parsing the inventory
+  * inventory: also full checks of all inventories and the object structure
+  * content: also the presence of all content files, without digests
+  * digests: also the digests of content files using the inventory digest
+    algorithm
+  * fixity: also the digests of content files for all other digest
+    algorithms in fixity blocks and prior version inventories
+"""
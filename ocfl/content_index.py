@@ -0,0 +1,262 @@
+"""Index of the content of all objects in an OCFL Storage Root.
+
+Questions such as which objects contain a file with a given digest, or how
+many bytes are stored more than once across a storage root, would otherwise
+need every inventory to be read and parsed. The ContentIndex class keeps a
+SQLite database with the manifest entries (digest, content path and size)
+and version state entries (version, logical path and digest) of each object,
+with covering indexes so that lookups by digest or logical path read only
+the index.
+
+The index is built by a scan of the storage root where objects are read on
+worker threads. For each object the root inventory sidecar digest is
+recorded, so that when the index is updated only objects whose root
+inventory has changed are read again. File sizes come from a listing of the
+object, no content files are read.
+
+Example:
+    >>> import ocfl
+    >>> from ocfl.content_index import ContentIndex
+    >>> store = ocfl.StorageRoot(root="extra_fixtures/1.0/good-storage-roots/simple-root")
+    >>> with ContentIndex("/tmp/index.sqlite") as index:
+    ...     counts = index.update(store, workers=4)
+    ...     [r["id"] for r in index.find_logical_path("a_file.txt")]
+    ['ark:123/abc', 'http://example.org/minimal_mixed_digests']
+"""
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+import logging
+import sqlite3
+
+from .fsw import fsw_opendir_as_fs, fsw_walk_files_info, FswException
+from .inventory import InventoryException
+from .inventory_cache import read_sidecar_key
+from .object import Object
+from .object_utils import parse_version_directory, ObjectException
+
+SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS objects (object_path TEXT PRIMARY KEY, id TEXT, "
+    "digest_algorithm TEXT, sidecar TEXT)",
+    "CREATE TABLE IF NOT EXISTS contents (object_path TEXT, digest TEXT, content_path TEXT, size INTEGER)",
+    "CREATE TABLE IF NOT EXISTS states (object_path TEXT, version TEXT, logical_path TEXT, digest TEXT)",
+    "CREATE INDEX IF NOT EXISTS contents_by_digest ON contents (digest, object_path, content_path, size)",
+    "CREATE INDEX IF NOT EXISTS contents_by_object ON contents (object_path)",
+    "CREATE INDEX IF NOT EXISTS states_by_digest ON states (digest, object_path, version, logical_path)",
+    "CREATE INDEX IF NOT EXISTS states_by_logical_path ON states (logical_path, object_path, version, digest)",
+    "CREATE INDEX IF NOT EXISTS states_by_object ON states (object_path)")
+COMMIT_EVERY = 100  # Number of objects written between commits
+
+
+class ContentIndexException(Exception):
+    """Exception class for ContentIndex."""
+
+
+def _sidecar_str(key):
+    """Return string form of a sidecar key tuple for storage, or None."""
+    return None if key is None else "%s:%s" % key
+
+
+class ContentIndex():
+    """SQLite index of the manifests and version states of objects.
+
+    Attributes:
+        db_path (str): path of the SQLite database file
+    """
+
+    def __init__(self, db_path):
+        """Initialize ContentIndex, creating the database if necessary.
+
+        Arguments:
+            db_path (str): path of the local SQLite database file
+
+        Raises:
+            ContentIndexException: if the database cannot be opened
+        """
+        self.db_path = db_path
+        try:
+            self._db = sqlite3.connect(db_path)
+            for statement in SCHEMA:
+                self._db.execute(statement)
+            self._db.commit()
+        except sqlite3.Error as e:
+            raise ContentIndexException("Cannot open content index %s (%s)" % (db_path, str(e)))
+
+    def __enter__(self):
+        """Context manager entry, returns self."""
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        """Context manager exit, closes the database."""
+        self.close()
+
+    def close(self):
+        """Close the database."""
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+    def update(self, storage_root, workers=1):
+        """Update the index for the objects in storage_root.
+
+        Objects are read concurrently on workers threads, with at most
+        2 * workers objects read ahead of those written to the index so that
+        memory use is bounded however many objects there are. An object is
+        only read if its root inventory sidecar digest differs from the one
+        recorded in the index. Objects in the index that are no longer in the
+        storage root are removed. Objects that cannot be read are logged and
+        their entries, if any, are left unchanged.
+
+        Arguments:
+            storage_root (ocfl.StorageRoot): the storage root to index
+            workers (int): number of objects to read concurrently
+
+        Returns:
+            dict: counts of objects with each status "added", "updated",
+                "unchanged", "removed" and "error"
+
+        Raises:
+            StorageRootException: if the storage root is not valid
+        """
+        storage_root.open_root_fs()
+        storage_root.check_root_structure()
+        indexed = dict(self._db.execute("SELECT object_path, sidecar FROM objects"))
+        counts = {"added": 0, "updated": 0, "unchanged": 0, "removed": 0, "error": 0}
+
+        def _read(dirpath):
+            try:
+                return dirpath, _read_object(storage_root, dirpath, indexed.get(dirpath))
+            except (ObjectException, InventoryException, FswException, OSError, ValueError) as e:
+                logging.error("Failed to index object at %s: %s", dirpath, str(e))
+                return dirpath, None
+
+        seen = set()
+
+        def _write(future):
+            dirpath, data = future.result()
+            seen.add(dirpath)
+            if data is None:
+                counts["error"] += 1
+            elif data == "unchanged":
+                counts["unchanged"] += 1
+            else:
+                counts["updated" if dirpath in indexed else "added"] += 1
+                self._write_object(dirpath, *data)
+                if (counts["added"] + counts["updated"]) % COMMIT_EVERY == 0:
+                    self._db.commit()
+
+        executor = ThreadPoolExecutor(max_workers=workers)
+        pending = deque()
+        try:
+            for dirpath in storage_root.object_paths():
+                pending.append(executor.submit(_read, dirpath))
+                if len(pending) >= 2 * workers:
+                    _write(pending.popleft())
+            while len(pending) > 0:
+                _write(pending.popleft())
+        finally:
+            executor.shutdown(cancel_futures=True)
+        for dirpath in set(indexed.keys()) - seen:
+            self._delete_object(dirpath)
+            self._db.execute("DELETE FROM objects WHERE object_path = ?", (dirpath,))
+            counts["removed"] += 1
+        self._db.commit()
+        return counts
+
+    def _delete_object(self, dirpath):
+        """Delete the manifest and state entries for the object at dirpath."""
+        self._db.execute("DELETE FROM contents WHERE object_path = ?", (dirpath,))
+        self._db.execute("DELETE FROM states WHERE object_path = ?", (dirpath,))
+
+    def _write_object(self, dirpath, sidecar, inventory, sizes):
+        """Write the index entries for the object at dirpath."""
+        self._delete_object(dirpath)
+        self._db.execute("INSERT OR REPLACE INTO objects VALUES (?, ?, ?, ?)",
+                         (dirpath, inventory.id, inventory.digest_algorithm, sidecar))
+        self._db.executemany("INSERT INTO contents VALUES (?, ?, ?, ?)",
+                             ((dirpath, digest, content_path, sizes.get(content_path))
+                              for digest, content_paths in inventory.manifest.items()
+                              for content_path in content_paths))
+        self._db.executemany("INSERT INTO states VALUES (?, ?, ?, ?)",
+                             ((dirpath, vdir, logical_path, digest)
+                              for vdir in inventory.version_directories
+                              for digest, logical_paths in inventory.version(vdir).state.items()
+                              for logical_path in logical_paths))
+
+    def _find(self, column, value):
+        """Version state entries where column has value, with content paths."""
+        rows = self._db.execute(
+            "SELECT o.id, s.object_path, s.version, s.logical_path, s.digest, "
+            "(SELECT MIN(c.content_path) FROM contents c "
+            "WHERE c.digest = s.digest AND c.object_path = s.object_path) "
+            "FROM states s JOIN objects o ON o.object_path = s.object_path "
+            "WHERE s." + column + " = ?", (value,))
+        results = [{"id": row[0], "object_path": row[1], "version": row[2],
+                    "logical_path": row[3], "digest": row[4], "content_path": row[5]}
+                   for row in rows]
+        return sorted(results, key=lambda r: (r["object_path"], parse_version_directory(r["version"]), r["logical_path"]))
+
+    def find_digest(self, digest):
+        """Find the files with a given digest.
+
+        Arguments:
+            digest (str): digest of the file content, with any digest
+                algorithm used by objects in the index
+
+        Returns:
+            list: of dicts with the "id", "object_path", "version",
+                "logical_path", "digest" and "content_path" of each file in
+                any version of any object with digest, sorted by object path
+                and then version
+        """
+        return self._find("digest", digest.lower())
+
+    def find_logical_path(self, logical_path):
+        """Find the files with a given logical path.
+
+        Arguments:
+            logical_path (str): logical path of the file in a version
+
+        Returns:
+            list: of dicts as for find_digest()
+        """
+        return self._find("logical_path", logical_path)
+
+    def stats(self):
+        """Statistics for all content files in the index.
+
+        Returns:
+            dict: with "objects", the number of objects, "files" and "bytes",
+                the number and total size of content files, "unique_files"
+                and "unique_bytes", the number and total size of distinct
+                digests, and "duplicate_bytes", the bytes that could be saved
+                if content with the same digest were stored only once across
+                all objects
+        """
+        objects = self._db.execute("SELECT COUNT(*) FROM objects").fetchone()[0]
+        files, total = self._db.execute("SELECT COUNT(*), TOTAL(size) FROM contents").fetchone()
+        unique_files, unique = self._db.execute(
+            "SELECT COUNT(*), TOTAL(size) FROM "
+            "(SELECT MAX(size) AS size FROM contents GROUP BY digest)").fetchone()
+        return {"objects": objects,
+                "files": files,
+                "bytes": int(total),
+                "unique_files": unique_files,
+                "unique_bytes": int(unique),
+                "duplicate_bytes": int(total - unique)}
+
+
+def _read_object(storage_root, dirpath, indexed_sidecar):
+    """Read the data to index for the object at dirpath.
+
+    Returns:
+        str or tuple: "unchanged" if the root inventory sidecar matches
+            indexed_sidecar, else (sidecar, inventory, sizes) where sizes is
+            a dict of content path to file size
+    """
+    obj_fs = fsw_opendir_as_fs(fs=storage_root.root_fs, path=dirpath)
+    sidecar = _sidecar_str(read_sidecar_key(obj_fs))
+    if sidecar is not None and sidecar == indexed_sidecar:
+        return "unchanged"
+    inventory = Object(obj_fs=obj_fs, lax_digests=storage_root.lax_digests).parse_inventory(use_cache=True)
+    sizes = {path: info.get("size") for path, info in fsw_walk_files_info(obj_fs, "/").items()}
+    return (sidecar, inventory, sizes)
@@ -1,4 +1,5 @@
 """Digest handling for OCFL."""
+from concurrent.futures import ThreadPoolExecutor
 import hashlib
 
 from .fsw import fsw_openfile
@@ -18,6 +19,46 @@ def _file_digest(fs, filename, digester):
     return digester.hexdigest()
 
 
+def _new_digester(digest_type):
+    """Create a new digester object for digest_type.
+
+    Raises a ValueError exception if the digest_type is not supported.
+    """
+    # From spec
+    if digest_type in ("sha512", "sha512-spec-ex"):
+        return hashlib.sha512()
+    if digest_type in ("sha256", "sha256-spec-ex"):
+        return hashlib.sha256()
+    if digest_type == "sha1":
+        return hashlib.sha1()
+    if digest_type == "md5":
+        return hashlib.md5()
+    if digest_type == "blake2b-512":
+        return hashlib.blake2b()
+    # From extensions
+    if digest_type == "blake2b-160":
+        return hashlib.blake2b(digest_size=20)
+    if digest_type == "blake2b-256":
+        return hashlib.blake2b(digest_size=32)
+    if digest_type == "blake2b-384":
+        return hashlib.blake2b(digest_size=48)
+    raise ValueError("Unsupport digest type %s" % (digest_type))
+
+
+def _format_digest(hexdigest, digest_type):
+    """Format hexdigest for digest_type.
+
+    Specification examples: 15/6 chars ... 3 chars. The truncated sha512 is
+    twice as many chars as the truncated sha256 to give a appropriate
+    impression in examples.
+    """
+    if digest_type == "sha512-spec-ex":
+        return hexdigest[:15] + "..." + hexdigest[-3:]
+    if digest_type == "sha256-spec-ex":
+        return hexdigest[:6] + "..." + hexdigest[-3:]
+    return hexdigest
+
+
 def file_digest(filename, digest_type="sha512", fs=None):
     """Digest of digest_type for file filename in normalized form.
 
@@ -38,34 +79,147 @@ def file_digest(filename, digest_type="sha512", fs=None):
 
     Raises a ValueError exception if the digest_type is not supported.
     """
-    # From spec
-    if digest_type == "sha512":
-        return _file_digest(fs, filename, hashlib.sha512())
-    if digest_type == "sha256":
-        return _file_digest(fs, filename, hashlib.sha256())
-    if digest_type == "sha1":
-        return _file_digest(fs, filename, hashlib.sha1())
-    if digest_type == "md5":
-        return _file_digest(fs, filename, hashlib.md5())
-    if digest_type == "blake2b-512":
-        return _file_digest(fs, filename, hashlib.blake2b())
-    # From extensions
-    if digest_type == "blake2b-160":
-        return _file_digest(fs, filename, hashlib.blake2b(digest_size=20))
-    if digest_type == "blake2b-256":
-        return _file_digest(fs, filename, hashlib.blake2b(digest_size=32))
-    if digest_type == "blake2b-384":
-        return _file_digest(fs, filename, hashlib.blake2b(digest_size=48))
-    # Specification examples: 15/6 chars ... 3 chars. The truncated
-    # sha512 is twice as many chars as the truncated sha256 to give
-    # a appropriate impression in examples
-    if digest_type == "sha512-spec-ex":
-        d = _file_digest(fs, filename, hashlib.sha512())
-        return d[:15] + "..." + d[-3:]
-    if digest_type == "sha256-spec-ex":
-        d = _file_digest(fs, filename, hashlib.sha256())
-        return d[:6] + "..." + d[-3:]
-    raise ValueError("Unsupport digest type %s" % (digest_type))
+    digester = _new_digester(digest_type)
+    return _format_digest(_file_digest(fs, filename, digester), digest_type)
+
+
+class MultiDigester():
+    """Digests of several digest types for data supplied in chunks.
+
+    Example:
+        >>> digester = MultiDigester(["md5", "sha1"])
+        >>> digester.update(b"abc")
+        >>> digester.digests()["md5"]
+        '900150983cd24fb0d6963f7d28e17f72'
+    """
+
+    def __init__(self, digest_types):
+        """Initialize MultiDigester.
+
+        Arguments:
+            digest_types: iterable of digest type strings
+
+        Raises a ValueError exception if a digest_type is not supported.
+        """
+        self._digesters = {digest_type: _new_digester(digest_type) for digest_type in digest_types}
+
+    def update(self, data):
+        """Add bytes data to all digests."""
+        for digester in self._digesters.values():
+            digester.update(data)
+
+    def digests(self):
+        """Return dict of digest_type -> digest string in normalized form."""
+        return {digest_type: _format_digest(digester.hexdigest(), digest_type)
+                for digest_type, digester in self._digesters.items()}
+
+
+def file_multi_digest(filename, digest_types, fs=None):
+    """Digests of several digest_types for file filename from one read.
+
+    Arguments:
+        filename: string with name of file to calculate digests for
+        digest_types: iterable of digest type strings
+        fs: None for local file, else a filesystem object within
+            which filename exists
+
+    Returns dict of digest_type -> digest string.
+
+    Raises a ValueError exception if a digest_type is not supported.
+    """
+    digester = MultiDigester(digest_types)
+    with fsw_openfile(filename, "rb", fs=fs) as fh:
+        for b in iter(lambda: fh.read(BUFSIZE), b""):
+            digester.update(b)
+    return digester.digests()
+
+
+def _map_files(func, filenames, workers, sizes):
+    """Return dict of filename -> func(filename), run on workers threads, largest first."""
+    filenames = list(filenames)
+    if workers <= 1 or len(filenames) <= 1:
+        return {filename: func(filename) for filename in filenames}
+    if sizes is not None:
+        filenames.sort(key=lambda filename: sizes.get(filename, 0), reverse=True)
+    results = {}
+    executor = ThreadPoolExecutor(max_workers=workers)
+    try:
+        futures = [(filename, executor.submit(func, filename)) for filename in filenames]
+        for filename, future in futures:
+            results[filename] = future.result()
+    finally:
+        executor.shutdown(cancel_futures=True)
+    return results
+
+
+def file_digests(filenames, digest_type="sha512", fs=None, workers=1, sizes=None):
+    """Digests of digest_type for a set of files, optionally in parallel.
+
+    With more than one worker the files are digested on a pool of threads
+    (hashlib releases the GIL while digesting so this uses multiple cores).
+    If sizes are given then the largest files are started first so that a
+    large file started late doesn't leave the other workers idle at the end.
+
+    Arguments:
+        filenames: iterable of names of files to calculate digests for
+        digest_type: string of digest type
+        fs: None for local files, else a filesystem object within which
+            the files exist
+        workers (int): number of threads to use, default 1
+        sizes (dict or None): dict of filename -> size used for ordering
+
+    Returns dict of filename -> digest string.
+
+    Raises a ValueError exception if the digest_type is not supported, or
+    the first exception from reading a file.
+    """
+    _new_digester(digest_type)  # Check supported before starting any work
+    return _map_files(lambda filename: file_digest(filename, digest_type, fs=fs),
+                      filenames, workers, sizes)
+
+
+def file_multi_digests(filenames, digest_types, fs=None, workers=1, sizes=None):
+    """Digests of several digest_types for a set of files, one read per file.
+
+    Like file_digests() but calculating all of digest_types for each file
+    with file_multi_digest().
+
+    Arguments:
+        filenames: iterable of names of files to calculate digests for
+        digest_types: iterable of digest type strings
+        fs: None for local files, else a filesystem object within which
+            the files exist
+        workers (int): number of threads to use, default 1
+        sizes (dict or None): dict of filename -> size used for ordering
+
+    Returns dict of filename -> dict of digest_type -> digest string.
+
+    Raises a ValueError exception if a digest_type is not supported, or
+    the first exception from reading a file.
+    """
+    digest_types = list(digest_types)
+    for digest_type in digest_types:
+        _new_digester(digest_type)  # Check supported before starting any work
+    return _map_files(lambda filename: file_multi_digest(filename, digest_types, fs=fs),
+                      filenames, workers, sizes)
+
+
+def bytes_digest(data, digest_type="sha512"):
+    """Digest of digest_type for bytes data in normalized form.
+
+    Supports the same digest_type values as file_digest().
+
+    Arguments:
+        data: bytes to calculate digest for
+        digest_type: string of digest type
+
+    Returns digest string.
+
+    Raises a ValueError exception if the digest_type is not supported.
+    """
+    digester = _new_digester(digest_type)
+    digester.update(data)
+    return _format_digest(digester.hexdigest(), digest_type)
 
 
 def string_digest(txt, digest_type="sha512"):
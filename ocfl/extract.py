@@ -0,0 +1,98 @@
+"""Incremental update of an extracted version of an OCFL Object.
+
+Extracting a version of an object with ocfl.Object.extract() copies every
+file in the version. When a copy of one version has already been extracted,
+update_extracted() instead changes it in place to be a copy of another
+version, copying only the files that are added or changed between the two
+versions and removing files that are not in the new version.
+
+Example:
+    >>> import ocfl
+    >>> from ocfl.extract import update_extracted
+    >>> obj = ocfl.Object()
+    >>> objdir = "fixtures/1.1/good-objects/spec-ex-full"
+    >>> metadata = obj.extract(objdir, "v1", "/tmp/spec-ex-full")
+    >>> update_extracted(obj, objdir, "/tmp/spec-ex-full", "v1", "v3").version
+    'v3'
+"""
+import logging
+import os.path
+
+from .digest import file_digest
+from .fsw import fsw_openfs, fsw_copyfile
+from .object_utils import ObjectException
+from .version_metadata import VersionMetadata
+
+
+def update_extracted(obj, objdir, dstdir, from_version, to_version="head", *,
+                     check_base=False):
+    """Update an extracted copy of from_version in dstdir to be to_version.
+
+    Arguments:
+        obj (ocfl.Object): instance used to read the object
+        objdir (str): directory for the object
+        dstdir (str): directory containing a previous extraction of
+            from_version (e.g. with ocfl.Object.extract())
+        from_version (str): version that dstdir currently holds ("v1", etc.)
+        to_version (str): version to update dstdir to ("v2", etc.) or
+            "head" (default) for latest
+        check_base (bool): if True then check that the files in dstdir
+            match the logical paths and digests of from_version before
+            making any changes. Default False
+
+    Returns:
+        ocfl.VersionMetadata: metadata object for to_version.
+
+    Raises:
+        ocfl.ObjectException: if either version doesn't exist, if dstdir
+            cannot be opened, or if check_base is set and dstdir does not
+            hold from_version.
+
+    Only files added or changed between the two versions are copied, and
+    files for logical paths not in to_version are removed along with any
+    directories left empty. Files in dstdir that are not part of
+    from_version are left untouched unless they are overwritten by a file
+    in to_version. The versions need not be adjacent, and from_version may
+    be later than to_version.
+    """
+    obj.open_obj_fs(objdir)
+    inv = obj.parse_inventory(use_cache=True)
+    if to_version == "head":
+        to_version = inv.head
+    if from_version == "head":
+        from_version = inv.head
+    for version in (to_version, from_version):
+        if version not in inv.version_directories:
+            raise ObjectException("Object at %s does not include a version '%s'" % (objdir, version))
+    try:
+        dst_fs = fsw_openfs(dstdir)
+    except FileNotFoundError as e:
+        raise ObjectException("Destination %s does not exist or could not be opened (%s)" % (dstdir, e))
+    if check_base:
+        for (digest, logical_files) in inv.version(from_version).state.items():
+            for logical_file in logical_files:
+                if not dst_fs.exists(logical_file):
+                    raise ObjectException("Destination %s is missing %s from %s" % (dstdir, logical_file, from_version))
+                if file_digest(logical_file, inv.digest_algorithm, fs=dst_fs) != digest:
+                    raise ObjectException("Destination %s has %s that does not match %s" % (dstdir, logical_file, from_version))
+    manifest = inv.manifest
+    diff = inv.diff_versions(from_version, to_version)
+    added = set(lp for (op, digest, lp) in diff if op == "A")
+    # Deletes first so that we can then tidy empty directories, a logical
+    # path with changed content is simply overwritten
+    for (op, digest, logical_file) in diff:
+        if op == "D" and logical_file not in added:
+            logging.debug("Removing %s", logical_file)
+            if dst_fs.exists(logical_file):
+                dst_fs.rm(logical_file)
+            dirpath = os.path.dirname(logical_file)
+            while dirpath != "" and dst_fs.isdir(dirpath) and len(dst_fs.listdir(dirpath, detail=False)) == 0:
+                dst_fs.rmdir(dirpath)
+                dirpath = os.path.dirname(dirpath)
+    for (op, digest, logical_file) in diff:
+        if op == "A":
+            logging.debug("Copying %s -> %s", digest, logical_file)
+            dst_fs.makedirs(os.path.dirname(logical_file), exist_ok=True)
+            fsw_copyfile(obj.obj_fs, manifest[digest][0], dst_fs, logical_file)
+    logging.info("Updated %s in %s to %s (%d changes)", from_version, dstdir, to_version, len(diff))
+    return VersionMetadata(inventory=inv.data, version=to_version)
@@ -15,10 +15,21 @@ exists.
 It seems to be the case the using `strict=False` avoids checks for these empty
 directories. There is no way to pass the `strict` parameter via the open_fs()
 function so we need to call the S3FS creator method directly.
+
+I/O may be rate limited in bytes/second and operations/second with a
+RateLimiter. Either wrap a filesystem with fsw_throttle() to limit just that
+filesystem (and any DirFileSystem opened within it), or use
+fsw_set_rate_limit() to set a global limit that applies to all filesystems
+subsequently opened with fsw_openfs() and to local file access with no
+filesystem given. All the operations in this module, digest calculation with
+ocfl.digest.file_digest(), and validation then honor the limit.
 """
+from concurrent.futures import ThreadPoolExecutor, as_completed
 import logging
 import os.path
 import tempfile
+import threading
+import time
 from urllib.parse import parse_qs
 
 import fsspec
@@ -30,12 +41,233 @@ from s3fs import S3FileSystem
 
 
 BUFLEN = 256 * 1024  # 256kB buffer for copy and comparison
+_RATE_LIMITER = None  # Global RateLimiter set with fsw_set_rate_limit()
 
 
 class FswException(Exception):
     """Superclass for all exceptions generated by this module."""
 
 
+class RateLimiter():  # pylint: disable=too-few-public-methods
+    """Limit rate of bytes and operations per second, thread safe.
+
+    Implemented as a token bucket for each of bytes and operations, using
+    the generic cell rate algorithm. Callers report bytes and operations
+    with acquire() which sleeps as needed to keep within the limits, after
+    allowing an initial burst of up to burst seconds worth.
+
+    Attributes:
+        bytes_per_sec (float or None): limit on bytes per second, None for
+            no limit
+        ops_per_sec (float or None): limit on operations per second, None
+            for no limit
+        total_bytes (int): total bytes reported
+        total_ops (int): total operations reported
+        total_delay (float): total seconds of delay imposed
+    """
+
+    def __init__(self, bytes_per_sec=None, ops_per_sec=None, burst=1.0,
+                 clock=time.monotonic, sleep=time.sleep):
+        """Initialize RateLimiter.
+
+        Arguments:
+            bytes_per_sec (float or None): limit on bytes per second
+            ops_per_sec (float or None): limit on operations per second
+            burst (float): seconds worth of bytes and operations allowed
+                without delay after a period of inactivity, default 1.0
+            clock (function): monotonic clock in seconds
+            sleep (function): function to sleep for a number of seconds
+        """
+        self.bytes_per_sec = bytes_per_sec
+        self.ops_per_sec = ops_per_sec
+        self.burst = burst
+        self.total_bytes = 0
+        self.total_ops = 0
+        self.total_delay = 0.0
+        self._clock = clock
+        self._sleep = sleep
+        self._lock = threading.Lock()
+        self._bytes_tat = 0.0  # Theoretical arrival times
+        self._ops_tat = 0.0
+
+    def acquire(self, nbytes=0, ops=0):
+        """Report nbytes and ops, sleeping if needed to keep within limits.
+
+        Arguments:
+            nbytes (int): number of bytes read or written
+            ops (int): number of operations
+        """
+        delay = 0.0
+        with self._lock:
+            self.total_bytes += nbytes
+            self.total_ops += ops
+            now = self._clock()
+            if self.bytes_per_sec and nbytes > 0:
+                self._bytes_tat = max(self._bytes_tat, now) + nbytes / self.bytes_per_sec
+                delay = max(delay, self._bytes_tat - now - self.burst)
+            if self.ops_per_sec and ops > 0:
+                self._ops_tat = max(self._ops_tat, now) + ops / self.ops_per_sec
+                delay = max(delay, self._ops_tat - now - self.burst)
+            if delay > 0.0:
+                self.total_delay += delay
+        if delay > 0.0:
+            self._sleep(delay)
+
+
+class _ThrottledFile():
+    """File object wrapper that reports bytes read and written to a RateLimiter."""
+
+    def __init__(self, fh, rate_limiter):
+        """Initialize _ThrottledFile wrapping open file fh."""
+        self._fh = fh
+        self._rate_limiter = rate_limiter
+
+    def read(self, *args):
+        """Read from file."""
+        data = self._fh.read(*args)
+        self._rate_limiter.acquire(nbytes=len(data))
+        return data
+
+    def readline(self, *args):
+        """Read a line from file."""
+        data = self._fh.readline(*args)
+        self._rate_limiter.acquire(nbytes=len(data))
+        return data
+
+    def write(self, data):
+        """Write to file."""
+        self._rate_limiter.acquire(nbytes=len(data))
+        return self._fh.write(data)
+
+    def __iter__(self):
+        """Iterate over lines in file."""
+        for line in self._fh:
+            self._rate_limiter.acquire(nbytes=len(line))
+            yield line
+
+    def __enter__(self):
+        """Context manager entry."""
+        return self
+
+    def __exit__(self, *args):
+        """Context manager exit, closes file."""
+        return self._fh.__exit__(*args)
+
+    def __getattr__(self, name):
+        """Pass anything else to the wrapped file."""
+        return getattr(self._fh, name)
+
+
+class ThrottledFileSystem(DirFileSystem):
+    """Filesystem wrapper that applies a RateLimiter to all access.
+
+    Each call that accesses the wrapped filesystem counts as one operation,
+    and the bytes read or written through open files, cat_file() and
+    pipe_file() are counted as bytes. Paths are passed through unchanged.
+
+    Serializes as the wrapped filesystem, the rate limit is not included.
+    """
+
+    cachable = False  # Instances depend on the rate limiter, don't reuse
+
+    OP_METHODS = ("ls", "info", "exists", "isdir", "isfile", "size", "checksum",
+                  "find", "walk", "glob", "du", "mkdir", "makedirs", "rmdir",
+                  "rm", "rm_file", "cp_file", "copy", "mv", "touch",
+                  "put_file", "get_file")
+
+    def __init__(self, fs, rate_limiter, **kwargs):
+        """Initialize ThrottledFileSystem.
+
+        Arguments:
+            fs (AbstractFileSystem): filesystem to wrap
+            rate_limiter (RateLimiter): the rate limiter to apply
+            **kwargs: passed to DirFileSystem
+        """
+        super().__init__(path="/", fs=fs, **kwargs)
+        self.rate_limiter = rate_limiter
+
+    def open(self, path, *args, **kwargs):
+        """Open file with reads and writes counted."""
+        self.rate_limiter.acquire(ops=1)
+        return _ThrottledFile(super().open(path, *args, **kwargs), self.rate_limiter)
+
+    def cat_file(self, path, *args, **kwargs):
+        """Read file contents."""
+        data = super().cat_file(path, *args, **kwargs)
+        self.rate_limiter.acquire(nbytes=len(data), ops=1)
+        return data
+
+    def pipe_file(self, path, *args, **kwargs):
+        """Write file contents, the value is the first of args."""
+        value = args[0] if args else kwargs.get("value", b"")
+        self.rate_limiter.acquire(nbytes=len(value), ops=1)
+        return super().pipe_file(path, *args, **kwargs)
+
+    def to_dict(self, *, include_password=True):
+        """Return dictionary representation of the wrapped filesystem."""
+        return self.fs.to_dict(include_password=include_password)
+
+
+def _throttled_op(name):
+    """Make method for ThrottledFileSystem that counts one operation then calls DirFileSystem."""
+    dir_method = getattr(DirFileSystem, name)
+
+    def method(self, *args, **kwargs):
+        self.rate_limiter.acquire(ops=1)
+        return dir_method(self, *args, **kwargs)
+    method.__name__ = name
+    method.__doc__ = dir_method.__doc__
+    return method
+
+
+for _name in ThrottledFileSystem.OP_METHODS:
+    setattr(ThrottledFileSystem, _name, _throttled_op(_name))
+
+
+def fsw_throttle(fs, rate_limiter):
+    """Wrap filesystem so that access is limited by rate_limiter.
+
+    Arguments:
+        fs (AbstractFileSystem): filesystem to wrap
+        rate_limiter (RateLimiter or None): the rate limiter, or None to
+            return fs unchanged
+
+    Returns:
+        AbstractFileSystem: the wrapped filesystem
+    """
+    if rate_limiter is None:
+        return fs
+    return ThrottledFileSystem(fs, rate_limiter)
+
+
+def fsw_set_rate_limit(bytes_per_sec=None, ops_per_sec=None):
+    """Set or clear the global rate limit.
+
+    The limit applies to filesystems subsequently opened with fsw_openfs()
+    and to local files accessed without a filesystem. Filesystems already
+    opened are not affected.
+
+    Arguments:
+        bytes_per_sec (float or None): limit on bytes per second
+        ops_per_sec (float or None): limit on operations per second
+
+    Returns:
+        RateLimiter: the global rate limiter, or None if neither limit is
+            set which removes any global limit
+    """
+    global _RATE_LIMITER  # pylint: disable=global-statement
+    if bytes_per_sec is None and ops_per_sec is None:
+        _RATE_LIMITER = None
+    else:
+        _RATE_LIMITER = RateLimiter(bytes_per_sec=bytes_per_sec, ops_per_sec=ops_per_sec)
+    return _RATE_LIMITER
+
+
+def fsw_rate_limiter():
+    """Global RateLimiter set with fsw_set_rate_limit(), else None."""
+    return _RATE_LIMITER
+
+
 def _fsw_or_local(fs):
     """Open local filesytem if fs not set.
 
@@ -43,10 +275,12 @@ def _fsw_or_local(fs):
         fs (AbstractFileSystem): a filesystem instance else None
 
     Simply returns fs= if set, else if fs is None then we open a local
-    filesystem and return that.
+    filesystem and return that, subject to any global rate limit.
     """
     logging.debug("fsw -- %s", str(fs))
-    return DirFileSystem(os.getcwd(), LocalFileSystem()) if fs is None else fs
+    if fs is not None:
+        return fs
+    return fsw_throttle(DirFileSystem(os.getcwd(), LocalFileSystem()), _RATE_LIMITER)
 
 
 def _fsw_s3_urlparse(url_path):
@@ -193,7 +427,61 @@ def fsw_openfs(fs_url, create=False, exists_ok=True):
             fs.makedir(create_dir)
         fs = DirFileSystem(path=create_dir, fs=fs)
 
-    return fs
+    return fsw_throttle(fs, _RATE_LIMITER)
+
+
+async def fsw_openfs_async(fs_url):
+    """Open a fsw filesystem for use from asyncio code.
+
+    S3 and other filesystems with an fsspec async implementation are opened
+    in asynchronous mode in the running event loop so that their coroutine
+    methods (``_ls()``, ``_cat_file()``, ``_pipe_file()`` etc.) may be
+    awaited. Other filesystems, including local files, are opened as with
+    fsw_openfs() and their methods must be called in threads.
+
+    Arguments:
+        fs_url (str): filesystem url to open, as for fsw_openfs()
+
+    Returns:
+        AbstractFileSystem: file system instance, with the asynchronous
+            attribute True if it is in asynchronous mode
+
+    Raises:
+        FileNotFoundError: if the path or filesystem cannot be opened
+    """
+    parts = fs_url.split("://", 1)
+    if len(parts) == 1 or parts[0] in ("file", "temp", "zip"):
+        return fsw_openfs(fs_url)
+    method, path = parts
+    if method == "s3":
+        path, params = _fsw_s3_urlparse(path)
+        fs = S3FileSystem(asynchronous=True, skip_instance_cache=True, **params)
+        await fs.set_session()
+        try:
+            await fs._ls(path, detail=False)  # pylint: disable=protected-access
+        except (FileNotFoundError, PermissionError) as e:
+            await fsw_closefs_async(fs)
+            raise FileNotFoundError("Failed to access S3 bucket/path (%s) (%s)" % (path, str(e)))
+    elif fsspec.get_filesystem_class(method).async_impl:
+        fs = fsspec.filesystem(method, asynchronous=True, skip_instance_cache=True)
+    else:
+        return fsw_openfs(fs_url)
+    return DirFileSystem(path=path, fs=fs, asynchronous=True) if path != "" else fs
+
+
+async def fsw_closefs_async(fs):
+    """Close any client session of a filesystem from fsw_openfs_async().
+
+    Arguments:
+        fs (AbstractFileSystem): the filesystem, which may be a
+            DirFileSystem within the filesystem with the session
+    """
+    while isinstance(fs, DirFileSystem):
+        fs = fs.fs
+    client = getattr(fs, "_s3", None)
+    if isinstance(fs, S3FileSystem) and client is not None:
+        await client.__aexit__(None, None, None)
+        fs._s3 = None  # pylint: disable=protected-access
 
 
 def fsw_opendir_as_fs(fs, path):
@@ -204,9 +492,13 @@ def fsw_opendir_as_fs(fs, path):
         path (str): string of directory to open
 
     Returns:
-        AbstractFileSystem: a filesystem for the new directory within fsw.
+        AbstractFileSystem: a filesystem for the new directory within fsw,
+            in asynchronous mode if fs is
     """
-    return DirFileSystem(path=path, fs=_fsw_or_local(fs))
+    fs = _fsw_or_local(fs)
+    if getattr(fs, "asynchronous", False):
+        return DirFileSystem(path=path, fs=fs, asynchronous=True)
+    return DirFileSystem(path=path, fs=fs)
 
 
 def fsw_walk(fs, dir="/"):
@@ -223,12 +515,18 @@ def fsw_walk(fs, dir="/"):
         dirpath. The value of dirs my be pruned to avoid descending into
         particular directories.
     """
+    for dirpath, dirs, file_infos in _fsw_walk_detail(fs, dir):
+        yield (dirpath, dirs, list(file_infos.keys()))
+
+
+def _fsw_walk_detail(fs, dir="/"):
+    """Walk like fsw_walk() but with a dict of name -> info for files."""
     if not dir.startswith("/"):
         dir = "/" + dir
     stack = [dir]
     while len(stack) > 0:
         dirpath = stack.pop()
-        files = []
+        files = {}
         dirs = []
         for info in fs.listdir(dirpath.lstrip("/"), detail=True):
             name = _fsw_relpath(info["name"], dirpath)
@@ -240,7 +538,7 @@ def fsw_walk(fs, dir="/"):
             if info["type"] == "directory":
                 dirs.append(name)
             else:
-                files.append(name)
+                files[name] = info
         yield (dirpath, dirs, files)
         # dirs may have been modified to prune and control descent.
         # Reverse lst so we descend in first item from listdir first order
@@ -268,6 +566,55 @@ def fsw_walk_files(fs, dir="/"):
     return allfiles
 
 
+def fsw_walk_files_info(fs, dir="/"):
+    """Files and their info dicts obtained by walking the filesystem.
+
+    Gets the same information as fsw_walk_files() from the same directory
+    listings, so is much cheaper than calling info() for each file.
+
+    Arguments:
+        fs: filesytem to use
+        dir: string of directory to start from (default "/" which is the root
+            of the filesystem)
+
+    Returns:
+        dict: of file path relative to dir -> info dict from the filesystem,
+            which includes at least "size"
+    """
+    allfiles = {}
+    for dirpath, _, files in _fsw_walk_detail(fs, dir):
+        reldir = _fsw_relpath(dirpath, dir)
+        if reldir == ".":
+            reldir = ""
+        for file, info in files.items():
+            allfiles[os.path.join(reldir, file)] = info
+    return allfiles
+
+
+def fsw_info_mtime(info):
+    """Last modification time from a filesystem info dict.
+
+    Different filesystem implementations report the modification time
+    differently: local files have "mtime" as a POSIX timestamp, S3 has
+    "LastModified" as a datetime.
+
+    Arguments:
+        info (dict): info dict from a filesystem listing or info() call
+
+    Returns:
+        float or None: POSIX timestamp or None if not available
+    """
+    for key in ("mtime", "LastModified", "last_modified"):
+        value = info.get(key)
+        if value is None:
+            continue
+        if isinstance(value, (int, float)):
+            return float(value)
+        if hasattr(value, "timestamp"):
+            return value.timestamp()
+    return None
+
+
 def fsw_listdir_names(fs, path=""):
     """List directory path on fsw returning relative file names.
 
@@ -409,3 +756,29 @@ def fsw_copydir(src_fs, src_path, dst_fs, dst_path):
         if dst_filedir != dst_path and not dst_fs.exists(dst_filedir):
             dst_fs.makedirs(dst_filedir)
         fsw_copyfile(src_fs, src_filepath, dst_fs, dst_filepath)
+
+
+def fsw_copydirs(copies, workers=1):
+    """Recursive copy of several directories, concurrently.
+
+    Arguments:
+        copies (list): list of (src_fs, src_path, dst_fs, dst_path) tuples,
+            each giving the arguments for one call to fsw_copydir()
+        workers (int): number of directories to copy concurrently
+
+    Yields:
+        tuple: (index, exception) for each copy as it finishes, where index
+            is the position of the copy in copies and exception is None on
+            success, else the exception raised by fsw_copydir()
+
+    A failure of one copy does not stop the others. If the generator is
+    closed before all copies have finished then copies not yet started are
+    cancelled.
+    """
+    executor = ThreadPoolExecutor(max_workers=workers)
+    try:
+        futures = {executor.submit(fsw_copydir, *copy): n for n, copy in enumerate(copies)}
+        for future in as_completed(futures):
+            yield futures[future], future.exception()
+    finally:
+        executor.shutdown(cancel_futures=True)
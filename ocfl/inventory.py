@@ -74,11 +74,13 @@ Example:
     >>> validator.validate(inv.data)
     True
 """
+from collections.abc import Mapping
 import copy
 import json
 import os.path
 import re
 
+from .compact_inventory import compact_inventory_data
 from .constants import DEFAULT_CONTENT_DIRECTORY
 from .digest import normalized_digest
 from .object_utils import first_version_directory, next_version_directory, \
@@ -487,9 +489,47 @@ class Inventory():  # pylint: disable=too-many-public-methods
                 return vdir, version.content_path_for_logical_path(logical_path)
         return None, None
 
+    def diff_versions(self, from_vdir, to_vdir):
+        """Compare the state of two versions in this inventory.
+
+        Arguments:
+            from_vdir (str or None): version directory of the version to
+                compare from, or None to compare against an empty state
+            to_vdir (str): version directory of the version to compare to
+
+        Returns:
+            list: of add and delete operations representing the diff. Each
+                operation is a tuple (op, digest, logical_path) where op is "A"
+                for an addition or "D" for a deletion; digest is the string of
+                the content digest; and logical_path is the logical path of the
+                content file. A logical path with changed content appears as
+                both a deletion and an addition. Additions come first, then
+                deletions, each sorted by logical path. An empty list indicates
+                no content change between the versions.
+
+        The versions need not be adjacent and from_vdir may be later than
+        to_vdir, in which case the diff describes the change needed to go
+        back to the earlier version.
+        """
+        from_paths = set()
+        if from_vdir is not None:
+            for digest, logical_paths in self.version(from_vdir).state.items():
+                for lp in logical_paths:
+                    from_paths.add((digest, lp))
+        to_paths = set()
+        for digest, logical_paths in self.version(to_vdir).state.items():
+            for lp in logical_paths:
+                to_paths.add((digest, lp))
+        result = []
+        for (d, lp) in sorted(to_paths - from_paths, key=lambda x: x[1]):
+            result.append(("A", d, lp))
+        for (d, lp) in sorted(from_paths - to_paths, key=lambda x: x[1]):
+            result.append(("D", d, lp))
+        return result
+
     def as_json(self):
         """Serlialize JSON representation."""
-        return json.dumps(self.data, sort_keys=True, indent=2)
+        return json.dumps(self.data, sort_keys=True, indent=2, default=_json_default)
 
     def write_json(self, fh):
         """Serialize JSON representation to file.
@@ -497,7 +537,28 @@ class Inventory():  # pylint: disable=too-many-public-methods
         Arguments:
             fh - filehandle to write to
         """
-        json.dump(self.data, fh, sort_keys=True, indent=2)
+        json.dump(self.data, fh, sort_keys=True, indent=2, default=_json_default)
+
+    def compact(self):
+        """Compact read-only copy of this inventory.
+
+        The copy stores paths and digests in a compact form that uses much
+        less memory for large inventories, see ocfl.compact_inventory. All
+        methods that read the inventory work as normal but the manifest,
+        fixity and state blocks, and the version data, cannot be modified.
+        The inventory should be valid and have normalized digests.
+
+        Returns:
+            ocfl.Inventory: the compact copy
+
+        Raises:
+            InventoryException: if a version state refers to a digest that
+                is not in the manifest
+        """
+        try:
+            return Inventory(compact_inventory_data(self.data))
+        except KeyError as e:
+            raise InventoryException("Cannot compact inventory, digest %s is not in the manifest" % str(e))
 
     def init_manifest_and_versions(self):
         """Initialize manifest and versions blocks for building new inventory."""
@@ -566,6 +627,13 @@ class Inventory():  # pylint: disable=too-many-public-methods
                 state[norm_digest] = state.pop(digest)
 
 
+def _json_default(obj):
+    """Serialize read-only compact blocks as dicts for JSON output."""
+    if isinstance(obj, Mapping):
+        return dict(obj)
+    raise TypeError("Object of type %s is not JSON serializable" % (type(obj).__name__))
+
+
 class Version():
     """Version class to represent version information in an Inventory.
 
@@ -0,0 +1,273 @@
+"""Process-wide cache of parsed OCFL inventories.
+
+Reading and validating a large inventory.json is expensive, and within one
+program the same inventory is often read several times: to validate an
+object, to list the objects in a storage root, to extract a version, etc.
+The InventoryCache holds parsed, validated and digest-normalized
+ocfl.Inventory objects keyed by the (digest_algorithm, digest) recorded in the
+root inventory sidecar. Reading the sidecar is a tiny read, and since the
+sidecar digest identifies the inventory content, a cache hit means that the
+full JSON read and validation can be skipped.
+
+Entries are only added when the inventory has been checked against the
+sidecar digest. The cache is bounded by an estimate of the memory used by
+the cached inventories and least recently used entries are evicted first.
+The parse_inventory_bytes() function does the parsing, validation and
+normalization of a root inventory needed on a cache miss.
+
+Example:
+    >>> import ocfl
+    >>> from ocfl.inventory_cache import inventory_cache
+    >>> obj = ocfl.Object(path="fixtures/1.1/good-objects/spec-ex-full")
+    >>> inv = obj.parse_inventory(use_cache=True)
+    >>> inv is obj.parse_inventory(use_cache=True)
+    True
+    >>> inventory_cache().hits
+    1
+"""
+import json
+import logging
+import re
+import threading
+from collections import OrderedDict
+
+from .constants import INVENTORY_FILENAME
+from .fsw import fsw_listdir_names
+from .inventory import Inventory
+from .inventory_validator import InventoryValidator
+from .object_utils import ObjectException
+
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+STRING_OVERHEAD = 56  # Approximate bytes for a Python str beyond its length
+
+
+class InventoryCacheEntry():  # pylint: disable=too-few-public-methods
+    """One cached inventory.
+
+    Attributes:
+        inventory (ocfl.Inventory): the parsed, validated and digest-normalized
+            inventory, which is shared and must not be modified
+        size (int): estimated memory use of the inventory in bytes
+        derived (dict): other data derived from the inventory that users of
+            the cache want to keep while the entry is cached, users should
+            pick keys that won't collide
+    """
+
+    def __init__(self, inventory, size):
+        """Initialize InventoryCacheEntry."""
+        self.inventory = inventory
+        self.size = size
+        self.derived = {}
+
+
+class InventoryCache():
+    """LRU cache of parsed inventories bounded by estimated memory use.
+
+    Keys are (digest_algorithm, digest) tuples as read from the root
+    inventory sidecar with read_sidecar_key(). Methods are thread safe.
+
+    Attributes:
+        max_bytes (int): maximum estimated memory use of cached inventories
+        total_bytes (int): current estimated memory use of cached inventories
+        hits (int): number of successful get() calls
+        misses (int): number of get() calls that did not find an entry
+    """
+
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES):
+        """Initialize InventoryCache.
+
+        Arguments:
+            max_bytes (int): maximum estimated memory use of cached
+                inventories, 0 disables caching
+        """
+        self.max_bytes = max_bytes
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        """Return the number of cached inventories."""
+        return len(self._entries)
+
+    def get(self, key):
+        """Get cache entry for key.
+
+        Arguments:
+            key (tuple or None): (digest_algorithm, digest) key
+
+        Returns:
+            InventoryCacheEntry: the cache entry, or None if there is no
+                entry for key (always the case if key is None)
+        """
+        with self._lock:
+            entry = self._entries.get(key) if key is not None else None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(self, key, inventory):
+        """Add inventory to the cache with key.
+
+        Arguments:
+            key (tuple): (digest_algorithm, digest) key, the caller must have
+                checked that the digest is correct for the inventory
+            inventory (ocfl.Inventory): parsed, validated and digest-normalized
+                inventory, ownership passes to the cache so it must not be
+                modified after this call
+
+        Returns:
+            InventoryCacheEntry: the cache entry, which is not retained if the
+                inventory is too large to cache
+        """
+        entry = InventoryCacheEntry(inventory, estimate_inventory_size(inventory))
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.total_bytes -= old.size
+            if entry.size > self.max_bytes:
+                logging.debug("Inventory %s too large to cache (~%d bytes)", key[1], entry.size)
+                return entry
+            self._entries[key] = entry
+            self.total_bytes += entry.size
+            self._evict()
+        return entry
+
+    def resize(self, max_bytes):
+        """Change maximum size of the cache, evicting entries as needed.
+
+        Arguments:
+            max_bytes (int): new maximum estimated memory use
+        """
+        with self._lock:
+            self.max_bytes = max_bytes
+            self._evict()
+
+    def clear(self):
+        """Remove all entries and reset the statistics."""
+        with self._lock:
+            self._entries.clear()
+            self.total_bytes = 0
+            self.hits = 0
+            self.misses = 0
+
+    def _evict(self):
+        """Evict least recently used entries until within max_bytes.
+
+        Must be called with the lock held.
+        """
+        while self.total_bytes > self.max_bytes and self._entries:
+            key, entry = self._entries.popitem(last=False)
+            self.total_bytes -= entry.size
+            logging.debug("Evicted inventory %s from cache", key[1])
+
+
+def estimate_inventory_size(inventory):
+    """Estimate memory used by the parsed inventory in bytes.
+
+    Counts the digest and path strings in the manifest, fixity and version
+    state blocks, these dominate for all but trivial inventories.
+
+    Arguments:
+        inventory (ocfl.Inventory): the inventory
+
+    Returns:
+        int: the estimated size
+    """
+    size = 0
+    blocks = [inventory.manifest]
+    for fixity_block in inventory.fixity.values():
+        blocks.append(fixity_block)
+    for version in inventory.versions():
+        blocks.append(version.state)
+    for block in blocks:
+        for digest, paths in block.items():
+            size += STRING_OVERHEAD + len(digest)
+            for path in paths:
+                size += STRING_OVERHEAD + len(path)
+    return size
+
+
+def read_sidecar_digest(fs, digest_algorithm):
+    """Read digest from the root inventory sidecar for digest_algorithm.
+
+    Arguments:
+        fs: filesystem for the object root
+        digest_algorithm (str): digest algorithm of the sidecar to read
+
+    Returns:
+        str: the lowercase digest string, or None if the sidecar is badly
+            formed
+
+    Raises:
+        FileNotFoundError: if there is no such sidecar
+    """
+    with fs.open(INVENTORY_FILENAME + "." + digest_algorithm, "r") as fh:
+        line = fh.readline()
+    m = re.match(r"""(\w+)\s+(\S+)\s*$""", line)
+    if not m or m.group(2) != INVENTORY_FILENAME:
+        return None
+    return m.group(1).lower()
+
+
+def read_sidecar_key(fs, digest_algorithms=None):
+    """Read the root inventory sidecar to get a cache key for the inventory.
+
+    Arguments:
+        fs: filesystem for the object root
+        digest_algorithms (list of str or None): likely digest algorithms to
+            try first, avoiding a directory listing in the common case
+
+    Returns:
+        tuple: (digest_algorithm, digest) from the root inventory sidecar,
+            or None if there isn't exactly one readable sidecar
+    """
+    for digest_algorithm in (digest_algorithms or []):
+        try:
+            digest = read_sidecar_digest(fs, digest_algorithm)
+        except FileNotFoundError:
+            continue
+        return None if digest is None else (digest_algorithm, digest)
+    sidecars = [name for name in fsw_listdir_names(fs, "")
+                if name.startswith(INVENTORY_FILENAME + ".")]
+    if len(sidecars) != 1:
+        return None
+    digest_algorithm = sidecars[0][len(INVENTORY_FILENAME) + 1:]
+    digest = read_sidecar_digest(fs, digest_algorithm)
+    return None if digest is None else (digest_algorithm, digest)
+
+
+_INVENTORY_CACHE = InventoryCache()
+
+
+def inventory_cache():
+    """Process-wide InventoryCache instance."""
+    return _INVENTORY_CACHE
+
+
+def parse_inventory_bytes(raw):
+    """Parse, validate and normalize a root inventory from bytes.
+
+    Arguments:
+        raw (bytes): content of the JSON inventory file
+
+    Returns:
+        tuple: (inventory, spec_version) where inventory is the
+            ocfl.Inventory with normalized digests
+
+    Raises:
+        ObjectException: if the inventory is not valid
+        ValueError: if raw is not JSON
+    """
+    inventory = Inventory(json.loads(raw.decode("utf-8")))
+    # Validate
+    iv = InventoryValidator()
+    if not iv.validate(inventory=inventory.data):
+        raise ObjectException("Root inventory is not valid (%d errors)" % iv.log.num_errors)
+    # Normalize digests in place
+    inventory.normalize_digests(iv.digest_algorithm)
+    return inventory, iv.spec_version
@@ -32,6 +32,17 @@ from .digest import digest_regex, normalized_digest
 from .validation_logger import ValidationLogger
 from .w3c_datetime import str_to_datetime
 
+# Patterns used in validation, compiled once here rather than for every
+# path, digest and version checked
+URI_SCHEME_REGEX = re.compile(r"""[a-z][a-z\d\+\-\.]*:.+""", re.IGNORECASE)
+INVENTORY_TYPE_REGEX = re.compile(r"""https://ocfl.io/(\d+.\d)/spec/#inventory""")
+CREATED_TIMEZONE_REGEX = re.compile(r"""(Z|[+-]\d\d:\d\d)$""")
+CREATED_TIME_REGEX = re.compile(r"""T\d\d:\d\d:\d\d""")
+USER_ADDRESS_REGEX = re.compile(r"""\w{3,6}:""")
+CONTENT_PATH_REGEX = re.compile(r"""^(v\d+)/([^/]+)/(.+)""")
+ANY_REGEX = re.compile(r"""^.*$""")
+BAD_PATH_ELEMENTS = frozenset(("", ".", ".."))
+
 
 def _get_logical_path_map(inventory, version):
     """Get a map of logical paths in state to files on disk for version in inventory.
@@ -55,7 +66,8 @@ class InventoryValidator():
     """Class for OCFL Inventory Validator."""
 
     def __init__(self, *, log=None, where="???",
-                 lax_digests=False, default_spec_version=DEFAULT_SPEC_VERSION):
+                 lax_digests=False, default_spec_version=DEFAULT_SPEC_VERSION,
+                 reference=None):
         """Initialize OCFL Inventory Validator.
 
         It is expected that a new InventoryValidator object be created for
@@ -78,11 +90,18 @@ class InventoryValidator():
             default_spec_version: string (defaults to
                 ocfl.constants.DEFAULT_SPEC_VERSION) indicating
                 the specification version to assume if it is not set.
+            reference: an InventoryValidator that has already validated
+                the root inventory of the same object, or None (default).
+                Version blocks identical to blocks in the reference
+                inventory that validated without errors or warnings
+                are not validated again, and are not compared again by
+                reference.validate_as_prior_version().
         """
         self.log = ValidationLogger() if log is None else log
         self.where = where
         self.default_spec_version = default_spec_version
         self.lax_digests = lax_digests
+        self.reference = reference
         # Object state
         self.inventory = None
         self.id = None
@@ -94,6 +113,8 @@ class InventoryValidator():
         self.manifest_files = None
         self.unnormalized_digests = None
         self.head = "UNKNOWN"
+        self.clean_versions = set()  # versions validated without errors or warnings
+        self.reference_versions = set()  # versions identical to those in reference
 
     def validate(self, inventory, force_spec_version=None):
         """Validate a given inventory.
@@ -121,7 +142,7 @@ class InventoryValidator():
             else:
                 # URI syntax https://www.rfc-editor.org/rfc/rfc3986.html#section-3.1 :
                 # scheme = ALPHA *( ALPHA / DIGIT / "+" / "-" / "." )
-                if not re.match(r"""[a-z][a-z\d\+\-\.]*:.+""", iid, re.IGNORECASE):
+                if not URI_SCHEME_REGEX.match(iid):
                     self._warning("W005", id=iid)
                 self.id = iid
         else:
@@ -135,7 +156,7 @@ class InventoryValidator():
             self._error("E038a", expected="https://ocfl.io/" + force_spec_version + "/spec/#inventory", got=inventory["type"])
         else:
             # Extract specification version
-            m = re.match(r"""https://ocfl.io/(\d+.\d)/spec/#inventory""", inventory["type"])
+            m = INVENTORY_TYPE_REGEX.match(inventory["type"])
             if not m:
                 self._error("E038b", got=inventory["type"], assumed_spec_version=self.spec_version)
             elif m.group(1) in SPEC_VERSIONS_SUPPORTED:
@@ -170,7 +191,7 @@ class InventoryValidator():
             self._error("E041a")
         else:
             (self.manifest_files, manifest_files_correct_format, self.unnormalized_digests) = self._validate_manifest(inventory["manifest"])
-        digests_used = []
+        digests_used = set()
         if "versions" not in inventory:
             self._error("E041b")
         else:
@@ -220,6 +241,9 @@ class InventoryValidator():
             # digest algorithms between versions
             version = "no-version"
             for version in prior.all_versions:
+                if prior.reference is self and version in prior.reference_versions:
+                    # Identical version blocks and content paths, nothing to report
+                    continue
                 # If the digest algorithm is the same then we can make a
                 # direct check on whether the state blocks match
                 if prior.digest_algorithm == self.digest_algorithm:
@@ -275,9 +299,9 @@ class InventoryValidator():
         else:
             content_paths = set()
             content_directories = set()
+            digest_re = re.compile(self._digest_regex())
             for digest in manifest:
-                m = re.match(self._digest_regex(), digest)
-                if not m:
+                if not digest_re.match(digest):
                     self._error("E025b", digest=digest, algorithm=self.digest_algorithm)  # wrong form of digest
                 elif not isinstance(manifest[digest], list):
                     self._error("E092", digest=digest)  # must have path list value
@@ -314,13 +338,13 @@ class InventoryValidator():
             for digest_algorithm in fixity:
                 known_digest = True
                 try:
-                    regex = digest_regex(digest_algorithm)
+                    regex = re.compile(digest_regex(digest_algorithm))
                 except ValueError:
                     if not self.lax_digests:
                         self._error("E056b", algorithm=self.digest_algorithm)
                         continue
                     # Match anything
-                    regex = r"""^.*$"""
+                    regex = ANY_REGEX
                     known_digest = False
                 fixity_algoritm_block = fixity[digest_algorithm]
                 if not isinstance(fixity_algoritm_block, dict):
@@ -328,8 +352,7 @@ class InventoryValidator():
                 else:
                     digests_seen = set()
                     for digest in fixity_algoritm_block:
-                        m = re.match(regex, digest)
-                        if not m:
+                        if not regex.match(digest):
                             self._error("E057b", digest=digest, algorithm=digest_algorithm)  # wrong form of digest
                         elif not isinstance(fixity_algoritm_block[digest], list):
                             self._error("E057c", digest=digest, algorithm=digest_algorithm)  # must have path list value
@@ -411,81 +434,134 @@ class InventoryValidator():
             all_versions: an ordered list of the versions to look at in versions
                 (all other keys in versions will be ignored)
 
-        Returns a list of digests_used which can then be checked against the
-        manifest.
+        Returns a set of the normalized digests used which can then be checked
+        against the manifest. Digests are collected in their original form so
+        that each distinct digest is normalized only once.
         """
-        digests_used = []
+        digests_used = set()
         for v in all_versions:
-            version = versions[v]
-            if "created" not in version:
-                self._error("E048", version=v)  # No created
-            elif not isinstance(versions[v]["created"], str):
-                self._error("E049d", version=v)  # Bad created
-            else:
-                created = versions[v]["created"]
-                try:
-                    str_to_datetime(created)  # catch ValueError if fails
-                    if not re.search(r"""(Z|[+-]\d\d:\d\d)$""", created):  # FIXME - kludge
-                        self._error("E049a", version=v)
-                    if not re.search(r"""T\d\d:\d\d:\d\d""", created):  # FIXME - kludge
-                        self._error("E049b", version=v)
-                except ValueError as e:
-                    self._error("E049c", version=v, description=str(e))
-            if "state" in version:
-                digests_used += self._validate_state_block(version["state"], version=v, unnormalized_digests=unnormalized_digests)
-            else:
-                self._error("E048c", version=v)
-            if "message" not in version:
-                self._warning("W007a", version=v)
-            elif not isinstance(version["message"], str):
-                self._error("E094", version=v)
-            if "user" not in version:
-                self._warning("W007b", version=v)
+            if self._is_reference_version(v):
+                # Identical to a block that validated without errors or warnings
+                self.reference_versions.add(v)
+                self.clean_versions.add(v)
+                digests_used.update(versions[v]["state"])
+                continue
+            start_errors = self.log.num_errors
+            start_warnings = self.log.num_warnings
+            digests_used.update(self._validate_version(v, versions[v], unnormalized_digests))
+            if self.log.num_errors == start_errors and self.log.num_warnings == start_warnings:
+                self.clean_versions.add(v)
+        return set(normalized_digest(d, self.digest_algorithm) for d in digests_used)
+
+    def _validate_version(self, v, version, unnormalized_digests):
+        """Validate one version block.
+
+        Returns a set of the digests used in the version state, not normalized.
+        """
+        digests_used = set()
+        if "created" not in version:
+            self._error("E048", version=v)  # No created
+        elif not isinstance(version["created"], str):
+            self._error("E049d", version=v)  # Bad created
+        else:
+            created = version["created"]
+            try:
+                str_to_datetime(created)  # catch ValueError if fails
+                if not CREATED_TIMEZONE_REGEX.search(created):  # FIXME - kludge
+                    self._error("E049a", version=v)
+                if not CREATED_TIME_REGEX.search(created):  # FIXME - kludge
+                    self._error("E049b", version=v)
+            except ValueError as e:
+                self._error("E049c", version=v, description=str(e))
+        if "state" in version:
+            digests_used = self._validate_state_block(version["state"], version=v, unnormalized_digests=unnormalized_digests)
+        else:
+            self._error("E048c", version=v)
+        if "message" not in version:
+            self._warning("W007a", version=v)
+        elif not isinstance(version["message"], str):
+            self._error("E094", version=v)
+        if "user" not in version:
+            self._warning("W007b", version=v)
+        else:
+            user = version["user"]
+            if not isinstance(user, dict):
+                self._error("E054a", version=v)
             else:
-                user = version["user"]
-                if not isinstance(user, dict):
-                    self._error("E054a", version=v)
-                else:
-                    if "name" not in user or not isinstance(user["name"], str):
-                        self._error("E054b", version=v)
-                    if "address" not in user:
-                        self._warning("W008", version=v)
-                    elif not isinstance(user["address"], str):
-                        self._error("E054c", version=v)
-                    elif not re.match(r"""\w{3,6}:""", user["address"]):
-                        self._warning("W009", version=v)
+                if "name" not in user or not isinstance(user["name"], str):
+                    self._error("E054b", version=v)
+                if "address" not in user:
+                    self._warning("W008", version=v)
+                elif not isinstance(user["address"], str):
+                    self._error("E054c", version=v)
+                elif not USER_ADDRESS_REGEX.match(user["address"]):
+                    self._warning("W009", version=v)
         return digests_used
 
+    def _is_reference_version(self, v):
+        """Check whether version v is identical to a clean version in self.reference.
+
+        The version blocks must be identical, as must the manifest entries for
+        the digests in the state block, so that the logical paths map to the
+        same content paths. Uses direct comparison of the parsed JSON rather
+        than hashing a serialization, which would cost about as much as
+        validating the block.
+        """
+        reference = self.reference
+        if (reference is None
+                or v not in reference.clean_versions
+                or self.digest_algorithm != reference.digest_algorithm):
+            return False
+        block = self.inventory["versions"][v]
+        if block != reference.inventory["versions"][v]:
+            return False
+        manifest = self.inventory.get("manifest")
+        if not isinstance(manifest, dict):
+            return False
+        reference_manifest = reference.inventory["manifest"]
+        for digest in block["state"]:
+            if manifest.get(digest) != reference_manifest[digest]:
+                return False
+        return True
+
     def _validate_state_block(self, state, version, unnormalized_digests):
         """Validate state block in a version in an inventory.
 
         The version is used only for error reporting.
 
-        Returns a list of content digests referenced in the state block.
+        Returns a set of content digests referenced in the state block, not
+        normalized.
         """
-        digests = []
+        digests = set()
         logical_paths = set()
         logical_directories = set()
         if not isinstance(state, dict):
             self._error("E050c", version=version)
         else:
             digest_re = re.compile(self._digest_regex())
-            for digest in state:
-                if not digest_re.match(digest):
+            for digest, paths in state.items():
+                # Digests in the manifest have already been checked against digest_re
+                in_manifest = unnormalized_digests is not None and digest in unnormalized_digests
+                if not in_manifest and not digest_re.match(digest):
                     self._error("E050d", version=version, digest=digest)
-                elif not isinstance(state[digest], list):
+                elif not isinstance(paths, list):
                     self._error("E050e", version=version, digest=digest)
                 else:
-                    for path in state[digest]:
+                    for path in paths:
                         if path in logical_paths:
                             self._error("E095a", version=version, path=path)
+                        elif (path and path[0] not in "/." and path[-1] != "/"
+                              and "//" not in path and "/." not in path):
+                            # Fast path for the common case, cannot have any
+                            # bad element. Anything else gets the full check
+                            logical_paths.add(path)
+                            logical_directories.add(path.rpartition("/")[0])
                         else:
                             self._check_logical_path(path, version, logical_paths, logical_directories)
-                    if digest not in unnormalized_digests:
+                    if not in_manifest:
                         # Exact string value must match, not just normalized
                         self._error("E050f", version=version, digest=digest)
-                    norm_digest = normalized_digest(digest, self.digest_algorithm)
-                    digests.append(norm_digest)
+                    digests.add(digest)
             # Check for conflicting logical paths
             for path in logical_directories:
                 if path in logical_paths:
@@ -534,15 +610,12 @@ class InventoryValidator():
         """
         if path.startswith("/") or path.endswith("/"):
             self._error("E053", version=version, path=path)
+        elif not BAD_PATH_ELEMENTS.isdisjoint(path.split("/")):
+            self._error("E052", version=version, path=path)
         else:
-            elements = path.split("/")
-            for element in elements:
-                if element in [".", "..", ""]:
-                    self._error("E052", version=version, path=path)
-                    return
             # Accumulate paths and directories
             logical_paths.add(path)
-            logical_directories.add("/".join(elements[0:-1]))
+            logical_directories.add(path.rpartition("/")[0])
 
     def _check_content_path(self, path, content_paths, content_directories):
         """Check logical path and accumulate paths/directories for E101 check.
@@ -554,24 +627,22 @@ class InventoryValidator():
         if path.startswith("/") or path.endswith("/"):
             self._error("E100", path=path)
             return False
-        m = re.match(r"""^(v\d+)/([^/]+)/(.+)""", path)
+        m = CONTENT_PATH_REGEX.match(path)
         if not m:
             self._error("E042a", path=path)
             return False
         if m.group(2) != self.content_directory:
             self._error("E042c", path=path, content_directory=self.content_directory)
             return False
-        elements = m.group(3).split("/")
-        for element in elements:
-            if element in ("", ".", ".."):
-                self._error("E099", path=path)
-                return False
+        if not BAD_PATH_ELEMENTS.isdisjoint(m.group(3).split("/")):
+            self._error("E099", path=path)
+            return False
         # Accumulate paths and directories if not seen before
         if path in content_paths:
             self._error("E101a", path=path)
             return False
         content_paths.add(path)
-        content_directories.add("/".join([m.group(1), m.group(2)] + elements[0:-1]))
+        content_directories.add(path.rpartition("/")[0])
         return True
 
     def _compare_states_for_version(self, prior, version):
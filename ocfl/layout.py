@@ -20,6 +20,7 @@ collision in this part within a given path.
 See: https://ocfl.io/1.1/spec/#root-hierarchies
 """
 
+import functools
 import json
 import logging
 import os
@@ -27,6 +28,9 @@ import os.path
 from urllib.parse import quote_plus, unquote_plus
 
 
+DEFAULT_MEMO_SIZE = 100000
+
+
 class LayoutException(Exception):
     """Exception class for OCFL Layout."""
 
@@ -44,6 +48,8 @@ class Layout:
         PARAMS: None if the extension has no parameters, otherwise a dict
             with keys that are the parameter names, and values that are
             the methods used to parse/check the paremeter.
+        memo_size: maximum number of identifier to path mappings remembered
+            by identifiers_to_paths()
     """
 
     def __init__(self):
@@ -56,6 +62,7 @@ class Layout:
         self.NAME = "BASE"  # Override this in sub-class with real layout name
         self.DESCRIPTION = "BASE LAYOUT CLASS"  # Override with layout description
         self.PARAMS = None  # Overrride this in sub-class with a dictionary
+        self.memo_size = DEFAULT_MEMO_SIZE
 
     @property
     def config_file(self):
@@ -148,6 +155,29 @@ class Layout:
         """
         raise LayoutException("No yet implemented")
 
+    def path_to_identifier(self, path):  # pylint: disable=unused-argument
+        """Convert object path relative to some root back to the identifier.
+
+        Arguments:
+            path (str): object path
+
+        Returns:
+            str or None: the identifier for the object at path, or None if the
+                identifier cannot be determined from the path. Always None in
+                this base implementation, layouts that are reversible should
+                override with the same signature
+        """
+        return None
+
+    def _identifier_if_maps_to(self, identifier, path):
+        """Return identifier if it maps to path in this layout, else None."""
+        try:
+            if self.identifier_to_path(identifier) == path:
+                return identifier
+        except Exception:  # pylint: disable=broad-except
+            pass
+        return None
+
     def read_layout_params(self, root_fs=None, params_required=False):
         """Look for and read and layout configuration parameters.
 
@@ -233,3 +263,30 @@ class Layout:
                 json.dump(config, fh, indent=2)
         except Exception as e:
             raise LayoutException("Storage root extension config file %s couldn't be written (%s)" % (self.config_file, str(e)))
+
+    def identifiers_to_paths(self, identifiers):
+        """Generate paths for each of a sequence of identifiers.
+
+        Arguments:
+            identifiers: iterable of identifier strings
+
+        Yields:
+            str: object path for each identifier, in the same order
+
+        Raises:
+            LayoutException: if an identifer cannot be used to create an object
+                path
+
+        Uses identifier_to_path() with a least recently used memo of up to
+        self.memo_size mappings kept between calls, so that identifiers seen
+        again are not mapped again. The memo is discarded if the layout
+        configuration has changed since it was built.
+        """
+        config = self.config
+        to_path = getattr(self, "_memo", None)
+        if to_path is None or getattr(self, "_memo_config", None) != config:
+            to_path = functools.lru_cache(maxsize=getattr(self, "memo_size", DEFAULT_MEMO_SIZE))(self.identifier_to_path)
+            self._memo = to_path  # pylint: disable=attribute-defined-outside-init
+            self._memo_config = config  # pylint: disable=attribute-defined-outside-init
+        for identifier in identifiers:
+            yield to_path(identifier)
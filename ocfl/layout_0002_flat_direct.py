@@ -35,3 +35,15 @@ class Layout_0002_Flat_Direct(Layout):
         if identifier in ("", ".", "..") or os.sep in identifier:
             raise LayoutException("Identifier '%s' unsafe for %s layout" % (identifier, self.NAME))
         return identifier
+
+    def path_to_identifier(self, path):
+        """Convert object path relative to root back to the identifier.
+
+        Argument:
+            path (str): object path
+
+        Returns:
+            str or None: identifier, which is the same as the path, or None
+                if the path is not one that this layout would create
+        """
+        return self._identifier_if_maps_to(path, path)
@@ -4,30 +4,29 @@ Specified by: https://ocfl.github.io/extensions/0003-hash-and-id-n-tuple-storage
 """
 import os
 import re
-
-import codecs
+from urllib.parse import unquote
 
 from .digest import string_digest
 from .layout import Layout, LayoutException
 
+# Characters left unencoded in the encapsulation directory name
+SAFE_CHARS = "ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789-_"
+UNSAFE_CHAR_REGEX = re.compile(r"[^A-Za-z0-9_-]")
+# Encoded form of each UTF-8 byte value
+BYTE_ENCODINGS = tuple(chr(b) if chr(b) in SAFE_CHARS else "%%%02x" % b for b in range(256))
+
 
 def _percent_encode(c):
     """Return % encoded version of string c."""
-    c_bytes = c.encode("utf8")
-    s = ""
-    for b in c_bytes:
-        s += "%" + codecs.encode(bytes([b]), encoding="hex_codec").decode("utf8")
-    return s
+    return "".join("%%%02x" % b for b in c.encode("utf8"))
 
 
 def _get_encapsulation_directory(object_id, digest):
     """Return directory to encapsulate object."""
-    d = ""
-    for c in object_id:
-        if re.match(r"[A-Za-z0-9-_]{1}", c):
-            d += c
-        else:
-            d += _percent_encode(c)
+    if UNSAFE_CHAR_REGEX.search(object_id) is None:
+        d = object_id
+    else:
+        d = "".join([BYTE_ENCODINGS[b] for b in object_id.encode("utf8")])
     if len(d) > 100:
         return f"{d[:100]}-{digest}"
     return d
@@ -37,13 +36,9 @@ def _id_to_path(identifier, digest_algorithm, tuple_size, number_of_tuples):
     """Return storage path from identifier."""
     digest = string_digest(identifier, digest_algorithm)
     digest = digest.lower()  # Not necessary for current digests
-    path = ""
-    for i in range(number_of_tuples):
-        tuple = digest[i * tuple_size:i * tuple_size + tuple_size]
-        path = os.path.join(path, tuple)
-    encapsulation_directory = _get_encapsulation_directory(identifier, digest=digest)
-    path = os.path.join(path, encapsulation_directory)
-    return path
+    segments = [digest[i * tuple_size:(i + 1) * tuple_size] for i in range(number_of_tuples)]
+    segments.append(_get_encapsulation_directory(identifier, digest=digest))
+    return os.path.join(*segments)
 
 
 class Layout_0003_Hash_And_Id_N_Tuple(Layout):
@@ -188,3 +183,23 @@ class Layout_0003_Hash_And_Id_N_Tuple(Layout):
                            digest_algorithm=self.digest_algorithm,
                            tuple_size=self.tuple_size,
                            number_of_tuples=self.number_of_tuples)
+
+    def path_to_identifier(self, path):
+        """Convert object path relative to root back to the identifier.
+
+        Argument:
+            path (str): object path
+
+        Returns:
+            str or None: identifier decoded from the encapsulation directory
+                name, or None if the encapsulation directory name was truncated
+                or the path is not one that this layout would create
+        """
+        encapsulation_directory = os.path.basename(path)
+        if len(encapsulation_directory) > 100:
+            return None  # Truncated, identifier not recoverable
+        try:
+            identifier = unquote(encapsulation_directory, errors="strict")
+        except UnicodeDecodeError:
+            return None
+        return self._identifier_if_maps_to(identifier, path)
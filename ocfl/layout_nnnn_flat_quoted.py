@@ -32,3 +32,15 @@ class Layout_NNNN_Flat_Quoted(Layout):
         if identifier == "":
             raise LayoutException("Identifier '%s' unsafe for %s layout" % (identifier, self.NAME))
         return self.encode(identifier)
+
+    def path_to_identifier(self, path):
+        """Convert object path relative to root back to the identifier.
+
+        Argument:
+            path (str): object path
+
+        Returns:
+            str or None: identifier from Layout.decode() of the path, or None
+                if the path is not one that this layout would create
+        """
+        return self._identifier_if_maps_to(self.decode(path), path)
@@ -111,3 +111,16 @@ class Layout_NNNN_Tuple_Tree(Layout):
         # Use full identifier to encapsulate
         segments.append(identifier)
         return os.path.join(*segments)
+
+    def path_to_identifier(self, path):
+        """Convert object path relative to root back to the identifier.
+
+        Argument:
+            path (str): object path
+
+        Returns:
+            str or None: identifier decoded from the encapsulation directory
+                name, or None if the path is not one that this layout would
+                create
+        """
+        return self._identifier_if_maps_to(self.decode(os.path.basename(path)), path)
@@ -89,3 +89,21 @@ class Layout_NNNN_UUID_Quadtree(Layout):
             raise Exception("UUIDQuadtree identifier %s not valid" % (identifier))
         return os.path.join(match.group(1), match.group(2), match.group(3), match.group(4),
                             match.group(5), match.group(6), match.group(7), match.group(8))
+
+    def path_to_identifier(self, path):
+        """Convert object path relative to root back to the identifier.
+
+        Argument:
+            path (str): object path
+
+        Returns:
+            str or None: identifier with the prefix and the UUID from the
+                quadtree directory names, or None if the path is not one that
+                this layout would create
+        """
+        quads = path.split(os.sep)
+        if len(quads) != 8:
+            return None
+        identifier = self.prefix + "-".join((quads[0] + quads[1], quads[2], quads[3], quads[4],
+                                             quads[5] + quads[6] + quads[7]))
+        return self._identifier_if_maps_to(identifier, path)
@@ -57,6 +57,15 @@ def layout_is_supported(name):
     return name in _layout_registry
 
 
+def layout_names():
+    """List of the names of layouts in this registry.
+
+    Returns:
+        list: sorted list of layout names, including alias names
+    """
+    return sorted(_layout_registry.keys())
+
+
 # Register default layouts
 add_layout("0002-flat-direct-storage-layout", Layout_0002_Flat_Direct)
 add_layout("0002", Layout_0002_Flat_Direct)
@@ -0,0 +1,87 @@
+"""Migration of OCFL Object content digests.
+
+Changing the digest algorithm of an object, or adding new fixity types,
+requires a digest of every content file in the object. The
+migrate_content_digests() function reads each content file just once to
+calculate all the digests needed, on worker threads with the largest files
+first, and then rewrites the manifest, version states and fixity blocks of
+the inventory. It is used by ocfl.Object.start_new_version() when the
+new version changes the digest algorithm or fixity.
+"""
+import logging
+
+from .digest import file_multi_digests
+from .fsw import fsw_walk_files_info
+from .object_utils import ObjectException
+
+
+def migrate_content_digests(inventory, obj_fs, old_digest_algorithm, new_fixity, *,
+                            workers=1, check_digests=False):
+    """Update inventory with new content digests and fixity digests.
+
+    Reads each content file once, on workers threads with the largest files
+    first, calculating the digest for the inventory digest algorithm if it
+    differs from old_digest_algorithm, the digests for all the new_fixity
+    types, and optionally the old digest for checking. The manifest and all
+    version states are rewritten with the new digests and the new fixity
+    blocks are added.
+
+    Arguments:
+        inventory (ocfl.Inventory): inventory to update in place, the
+            digest_algorithm must already be set to the new value
+        obj_fs: fsw filesystem for the object root
+        old_digest_algorithm (str): digest algorithm of the existing
+            manifest and state digests
+        new_fixity (set): fixity types to calculate and add
+        workers (int): number of threads used to read content files
+        check_digests (bool): True to check content files against the
+            existing manifest digests
+
+    Raises:
+        ObjectException: if content files with the same manifest digest
+            have different new digests, or if check_digests is set and a
+            content file does not match its manifest digest
+    """
+    digest_algorithm = inventory.digest_algorithm
+    digest_types = set(new_fixity)
+    if digest_algorithm != old_digest_algorithm:
+        digest_types.add(digest_algorithm)
+    if check_digests:
+        digest_types.add(old_digest_algorithm)
+    content_files = fsw_walk_files_info(obj_fs)
+    paths = inventory.content_paths
+    logging.info("Calculating %s digests for %d content files",
+                 ",".join(sorted(digest_types)), len(paths))
+    digests = file_multi_digests(paths, digest_types, fs=obj_fs, workers=workers,
+                                 sizes={path: content_files.get(path, {}).get("size", 0) for path in paths})
+    if check_digests:
+        for old_digest, files in inventory.manifest.items():
+            for file in files:
+                if digests[file][old_digest_algorithm] != old_digest:
+                    raise ObjectException("Content file %s has %s digest %s but manifest has %s"
+                                          % (file, old_digest_algorithm, digests[file][old_digest_algorithm], old_digest))
+    for fixity_type in sorted(new_fixity):
+        inventory.add_fixity_type(digest_algorithm=fixity_type)
+        for path in paths:
+            inventory.add_fixity_data(fixity_type, digests[path][fixity_type], path)
+    if digest_algorithm != old_digest_algorithm:
+        old_to_new_digest = {}
+        new_manifest = {}
+        for old_digest, files in inventory.manifest.items():
+            digest = digests[files[0]][digest_algorithm]
+            for file in files[1:]:
+                # Sanity check that any dupe files also match
+                d = digests[file][digest_algorithm]
+                if d != digest:
+                    raise ObjectException("Failed sanity check - files %s and %s should have same %s digest but calculated %s and %s respectively"
+                                          % (files[0], file, digest_algorithm, digest, d))
+            old_to_new_digest[old_digest] = digest
+            new_manifest[digest] = list(files)
+        inventory.manifest = new_manifest
+        # Now update all state blocks
+        for vdir in inventory.version_directories:
+            old_state = inventory.version(vdir).state
+            state = {}
+            for old_digest, files in old_state.items():
+                state[old_to_new_digest[old_digest]] = files
+            inventory.version(vdir).state = state
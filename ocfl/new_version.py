@@ -11,10 +11,10 @@ import os.path
 from urllib.parse import quote as urlquote
 
 from .constants import DEFAULT_DIGEST_ALGORITHM, DEFAULT_CONTENT_DIRECTORY, DEFAULT_SPEC_VERSION
-from .digest import file_digest
+from .digest import file_digest, file_multi_digest, file_multi_digests
 from .inventory import Inventory, InventoryException
 from .object_utils import make_unused_filepath
-from .fsw import fsw_openfs, fsw_walk_files
+from .fsw import fsw_openfs, fsw_walk_files_info, fsw_info_mtime
 
 
 class NewVersionException(Exception):
@@ -43,6 +43,7 @@ class NewVersion():
         self.content_path_normalization = None
         self.forward_delta = None
         self.dedupe = None
+        self.workers = 1
         # Additional state needed for final commit
         self.old_digest_algorithm = None
         self.files_to_copy = {}  # dict: src_path -> content_path
@@ -58,7 +59,8 @@ class NewVersion():
                       metadata=None,
                       dedupe=True,
                       fixity=None,
-                      content_path_normalization="uri"):
+                      content_path_normalization="uri",
+                      workers=1):
         """Start the first version for this object.
 
         Arguments:
@@ -89,6 +91,8 @@ class NewVersion():
             content_path_normalization (str): the path normalization strategy
                 to use with content paths when files are added to this object
                 (default "uri")
+            workers (int): number of threads used to digest files in
+                add_from_srcdir(), default 1
 
         Example use:
 
@@ -148,6 +152,7 @@ class NewVersion():
                 and content_directory != DEFAULT_CONTENT_DIRECTORY):
             inventory.content_directory = content_directory
         self.content_path_normalization = content_path_normalization
+        self.workers = workers
         return self
 
     @classmethod
@@ -160,7 +165,8 @@ class NewVersion():
                      forward_delta=True,
                      dedupe=True,
                      carry_content_forward=False,
-                     old_digest_algorithm=None):
+                     old_digest_algorithm=None,
+                     workers=1):
         """Start the new version by adjusting inventory.
 
         If carry_content_forward is set then the state block of the previous
@@ -204,6 +210,8 @@ class NewVersion():
                 sidecar is cleaned up when writing the new inventory in the
                 object root. The value is not used within NewVerion code.
                 Default is None
+            workers (int): number of threads used to digest files in
+                add_from_srcdir(), default 1
 
         Example use:
 
@@ -229,6 +237,7 @@ class NewVersion():
         self.forward_delta = forward_delta
         self.dedupe = dedupe
         self.old_digest_algorithm = old_digest_algorithm
+        self.workers = workers
         state = {}
         if spec_version != inventory.spec_version:
             # Check we are upgrading
@@ -283,7 +292,8 @@ class NewVersion():
             vfilepath = make_unused_filepath(vfilepath, used)
         return vfilepath
 
-    def add(self, src_path, logical_path, content_path=None, src_path_has_prefix=False):  # pylint: disable=unused-argument
+    def add(self, src_path, logical_path, content_path=None, src_path_has_prefix=False,  # pylint: disable=unused-argument
+            *, digest=None, fixity_digests=None):
         """Add a file to the new version.
 
         Arguments:
@@ -300,6 +310,16 @@ class NewVersion():
                 versions content directory (must start with
                 "vdir/content_directory/") and doesn't already exist in the
                 object
+            digest (str or None): if None (default) then the digest of the
+                content will be calculated, otherwise the digest supplied is
+                trusted and the content is not read
+            fixity_digests (dict or None): if None (default) then fixity
+                digests will be calculated if the content is added to the
+                object and the inventory has fixity, otherwise a dict of
+                digest type -> digest including all the fixity types
+
+        If the inventory has a fixity block then fixity digests for each
+        fixity type are added for content files added to the object.
 
         Raises:
             NewVersionException: if the specifies content path is not allowed
@@ -320,7 +340,13 @@ class NewVersion():
         if logical_path in inventory.current_version.logical_paths:
             raise NewVersionException("Logical path %s already exists in new version %s" % (logical_path, inventory.head))
         # Work out digest, add to state
-        digest = file_digest(src_path, inventory.digest_algorithm, fs=self.src_fs)
+        if digest is None:
+            if inventory.fixity and fixity_digests is None:
+                # Calculate fixity digests in the same read in case needed
+                fixity_digests = file_multi_digest(src_path, self.digest_types, fs=self.src_fs)
+                digest = fixity_digests[inventory.digest_algorithm]
+            else:
+                digest = file_digest(src_path, inventory.digest_algorithm, fs=self.src_fs)
         if digest in inventory.current_version.state_add_if_not_present():
             inventory.current_version.state[digest].append(logical_path)
         else:
@@ -344,6 +370,11 @@ class NewVersion():
             # Yes, we copy this file in...
             self.files_to_copy[src_path] = content_path
             inventory.add_file_to_manifest(digest=digest, content_path=content_path)
+            if inventory.fixity:
+                if fixity_digests is None:
+                    fixity_digests = file_multi_digest(src_path, inventory.fixity.keys(), fs=self.src_fs)
+                for fixity_type in inventory.fixity:
+                    inventory.add_fixity_data(fixity_type, fixity_digests[fixity_type], content_path)
 
     def delete(self, logical_path):
         """Delete a logical path from this new version.
@@ -364,6 +395,21 @@ class NewVersion():
             inventory.current_version.delete_logical_path(logical_path)
         except InventoryException:
             raise NewVersionException("Cannot delete logical path %s that does not exist in new version %s" % (logical_path, inventory.head))
+        # Don't copy in files or keep fixity for content paths removed from
+        # the manifest
+        if self.files_to_copy:
+            content_paths = set(inventory.content_paths)
+            removed = set(cpath for cpath in self.files_to_copy.values() if cpath not in content_paths)
+            if removed:
+                self.files_to_copy = {src: cpath for src, cpath in self.files_to_copy.items()
+                                      if cpath not in removed}
+                for block in inventory.fixity.values():
+                    for fixity_digest in list(block.keys()):
+                        paths = [p for p in block[fixity_digest] if p not in removed]
+                        if paths:
+                            block[fixity_digest] = paths
+                        else:
+                            del block[fixity_digest]
 
     def rename(self, old_logical_path, new_logical_path):
         """Rename content in the version state to a new logical_path.
@@ -379,19 +425,121 @@ class NewVersion():
         inventory = self.inventory
         if new_logical_path in inventory.current_version.logical_paths:
             raise NewVersionException("Cannot rename to logical path %s that already exists in new version %s" % (new_logical_path, inventory.head))
-        try:
-            digest = inventory.current_version.delete_logical_path(old_logical_path)
-            if digest in inventory.current_version.state:
-                inventory.current_version.state[digest].append(new_logical_path)
-            else:
-                inventory.current_version.state[digest] = [new_logical_path]
-        except InventoryException:
-            raise NewVersionException("Cannot rename logical path %s that does not exist in new version %s" % (old_logical_path, inventory.head))
+        # Rename within the state block directly so that any content added
+        # in this version for the digest is kept in the manifest
+        for paths in inventory.current_version.state.values():
+            if old_logical_path in paths:
+                paths[paths.index(old_logical_path)] = new_logical_path
+                return
+        raise NewVersionException("Cannot rename logical path %s that does not exist in new version %s" % (old_logical_path, inventory.head))
+
+    def add_from_srcdir(self, previous_files=None, not_modified_since=None):
+        """Add all content from srcdir.
+
+        Without previous_files every file in srcdir is read to calculate its
+        digest. With previous_files, a file with the same logical path and
+        size as in previous_files, and a modification time before
+        not_modified_since, is assumed to be unchanged and is added with the
+        previous digest without being read. All other files (new paths,
+        changed sizes, and suspect files that may have been modified or for
+        which the filesystem does not report a modification time) are read.
+
+        Digests are calculated first, using self.workers threads with the
+        largest files first, and then the files are added in sorted order of
+        path so that the resulting inventory does not depend on the number
+        of workers.
+
+        Arguments:
+            previous_files (dict or None): dict of logical_path -> (digest, size)
+                for files in the previous version, or None (default) to read
+                every file
+            not_modified_since (float or None): POSIX timestamp, typically the
+                storage modification time of the previous version inventory. If None then all files
+                are suspect and will be read
+        """
+        src_files = fsw_walk_files_info(self.src_fs)
+        digests = {}
+        if previous_files is not None:
+            for src_path, info in src_files.items():
+                previous = previous_files.get(src_path)
+                if previous is not None and info.get("size") == previous[1]:
+                    mtime = fsw_info_mtime(info)
+                    if mtime is not None and not_modified_since is not None and mtime < not_modified_since:
+                        digests[src_path] = previous[0]
+            logging.info("Read %d files from srcdir, assumed %d unchanged from previous version",
+                         len(src_files) - len(digests), len(digests))
+        to_digest = [src_path for src_path in src_files if src_path not in digests]
+        all_digests = file_multi_digests(to_digest, self.digest_types, fs=self.src_fs,
+                                         workers=self.workers,
+                                         sizes={src_path: src_files[src_path].get("size", 0) for src_path in to_digest})
+        for src_path in to_digest:
+            digests[src_path] = all_digests[src_path][self.inventory.digest_algorithm]
+        for src_path in sorted(src_files):
+            self.add(src_path, src_path, src_path_has_prefix=False,
+                     digest=digests[src_path], fixity_digests=all_digests.get(src_path))
+
+    @property
+    def digest_types(self):
+        """List of the digest algorithm and fixity types for content added."""
+        inventory = self.inventory
+        return [inventory.digest_algorithm] + sorted(t for t in inventory.fixity if t != inventory.digest_algorithm)
+
+    @property
+    def previous_vdir(self):
+        """Version directory of the version before this new one, else None."""
+        inventory = self.inventory
+        prev_vdir = None
+        for v in inventory.version_directories:
+            if v == inventory.head:
+                break
+            prev_vdir = v
+        return prev_vdir
+
+    def apply_changes(self, changes):
+        """Apply an explicit list of changes to the new version state.
+
+        Intended for use with a new version started with
+        carry_content_forward=True so that only the files named in the
+        changes are read and digested, rather than every file in srcdir.
+        Changes are applied in order, each is a dict with an "op" key and
+        other keys depending on the operation:
+
+            {"op": "add", "path": logical_path, "src": src_path}
+            {"op": "replace", "path": logical_path, "src": src_path}
+            {"op": "delete", "path": logical_path}
+            {"op": "rename", "path": logical_path, "to": new_logical_path}
+
+        where src_path is the path of the file within srcdir and defaults
+        to the logical path if not given. An "add" requires that the logical
+        path does not exist in the version state, a "replace" requires that
+        it does.
 
-    def add_from_srcdir(self):
-        """Add all content from srcdir."""
-        for src_path in sorted(fsw_walk_files(self.src_fs)):
-            self.add(src_path, src_path, src_path_has_prefix=False)
+        Arguments:
+            changes (list): list of change dicts as described above
+
+        Raises:
+            NewVersionException: if a change is not understood or cannot be
+                applied to the version state
+        """
+        for n, change in enumerate(changes):
+            try:
+                op = change["op"]
+                logical_path = change["path"]
+            except (KeyError, TypeError):
+                raise NewVersionException("Change %d must have op and path, got %s" % (n, str(change)))
+            logging.debug("Change %d: %s %s", n, op, logical_path)
+            if op in ("add", "replace"):
+                if op == "replace":
+                    self.delete(logical_path)
+                self.add(change.get("src", logical_path), logical_path)
+            elif op == "delete":
+                self.delete(logical_path)
+            elif op == "rename":
+                if "to" not in change:
+                    raise NewVersionException("Change %d to rename %s must have to path" % (n, logical_path))
+                self.rename(logical_path, change["to"])
+            else:
+                raise NewVersionException("Change %d has unknown op %s" % (n, op))
 
     @property
     def created(self):
@@ -443,40 +591,7 @@ class NewVersion():
                 content digest; and logical_path is the logical path of the
                 content file. An empty list indicates no content change between
                 versions.
+
+        See ocfl.Inventory.diff_versions() to compare any pair of versions.
         """
-        inventory = self.inventory
-        current_state = inventory.current_version.state
-        # Get previous version state, if any
-        prev_vdir = None
-        for v in inventory.version_directories:
-            if v == inventory.head:
-                break
-            prev_vdir = v
-        if not prev_vdir:
-            # No previous version, everything is an add
-            return [
-                ("A", digest, lp)
-                for digest, lps in current_state.items() for lp in lps
-            ]
-        prev_state = inventory.version(prev_vdir).state
-        # Flatten previous version state: set of (digest, logical_path)
-        prev_paths = set()
-        for digest, logical_paths in prev_state.items():
-            for lp in logical_paths:
-                prev_paths.add((digest, lp))
-        # Flatten current version state: set of (digest, logical_path)
-        curr_paths = set()
-        for digest, logical_paths in current_state.items():
-            for lp in logical_paths:
-                curr_paths.add((digest, lp))
-        # Additions
-        adds = curr_paths - prev_paths
-        # Deletions
-        deletes = prev_paths - curr_paths
-        # Compose result
-        result = []
-        for (d, lp) in adds:
-            result.append(("A", d, lp))
-        for (d, lp) in deletes:
-            result.append(("D", d, lp))
-        return result
+        return self.inventory.diff_versions(self.previous_vdir, self.inventory.head)
@@ -7,18 +7,19 @@ application beyond the operating system filesystem to include ``mem://``,
 ``zip://`` and ``s3://`` filesystems.
 """
 import copy
-import json
 import os.path
 import re
 import logging
 
 from .constants import INVENTORY_FILENAME, DEFAULT_SPEC_VERSION, DEFAULT_CONTENT_DIRECTORY
-from .digest import file_digest
+from .digest import file_digest, bytes_digest
 from .inventory import Inventory
-from .inventory_validator import InventoryValidator
+from .inventory_cache import InventoryCacheEntry, inventory_cache, parse_inventory_bytes, read_sidecar_key
+from .migration import migrate_content_digests
 from .new_version import NewVersion
 from .object_utils import parse_version_directory, ObjectException
-from .fsw import fsw_openfs, fsw_copyfile, fsw_listdir_names, fsw_opendir_as_fs, FswException
+from .fsw import fsw_openfs, fsw_copyfile, fsw_listdir_names, fsw_opendir_as_fs, \
+    fsw_info_mtime, FswException
 from .namaste import Namaste
 from .validator import Validator, ValidatorAbortException
 from .version_metadata import VersionMetadata
@@ -79,7 +80,7 @@ class Object():  # pylint: disable=too-many-public-methods
                  spec_version=DEFAULT_SPEC_VERSION,
                  forward_delta=True, dedupe=True,
                  lax_digests=False, fixity=None,
-                 obj_fs=None, path=None, create=False):
+                 obj_fs=None, path=None, create=False, workers=1):
         """Initialize OCFL object.
 
         Arguments:
@@ -106,6 +107,8 @@ class Object():  # pylint: disable=too-many-public-methods
                 to obj_fs)
             create (bool): set True to allow opening filesystem at path to create
                 a directory
+            workers (int): number of threads used to digest source files when
+                creating or updating the object, default 1
         """
         self.id = identifier
         self.content_directory = content_directory
@@ -116,6 +119,7 @@ class Object():  # pylint: disable=too-many-public-methods
         self.dedupe = dedupe
         self.fixity = fixity
         self.lax_digests = lax_digests
+        self.workers = workers
         self.src_files = {}
         self.obj_fs = obj_fs  # fs filesystem (or sub-filesystem) for object
         if path is not None:
@@ -301,7 +305,8 @@ class Object():  # pylint: disable=too-many-public-methods
                                               metadata=metadata,
                                               fixity=self.fixity,
                                               dedupe=self.dedupe,
-                                              content_path_normalization=self.content_path_normalization)
+                                              content_path_normalization=self.content_path_normalization,
+                                              workers=self.workers)
             else:
                 nv = NewVersion.next_version(inventory=inventory,
                                              srcdir=os.path.join(srcdir, vdir),
@@ -309,7 +314,8 @@ class Object():  # pylint: disable=too-many-public-methods
                                              content_path_normalization=self.content_path_normalization,
                                              forward_delta=self.forward_delta,
                                              dedupe=self.dedupe,
-                                             carry_content_forward=False)
+                                             carry_content_forward=False,
+                                             workers=self.workers)
             # Add content, everything in srcdir
             nv.add_from_srcdir()
             inventory = nv.inventory
@@ -353,7 +359,8 @@ class Object():  # pylint: disable=too-many-public-methods
                                       metadata=metadata,
                                       fixity=self.fixity,
                                       dedupe=self.dedupe,
-                                      content_path_normalization=self.content_path_normalization)
+                                      content_path_normalization=self.content_path_normalization,
+                                      workers=self.workers)
         # Add content, everything in srcdir
         nv.add_from_srcdir()
         inventory = nv.inventory
@@ -372,7 +379,8 @@ class Object():  # pylint: disable=too-many-public-methods
         logging.info("Created OCFL object %s in %s", self.id, objdir)
         return inventory
 
-    def add_version_with_content(self, objdir="", srcdir=None, metadata=None, abort_if_no_difference=False):
+    def add_version_with_content(self, objdir="", srcdir=None, metadata=None, abort_if_no_difference=False,
+                                 detect_changes=False):
         """Update object by adding a new version with content matching srcdir.
 
         Arguments:
@@ -383,6 +391,11 @@ class Object():  # pylint: disable=too-many-public-methods
             metadata (ocfl.VersionMetadata): object applied to all versions
             abort_if_no_difference (bool): if True, do not create a new version if
                 the content of srcdir is the same as the latest version
+            detect_changes (bool): if True, files in srcdir with the same
+                logical path and size as in the latest version, and not
+                modified since that version was written to storage, are
+                assumed to be unchanged and are not read. Only new, resized and suspect
+                files are digested. Default False reads every file
 
         Returns:
             ocfl.Inventory: inventory of updated object or None if no new version was created.
@@ -401,7 +414,10 @@ class Object():  # pylint: disable=too-many-public-methods
                                     carry_content_forward=False)
         # Add files if srcdir is set
         if srcdir is not None:
-            nv.add_from_srcdir()
+            if detect_changes:
+                nv.add_from_srcdir(*self._previous_version_files(nv))
+            else:
+                nv.add_from_srcdir()
         # Optionally abort if no difference
         if abort_if_no_difference:
             diff = nv.diff_with_previous()
@@ -411,15 +427,101 @@ class Object():  # pylint: disable=too-many-public-methods
         # Write the new version
         return self.write_new_version(nv)
 
+    def update_with_changes(self, objdir="", srcdir=".", changes=None, metadata=None):
+        """Update object by adding a new version from an explicit change list.
+
+        The new version starts with the state of the current head version and
+        the changes are applied with ocfl.NewVersion.apply_changes(), so only
+        files that are added or replaced are read and digested. This makes
+        small updates to objects with very many files cheap compared with
+        add_version_with_content() which digests the complete new state.
+
+        Arguments:
+            objdir (str): sub-directory of the object filesystem that contains the
+                object to be update. The default is "" in which case the object
+                is assume to be at the filesystem root.
+            srcdir (str): source directory that src paths of added and replaced
+                files are relative to, default "."
+            changes (list): list of change dicts, see
+                ocfl.NewVersion.apply_changes() for the format. Default None
+                is an empty list, making a new version with the same content
+            metadata (ocfl.VersionMetadata): metadata for the new version
+
+        Returns:
+            ocfl.Inventory: inventory of updated object
+
+        Raises:
+            ObjectException: if the object is not valid
+            NewVersionException: if the changes cannot be applied
+        """
+        nv = self.start_new_version(objdir=objdir,
+                                    srcdir=srcdir,
+                                    digest_algorithm=self.digest_algorithm,
+                                    fixity=self.fixity,
+                                    metadata=metadata,
+                                    carry_content_forward=True)
+        nv.apply_changes(changes or [])
+        return self.write_new_version(nv)
+
+    def _previous_version_files(self, new_version):
+        """Digests and sizes of files in the version before new_version.
+
+        Sizes are taken from listings of just the directories holding the
+        content files of the previous version, not the whole object. Logical
+        paths for content that is not found in the listings are omitted so
+        that they will be treated as new. The time before which
+        files are assumed not modified is the storage modification time of
+        the inventory.json of the previous version, not the user-supplied
+        created time of that version.
+
+        Arguments:
+            new_version (ocfl.NewVersion): new version being built
+
+        Returns:
+            tuple: (previous_files, not_modified_since) where previous_files
+                is a dict of logical_path -> (digest, size) and
+                not_modified_since is the POSIX timestamp of the modification
+                time of the previous version inventory or None if not available
+        """
+        inventory = new_version.inventory
+        version = inventory.version(new_version.previous_vdir)
+        content_paths = {digest: inventory.content_path_for_digest(digest) for digest in version.state}
+        dirpaths = set(os.path.dirname(p) for p in content_paths.values() if p is not None)
+        dirpaths.add(new_version.previous_vdir)
+        files_info = {}
+        for dirpath in dirpaths:
+            try:
+                for info in self.obj_fs.ls(dirpath, detail=True):
+                    files_info[info["name"].lstrip("/")] = info
+            except FileNotFoundError:
+                pass
+        previous_files = {}
+        for digest, logical_paths in version.state.items():
+            info = files_info.get(content_paths[digest])
+            if info is not None:
+                for logical_path in logical_paths:
+                    previous_files[logical_path] = (digest, info.get("size"))
+        info = files_info.get(new_version.previous_vdir + "/" + INVENTORY_FILENAME)
+        not_modified_since = None if info is None else fsw_info_mtime(info)
+        return previous_files, not_modified_since
+
     def start_new_version(self, *,
                           objdir=None,
                           srcdir="",
                           digest_algorithm=None,
                           fixity=None,
                           metadata=None,
-                          carry_content_forward=True):
+                          carry_content_forward=True,
+                          check_digests=False):
         """Start a new version to be added to this object.
 
+        If the digest algorithm is changed, or new fixity types are requested,
+        then every content file in the object is read once, on self.workers
+        threads, to calculate the new content digests and all the new fixity
+        digests together (see ocfl.migration.migrate_content_digests()). The
+        new fixity digests are added to the fixity block for all content
+        files.
+
         Arguments:
             objdir (str or None): sub-directory of the object filesystem that
                 contains the object to be update. The default is None in which
@@ -435,18 +537,26 @@ class Object():  # pylint: disable=too-many-public-methods
             carry_content_forward (bool): True to carry forward the state from
                 the last current version as a starting point. False to start
                 with empty version state.
+            check_digests (bool): if True and content files are read to
+                calculate new digests, also check them against the existing
+                digests in the manifest. Default False
 
         Returns:
             ocfl.NewVersion: object where the new version will be built before
             finally be added with write_new_version()
+
+        Raises:
+            ObjectException: if the object is not valid, or if content files
+                do not match the manifest when checked
         """
         # Check the current object
         self.open_obj_fs(objdir)
-        validator = Validator(check_digests=False, lax_digests=self.lax_digests)
+        validator = Validator(check_digests=False, lax_digests=self.lax_digests,
+                              cache_inventory=True)
         if not validator.validate_object(objdir):
             raise ObjectException("Object at '%s' is not valid, aborting" % objdir)
-        inventory = self.parse_inventory()
-        # Object is valid, have inventory
+        inventory = Inventory(self.parse_inventory(use_cache=True))
+        # Object is valid, have inventory (copied because it will be modified)
         #
         # Is this a request to change the digest algorithm? We implement this
         # as part of the Object class because it requires access to all
@@ -460,6 +570,7 @@ class Object():  # pylint: disable=too-many-public-methods
             inventory.digest_algorithm = digest_algorithm
         # Is this a request to change the set of fixity information?
         old_fixity = set(inventory.fixity.keys())
+        new_fixity = set()  # fixity types to calculate from content
         if fixity is None:
             # Not explicit, carry forward from previous version. Only change will
             # be adding old digest information if we are changing digestAlgorithm
@@ -475,35 +586,20 @@ class Object():  # pylint: disable=too-many-public-methods
             if fixity != old_fixity:
                 for digest in old_fixity.difference(fixity):
                     inventory.fixity.pop(digest)
-                for digest in fixity.difference(old_fixity):
-                    logging.info("FIXME - need to add fixity with digest %s", digest)
+                for fixity_type in fixity.difference(old_fixity):
+                    if fixity_type == old_digest_algorithm:
+                        # Have these digests already in the manifest
+                        inventory.add_fixity_type(digest_algorithm=fixity_type,
+                                                  map=copy.deepcopy(inventory.manifest))
+                    else:
+                        new_fixity.add(fixity_type)
         if fixity != old_fixity:
             logging.info("New version will have %s instead of %s fixity",
                          ",".join(sorted(fixity)), ",".join(sorted(old_fixity)))
         # Now look at contents, manifest and state
-        manifest = copy.deepcopy(inventory.manifest)
-        if digest_algorithm != old_digest_algorithm:
-            old_to_new_digest = {}
-            new_manifest = {}
-            for old_digest, files in manifest.items():
-                digest = file_digest(files[0], digest_algorithm, fs=self.obj_fs)
-                old_to_new_digest[old_digest] = digest
-                for file in files[1:]:
-                    # Sanity check that any dupe files also match
-                    d = file_digest(file, digest_algorithm, fs=self.obj_fs)
-                    if d != digest:
-                        raise ObjectException("Failed sanity check - files %s and %s should have same %s digest but calculated %s and %s respectively" %
-                                              files[0], file, digest_algorithm, digest, d)
-                new_manifest[digest] = manifest[old_digest]
-            manifest = new_manifest
-            # Now update all state blocks
-            for vdir in inventory.version_directories:
-                old_state = inventory.version(vdir).state
-                state = {}
-                for old_digest, files in old_state.items():
-                    state[old_to_new_digest[old_digest]] = old_state[old_digest]
-                inventory.version(vdir).state = state
-        inventory.manifest = manifest
+        if digest_algorithm != old_digest_algorithm or len(new_fixity) > 0:
+            migrate_content_digests(inventory, self.obj_fs, old_digest_algorithm, new_fixity,
+                                    workers=self.workers, check_digests=check_digests)
         return NewVersion.next_version(inventory=inventory,
                                        srcdir=srcdir,
                                        metadata=metadata,
@@ -511,7 +607,8 @@ class Object():  # pylint: disable=too-many-public-methods
                                        forward_delta=self.forward_delta,
                                        dedupe=self.dedupe,
                                        carry_content_forward=carry_content_forward,
-                                       old_digest_algorithm=old_digest_algorithm)
+                                       old_digest_algorithm=old_digest_algorithm,
+                                       workers=self.workers)
 
     def write_new_version(self, new_version):
         """Update this object with the specified new version.
@@ -536,6 +633,16 @@ class Object():  # pylint: disable=too-many-public-methods
         # Write inventory in both root and head version
         self.write_inventory_and_sidecar(inventory, inventory.head)
         self.write_inventory_and_sidecar(inventory)
+        # Update object declaration if the specification version has changed,
+        # writing the new one before removing the old so that the directory
+        # always has a declaration
+        declaration = Namaste(0, "ocfl_object_" + inventory.spec_version)
+        if not self.obj_fs.exists(declaration.filename):
+            declaration.write(fsw=self.obj_fs)
+            for name in fsw_listdir_names(self.obj_fs, ""):
+                if name.startswith("0=ocfl_object_") and name != declaration.filename:
+                    self.obj_fs.rm(name)
+            logging.info("Updated object declaration to %s", declaration.filename)
         logging.info("Updated OCFL object %s by adding %s", inventory.id, inventory.head)
         return inventory
 
@@ -616,7 +723,8 @@ class Object():  # pylint: disable=too-many-public-methods
         return tree
 
     def validate(self, objdir=None, log_warnings=True,
-                 log_errors=True, check_digests=True):
+                 log_errors=True, check_digests=True, *, workers=1,
+                 max_memory=None, level=None, fail_fast=False):
         """Validate OCFL object at objdir.
 
         Arguments:
@@ -627,6 +735,16 @@ class Object():  # pylint: disable=too-many-public-methods
                 validation log
             check_digests (bool): True (deafult) to check content file digests
                 in the validation process
+            workers (int): number of threads used to read version inventories
+                ahead of their validation, default 1
+            max_memory (int or None): approximate maximum bytes of memory
+                for listings of content files and digests while checking
+                content, beyond which they are spilled to temporary files.
+                Default None for no limit
+            level (str or None): validation level from
+                ocfl.constants.VALIDATION_LEVELS, default None to use
+                check_digests
+            fail_fast (bool): True to stop at the first error, default False
 
         Returns:
             tuple: ``(passed, validator)`` where passed is True if validation
@@ -637,7 +755,11 @@ class Object():  # pylint: disable=too-many-public-methods
         validator = Validator(log_warnings=log_warnings,
                               log_errors=log_errors,
                               check_digests=check_digests,
-                              lax_digests=self.lax_digests)
+                              lax_digests=self.lax_digests,
+                              workers=workers,
+                              max_memory=max_memory,
+                              level=level,
+                              fail_fast=fail_fast)
         if objdir is None:
             objdir = self.obj_fs
         passed = validator.validate_object(objdir)
@@ -691,7 +813,7 @@ class Object():  # pylint: disable=too-many-public-methods
         """
         self.open_obj_fs(objdir)
         # Read inventory, set up version
-        inv = self.parse_inventory()
+        inv = self.parse_inventory(use_cache=True)
         if version == "head":
             version = inv.head
             logging.debug("Object at %s has head %s", objdir, version)
@@ -784,27 +906,68 @@ class Object():  # pylint: disable=too-many-public-methods
             raise ObjectException("Logical path %s not found in %s" % (logical_path, version))
         return VersionMetadata(inventory=inv, version=version)
 
-    def parse_inventory(self):
+    def parse_inventory(self, use_cache=False):
         """Read JSON root inventory file for this object.
 
         Will validate the inventory and normalize the digests so that the rest
         of the Object methods can assume correctness and matching string digests
         between state and manifest blocks.
 
+        Arguments:
+            use_cache (bool): if True then use the process-wide inventory cache
+                (see ocfl.inventory_cache) keyed by the root inventory sidecar
+                digest, avoiding re-reading and re-validating an unchanged
+                inventory. The cached Inventory object is shared and must not be
+                modified. Default False to return a new Inventory object
+
         Returns:
-            ocfl.Inventory: new Inventory object for the parsed inventory.
+            ocfl.Inventory: Inventory object for the parsed inventory.
         """
-        with self.obj_fs.open(INVENTORY_FILENAME, "r") as fh:
-            inventory = Inventory(json.load(fh))
-        # Validate
-        iv = InventoryValidator()
-        if not iv.validate(inventory=inventory.data):
-            raise ObjectException("Root inventory is not valid (%d errors)" % iv.log.num_errors)
-        self.spec_version = iv.spec_version
-        # Normalize digests in place
-        inventory.normalize_digests(iv.digest_algorithm)
+        if use_cache:
+            return self.inventory_cache_entry().inventory
+        inventory, _ = self._read_inventory()
         return inventory
 
+    def _read_inventory(self):
+        """Read, validate and normalize the root inventory.
+
+        Returns:
+            tuple: (inventory, raw) where inventory is the ocfl.Inventory and
+                raw is the bytes of the inventory file
+        """
+        with self.obj_fs.open(INVENTORY_FILENAME, "rb") as fh:
+            raw = fh.read()
+        inventory, self.spec_version = parse_inventory_bytes(raw)
+        return inventory, raw
+
+    def inventory_cache_entry(self):
+        """Get the inventory cache entry for this object.
+
+        The entry's derived dict may be used to keep data derived from the
+        inventory for as long as the inventory is unchanged.
+
+        Returns:
+            ocfl.inventory_cache.InventoryCacheEntry: the cache entry, which
+                will not be retained in the cache if the inventory could not
+                be checked against a sidecar digest
+        """
+        sidecar_key = read_sidecar_key(self.obj_fs, [self.digest_algorithm])
+        entry = inventory_cache().get(sidecar_key)
+        if entry is not None:
+            logging.debug("Using cached inventory for %s", sidecar_key[1])
+            self.spec_version = entry.inventory.spec_version
+            return entry
+        inventory, raw = self._read_inventory()
+        if sidecar_key is not None:
+            # Only cache if the sidecar is correct for the inventory read
+            digest_algorithm, digest = sidecar_key
+            try:
+                if bytes_digest(raw, digest_algorithm) == digest:
+                    return inventory_cache().put(sidecar_key, inventory)
+            except ValueError:
+                logging.debug("Cannot check sidecar with unknown digest %s", digest_algorithm)
+        return InventoryCacheEntry(inventory, 0)
+
     def id_from_inventory(self, failure_value="UNKNOWN-ID"):
         """Read JSON root inventory file for this object and extract id.
 
@@ -817,7 +980,7 @@ class Object():  # pylint: disable=too-many-public-methods
             be extracted.
         """
         try:
-            inventory = self.parse_inventory()
+            inventory = self.parse_inventory(use_cache=True)
             return inventory.id
         except ObjectException:
             return failure_value
@@ -171,3 +171,48 @@ def parse_version_directory(dirname):
     if v == 0:
         raise ObjectException("Bad version directory name: %s, v0 no allowed" % (dirname))
     return v
+
+
+def versions_missing_from(inventory, replica_inventory):
+    """Version directories of inventory that are missing from a replica.
+
+    Arguments:
+        inventory (ocfl.Inventory): inventory of the object
+        replica_inventory (ocfl.Inventory): inventory of a replica of the
+            object
+
+    Returns:
+        list: version directories of inventory after the head version of
+            replica_inventory, empty if the replica is up to date
+
+    Versions are compared by their metadata and by the content paths of
+    each logical path, not by digests, because a change of digest algorithm
+    in a later version rewrites the digests of all earlier versions.
+
+    Raises:
+        ObjectException: if the replica is of a different object or has
+            versions that do not match the object
+    """
+    if replica_inventory.id != inventory.id:
+        raise ObjectException("Replica is of object %s, not %s" % (replica_inventory.id, inventory.id))
+    replica_versions = replica_inventory.version_directories
+    for vdir in replica_versions:
+        if _version_key(replica_inventory, vdir) != _version_key(inventory, vdir):
+            raise ObjectException("Replica version %s does not match the object" % (vdir))
+    return inventory.version_directories[len(replica_versions):]
+
+
+def _version_key(inventory, vdir):
+    """Return comparable key of version vdir independent of digest algorithm.
+
+    The key has the created, message and user of the version, and the
+    sorted content paths for each logical path resolved through the manifest.
+    """
+    versiondata = inventory.versiondata(vdir)
+    manifest = inventory.manifest
+    content_paths = {}
+    for digest, logical_paths in versiondata.get("state", {}).items():
+        paths = tuple(sorted(manifest.get(digest, [])))
+        for logical_path in logical_paths:
+            content_paths[logical_path] = paths
+    return (versiondata.get("created"), versiondata.get("message"), versiondata.get("user"), content_paths)
@@ -0,0 +1,315 @@
+"""Incremental replication of OCFL Objects and Storage Roots.
+
+OCFL versions are immutable, so a replica of an object that is behind
+needs only the version directories that it is missing, followed by the
+root inventory and sidecar. The replicate_object() function copies just
+these. The root inventory sidecars are compared first so that checking an
+up to date replica costs only two small reads.
+
+For a whole storage root, compare_storage_roots() reports the state of
+each object in a replica and sync_storage_root() replicates every object,
+or just those given, to another storage root.
+
+Example:
+    >>> import ocfl
+    >>> from ocfl.replication import replicate_object
+    >>> obj = ocfl.Object(path="fixtures/1.1/good-objects/spec-ex-full")
+    >>> replicate_object(obj, "/tmp/replica")
+    ['v1', 'v2', 'v3']
+"""
+from concurrent.futures import ThreadPoolExecutor
+import logging
+import os.path
+import threading
+
+from .constants import INVENTORY_FILENAME
+from .fsw import fsw_openfs, fsw_opendir_as_fs, fsw_copyfile, fsw_copydirs, fsw_listdir_names, fsw_walk_files, \
+    FswException
+from .inventory import InventoryException
+from .inventory_cache import read_sidecar_key
+from .namaste import find_namastes
+from .object import Object
+from .object_utils import versions_missing_from, ObjectException
+from .storage_root import StorageRoot, StorageRootException
+
+
+def replicate_object(obj, dst_fs, objdir=None, workers=1, level="inventory"):
+    """Copy any versions of obj that are missing from a replica.
+
+    OCFL versions are immutable, so a replica that is behind needs only
+    the new version directories and then the root inventory and sidecar.
+    If the root inventory sidecars match then nothing is copied. The new
+    version directories are copied concurrently, any partial copies left
+    by an earlier interrupted replication are first removed. The root
+    inventory and sidecar are written last, so that an interrupted
+    replication can be resumed by calling this function again. Until then
+    the replica is not valid because it has version directories that its
+    root inventory does not include.
+
+    Arguments:
+        obj (ocfl.Object): the object to replicate
+        dst_fs: fsw filesystem for the replica object root, or path or
+            fsw URL string which is opened and created if necessary
+        objdir (str or None): path to the object to replicate, None
+            (default) to use the already open obj.obj_fs
+        workers (int): number of version directories to copy concurrently
+        level (str or None): validation level from
+            ocfl.constants.VALIDATION_LEVELS used to check the replica
+            after copying, default "inventory". None to not check
+
+    Returns:
+        list: version directories copied, empty if the replica was already
+            up to date
+
+    Raises:
+        ObjectException: if the replica is of a different object or has
+            versions that do not match obj, or if copying or the check of
+            the replica fails
+    """
+    if objdir is not None:
+        obj.open_obj_fs(objdir)
+    src_fs = obj.obj_fs
+    if isinstance(dst_fs, str):
+        dst_fs = fsw_openfs(dst_fs, create=True)
+    src_key = read_sidecar_key(src_fs, [obj.digest_algorithm])
+    if src_key is None:
+        raise ObjectException("Cannot replicate object without exactly one readable root inventory sidecar")
+    replica_inventory = None
+    if dst_fs.exists(INVENTORY_FILENAME):
+        if read_sidecar_key(dst_fs, [src_key[0]]) == src_key:
+            logging.info("Replica is already up to date")
+            return []
+        replica_inventory = Object(obj_fs=dst_fs).parse_inventory()
+    inventory = obj.parse_inventory(use_cache=True)
+    if replica_inventory is None:
+        new_versions = inventory.version_directories
+    else:
+        new_versions = versions_missing_from(inventory, replica_inventory)
+    for vdir in new_versions:
+        if dst_fs.exists(vdir):
+            logging.info("Removing partial copy of %s from replica", vdir)
+            dst_fs.rm(vdir, recursive=True)
+    copies = [(src_fs, vdir, dst_fs, vdir) for vdir in new_versions]
+    for n, e in fsw_copydirs(copies, workers=workers):
+        if e is not None:
+            raise ObjectException("Failed to copy %s to replica (%s)" % (new_versions[n], str(e)))
+    # Object declaration, the new one before removing any old one, and any
+    # object extensions
+    for name in fsw_listdir_names(src_fs, ""):
+        if name.startswith("0=ocfl_object_") and not dst_fs.exists(name):
+            fsw_copyfile(src_fs, name, dst_fs, name)
+            for dst_name in fsw_listdir_names(dst_fs, ""):
+                if dst_name.startswith("0=ocfl_object_") and dst_name != name:
+                    dst_fs.rm(dst_name)
+    if src_fs.isdir("extensions"):
+        for filepath in fsw_walk_files(src_fs, "extensions"):
+            path = os.path.join("extensions", filepath)
+            dst_fs.makedirs(os.path.dirname(path), exist_ok=True)
+            fsw_copyfile(src_fs, path, dst_fs, path)
+    # Root inventory and sidecar last
+    sidecar = INVENTORY_FILENAME + "." + src_key[0]
+    fsw_copyfile(src_fs, INVENTORY_FILENAME, dst_fs, INVENTORY_FILENAME)
+    fsw_copyfile(src_fs, sidecar, dst_fs, sidecar)
+    for name in fsw_listdir_names(dst_fs, ""):
+        if name.startswith(INVENTORY_FILENAME + ".") and name != sidecar:
+            dst_fs.rm(name)
+    logging.info("Replicated %s of object %s", ",".join(new_versions), inventory.id)
+    if level is not None:
+        passed, validator = Object(obj_fs=dst_fs, lax_digests=obj.lax_digests).validate(level=level, log_warnings=False)
+        if not passed:
+            raise ObjectException("Replica of object %s is not valid: %s" % (inventory.id, str(validator)))
+    return new_versions
+
+
+def sync_storage_root(store, dst_root, *, workers=1, version_workers=1, level="inventory",
+                      object_paths=None):
+    """Replicate store to another storage root, copying only new versions.
+
+    If the destination storage root does not have a root declaration then
+    the files in the top level of store and any extensions
+    directory are copied to create it. Otherwise it must have the same
+    specification version and layout. Each object is then replicated to
+    the same path with replicate_object(), which copies
+    only the versions that are missing from the replica. Objects are
+    synced concurrently on workers threads. Objects in the destination
+    that are not in store are left alone. An object that cannot be read or
+    replicated is counted as an error, and any directories created for a
+    new replica of it are removed.
+
+    Arguments:
+        store (ocfl.StorageRoot): the storage root to replicate
+        dst_root (str): path or fsw URL of the destination storage root,
+            which is created if it does not exist
+        workers (int): number of objects to sync concurrently
+        version_workers (int): number of version directories to copy
+            concurrently within each object
+        level (str or None): validation level from
+            ocfl.constants.VALIDATION_LEVELS used to check each updated
+            replica object, None to not check
+        object_paths (iterable or None): paths of the objects to sync, for
+            example from the entries of compare_storage_roots() with status "missing"
+            or "missing-versions". Default None to sync all objects
+
+    Returns:
+        dict: counts of objects with each status "updated", "unchanged"
+            and "error"
+
+    Raises:
+        StorageRootException: if store or the destination storage root is
+            not valid, or if they do not match
+    """
+    store.open_root_fs()
+    store.check_root_structure()
+    dst_root_fs = fsw_openfs(dst_root, create=True)
+    if len(find_namastes(0, fsw=dst_root_fs)) == 0:
+        logging.info("Creating storage root %s", dst_root)
+        for name in fsw_listdir_names(store.root_fs, ""):
+            if store.root_fs.isfile(name):
+                fsw_copyfile(store.root_fs, name, dst_root_fs, name)
+        if store.root_fs.isdir("extensions"):
+            for filepath in fsw_walk_files(store.root_fs, "extensions"):
+                path = os.path.join("extensions", filepath)
+                dst_root_fs.makedirs(os.path.dirname(path), exist_ok=True)
+                fsw_copyfile(store.root_fs, path, dst_root_fs, path)
+    dst = StorageRoot(root=dst_root)
+    dst.root_fs = dst_root_fs
+    dst.check_root_structure()
+    if dst.spec_version != store.spec_version or dst.layout_name != store.layout_name:
+        raise StorageRootException("Destination storage root %s has specification version %s and layout %s, expected %s and %s"
+                                   % (dst_root, dst.spec_version, dst.layout_name, store.spec_version, store.layout_name))
+    counts = {"updated": 0, "unchanged": 0, "error": 0}
+    lock = threading.Lock()
+
+    def _sync(dirpath):
+        created = False
+        try:
+            obj = Object(obj_fs=fsw_opendir_as_fs(fs=store.root_fs, path=dirpath),
+                         lax_digests=store.lax_digests)
+            # Read the inventory before creating anything in the destination
+            obj.parse_inventory(use_cache=True)
+            created = not dst_root_fs.exists(dirpath)
+            dst_root_fs.makedirs(dirpath, exist_ok=True)
+            copied = replicate_object(obj, fsw_opendir_as_fs(fs=dst_root_fs, path=dirpath),
+                                      workers=version_workers, level=level)
+            status = "updated" if len(copied) > 0 else "unchanged"
+        except (ObjectException, InventoryException, FswException, OSError, ValueError) as e:
+            status = "error"
+            logging.error("Failed to sync object at %s: %s", dirpath, str(e))
+            if created:
+                _remove_dir_and_empty_parents(dst_root_fs, dirpath)
+        with lock:
+            counts[status] += 1
+
+    executor = ThreadPoolExecutor(max_workers=workers)
+    try:
+        if object_paths is None:
+            object_paths = store.object_paths()
+        futures = [executor.submit(_sync, dirpath) for dirpath in object_paths]
+        for future in futures:
+            future.result()
+    finally:
+        executor.shutdown(cancel_futures=True)
+    return counts
+
+
+def _remove_dir_and_empty_parents(fs, dirpath):
+    """Remove dirpath and then any parent directories left empty."""
+    if fs.exists(dirpath):
+        fs.rm(dirpath, recursive=True)
+    parts = dirpath.strip("/").split("/")[:-1]
+    while len(parts) > 0:
+        try:
+            fs.rmdir("/".join(parts))
+        except OSError:
+            # Not empty, another object is in it
+            break
+        parts.pop()
+
+
+def compare_storage_roots(store, other_root, *, workers=1):
+    """Compare the objects in store with those in another storage root.
+
+    Both storage roots are walked concurrently to find the object paths.
+    For objects present in both, the root inventory sidecars are compared
+    and only if they differ are the inventories read to find the versions
+    missing from the other storage root. No content files are read.
+
+    Arguments:
+        store (ocfl.StorageRoot): the storage root to compare
+        other_root (str): path or fsw URL of the other storage root, which
+            is expected to be a replica with the same layout
+        workers (int): number of objects to compare concurrently
+
+    Yields:
+        dict: for each object path in either storage root, in sorted path
+            order with "extra" objects last, a dict with "path" and
+            "status" keys. The status is one of:
+            "same" - the root inventory sidecars match
+            "missing" - the object is missing from the other storage root
+            "missing-versions" - the other storage root has an earlier
+                version, with "missing_versions" listing the versions to
+                copy
+            "divergent" - the object in the other storage root has a
+                different identifier or versions that do not match
+            "extra" - the object is only in the other storage root
+            "error" - the object could not be compared
+            Where the identifier is read it is included as "id", and
+            "message" describes any divergence or error
+
+    Raises:
+        StorageRootException: if either storage root is not valid
+    """
+    store.open_root_fs()
+    store.check_root_structure()
+    other = StorageRoot(root=other_root, lax_digests=store.lax_digests)
+    other.open_root_fs()
+    other.check_root_structure()
+    executor = ThreadPoolExecutor(max_workers=max(2, workers))
+    try:
+        paths_future = executor.submit(lambda: set(store.object_paths()))
+        other_paths_future = executor.submit(lambda: set(other.object_paths()))
+        paths = paths_future.result()
+        other_paths = other_paths_future.result()
+        futures = [executor.submit(_compare_object, store, other, dirpath)
+                   if dirpath in other_paths else None
+                   for dirpath in sorted(paths)]
+        for dirpath, future in zip(sorted(paths), futures):
+            if future is None:
+                yield {"path": dirpath, "status": "missing"}
+            else:
+                yield future.result()
+    finally:
+        executor.shutdown(cancel_futures=True)
+    for dirpath in sorted(other_paths - paths):
+        yield {"path": dirpath, "status": "extra"}
+
+
+def _compare_object(store, other, dirpath):
+    """Compare object at dirpath with the replica in other for compare_storage_roots()."""
+    entry = {"path": dirpath}
+    obj_fs = fsw_opendir_as_fs(fs=store.root_fs, path=dirpath)
+    other_obj_fs = fsw_opendir_as_fs(fs=other.root_fs, path=dirpath)
+    try:
+        key = read_sidecar_key(obj_fs)
+        if key is not None and read_sidecar_key(other_obj_fs, [key[0]]) == key:
+            entry["status"] = "same"
+            return entry
+        inventory = Object(obj_fs=obj_fs, lax_digests=store.lax_digests).parse_inventory(use_cache=True)
+        entry["id"] = inventory.id
+        other_inventory = Object(obj_fs=other_obj_fs, lax_digests=store.lax_digests).parse_inventory(use_cache=True)
+    except (ObjectException, InventoryException, FswException, OSError, ValueError) as e:
+        entry["status"] = "error"
+        entry["message"] = str(e)
+        return entry
+    try:
+        missing_versions = versions_missing_from(inventory, other_inventory)
+    except ObjectException as e:
+        entry["status"] = "divergent"
+        entry["message"] = str(e)
+        return entry
+    if len(missing_versions) == 0:
+        entry["status"] = "same"
+    else:
+        entry["status"] = "missing-versions"
+        entry["missing_versions"] = missing_versions
+    return entry
@@ -0,0 +1,352 @@
+"""Persistent server for OCFL operations over a local Unix socket.
+
+Each run of the command line tools pays for interpreter startup, imports,
+filesystem client setup and the parsing of inventories. The OcflServer
+class instead stays running and accepts requests over a Unix domain socket
+so that these costs are paid once. Filesystem instances are reused through
+the fsspec instance cache, parsed inventories are kept in the process-wide
+inventory cache (see ocfl.inventory_cache), and StorageRoot instances,
+with their layouts and memoized identifier to path mappings, are kept for
+each storage root used.
+
+The protocol is JSON-RPC 2.0 with one JSON message per line. A connection
+may be used for any number of requests, which are answered in order.
+Connections are handled concurrently on separate threads. Requests that
+read or write an object hold a lock for that object path for the whole
+operation, so that concurrent updates of one object are serialized and an
+extract or validate never sees a partly written version. The methods are:
+
+    validate  params: path or root and id, level, check_digests,
+              log_warnings; result: {"valid", "errors", "warnings",
+              "messages"}
+    path      params: root, id; result: {"path"}
+    list      params: root, read_inventory; result: {"objects"} with a
+              list of {"path", "id"}
+    extract   params: path or root and id, version, dst; result: {"version",
+              "created", "message", "name", "address"}
+    update    params: path or root and id, src, changes, message, name,
+              address, created; result: {"head"}
+
+Example:
+    >>> import threading
+    >>> from ocfl.server import OcflServer, call
+    >>> server = OcflServer("/tmp/ocfl.sock")
+    >>> threading.Thread(target=server.serve_forever, daemon=True).start()
+    >>> call("/tmp/ocfl.sock", "path", root="extra_fixtures/1.0/good-storage-roots/reg-extension-dir-root",
+    ...      id="ark:123/abc")
+    {'path': 'a47/817/83d/cec/ark%3a123%2fabc'}
+"""
+import contextlib
+import json
+import logging
+import os
+import socket
+import socketserver
+import threading
+
+from .fsw import FswException
+from .new_version import NewVersionException
+from .object import Object
+from .object_utils import ObjectException
+from .storage_root import StorageRoot, StorageRootException
+from .version_metadata import VersionMetadata
+
+# JSON-RPC 2.0 error codes
+PARSE_ERROR = -32700
+INVALID_REQUEST = -32600
+METHOD_NOT_FOUND = -32601
+INVALID_PARAMS = -32602
+INTERNAL_ERROR = -32603
+OPERATION_FAILED = -32000  # Application error, e.g. object not found
+
+
+class ServerException(Exception):
+    """Exception class for OcflServer, carries a JSON-RPC error code."""
+
+    def __init__(self, message, code=OPERATION_FAILED):
+        """Initialize ServerException with message and JSON-RPC code."""
+        super().__init__(message)
+        self.code = code
+
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+    """Handle the newline-delimited JSON-RPC requests on one connection."""
+
+    def handle(self):
+        """Read requests until the client closes the connection."""
+        for line in self.rfile:
+            if not line.strip():
+                continue
+            response = self.server.handle_message(line)
+            if response is not None:
+                self.wfile.write(json.dumps(response).encode("utf-8") + b"\n")
+                self.wfile.flush()
+
+
+class OcflServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """JSON-RPC server for OCFL operations over a Unix socket.
+
+    Attributes:
+        socket_path (str): path of the Unix socket
+        lax_digests (bool): passed to the StorageRoot and Object instances
+            used for requests
+        workers (int): number of threads used within each validation
+    """
+
+    daemon_threads = True
+
+    def __init__(self, socket_path, *, lax_digests=False, workers=1):
+        """Initialize OcflServer and bind to socket_path.
+
+        Arguments:
+            socket_path (str): path of the Unix socket, which must not exist
+            lax_digests (bool): allow use of any known digest
+            workers (int): number of threads used to read version
+                inventories ahead of validation for each request
+
+        Raises:
+            ServerException: if socket_path already exists
+        """
+        if os.path.exists(socket_path):
+            raise ServerException("Socket path %s already exists" % (socket_path))
+        self.socket_path = socket_path
+        self.lax_digests = lax_digests
+        self.workers = workers
+        self._roots = {}
+        self._roots_lock = threading.Lock()
+        self._object_locks = {}  # key -> [lock, number of users]
+        self._object_locks_lock = threading.Lock()
+        self.methods = {"validate": self.validate,
+                        "path": self.path,
+                        "list": self.list,
+                        "extract": self.extract,
+                        "update": self.update}
+        super().__init__(socket_path, _RequestHandler)
+
+    def server_close(self):
+        """Close the server and remove the socket file."""
+        super().server_close()
+        if os.path.exists(self.socket_path):
+            os.remove(self.socket_path)
+
+    def handle_message(self, line):
+        """Handle one JSON-RPC request message.
+
+        Arguments:
+            line (bytes): the JSON encoded request
+
+        Returns:
+            dict or None: the response, or None for a notification (a
+                request without an id)
+        """
+        try:
+            request = json.loads(line)
+        except ValueError as e:
+            return _error_response(None, PARSE_ERROR, "Parse error (%s)" % (str(e)))
+        if not isinstance(request, dict) or not isinstance(request.get("method"), str):
+            return _error_response(None, INVALID_REQUEST, "Invalid request")
+        request_id = request.get("id")
+        try:
+            result = self.dispatch(request["method"], request.get("params", {}))
+        except ServerException as e:
+            response = _error_response(request_id, e.code, str(e))
+        except (ObjectException, StorageRootException, NewVersionException, FswException, OSError) as e:
+            response = _error_response(request_id, OPERATION_FAILED, str(e))
+        except Exception as e:  # pylint: disable=broad-exception-caught
+            logging.exception("Unexpected error handling %s request", request["method"])
+            response = _error_response(request_id, INTERNAL_ERROR, "Internal error (%s)" % (str(e)))
+        else:
+            response = {"jsonrpc": "2.0", "id": request_id, "result": result}
+        return None if "id" not in request else response
+
+    def dispatch(self, method, params):
+        """Call method with params.
+
+        Raises:
+            ServerException: if the method does not exist or params is not
+                a dict
+        """
+        if method not in self.methods:
+            raise ServerException("Method not found: %s" % (method), METHOD_NOT_FOUND)
+        if not isinstance(params, dict):
+            raise ServerException("Params must be an object", INVALID_PARAMS)
+        logging.debug("Request %s %s", method, params)
+        return self.methods[method](params)
+
+    def storage_root(self, root):
+        """Open and checked StorageRoot for root, kept for later requests.
+
+        Arguments:
+            root (str): file path or fsw filesystem descriptor for the
+                storage root
+
+        Returns:
+            ocfl.StorageRoot: the storage root instance
+
+        Raises:
+            StorageRootException: if the storage root is not valid
+        """
+        with self._roots_lock:
+            store = self._roots.get(root)
+        if store is None:
+            # Open and check outside the lock so that a slow storage root
+            # does not block requests for others, the first one kept wins
+            store = StorageRoot(root=root, lax_digests=self.lax_digests)
+            store.open_root_fs()
+            store.check_root_structure()
+            with self._roots_lock:
+                store = self._roots.setdefault(root, store)
+        return store
+
+    @contextlib.contextmanager
+    def object_lock(self, objdir):
+        """Context manager holding the lock for operations on objdir.
+
+        Every request on the same object directory uses the same lock,
+        whether objdir came from a path or from a root and id. The lock is
+        forgotten once no request is using it.
+
+        Arguments:
+            objdir (str): the object directory, as from object_dir()
+        """
+        key = _object_lock_key(objdir)
+        with self._object_locks_lock:
+            entry = self._object_locks.setdefault(key, [threading.Lock(), 0])
+            entry[1] += 1
+        try:
+            with entry[0]:
+                yield
+        finally:
+            with self._object_locks_lock:
+                entry[1] -= 1
+                if entry[1] == 0:
+                    del self._object_locks[key]
+
+    def object_dir(self, params):
+        """Object directory from params "path", or "root" and "id".
+
+        Raises:
+            ServerException: if neither are given
+        """
+        if "path" in params:
+            return _param(params, "path")
+        root = _param(params, "root")
+        store = self.storage_root(root)
+        return root.rstrip("/") + "/" + store.object_path(_param(params, "id"))
+
+    def validate(self, params):
+        """Validate an object, see module docstring for params and result."""
+        objdir = self.object_dir(params)
+        with self.object_lock(objdir):
+            passed, validator = Object(lax_digests=self.lax_digests).validate(
+                objdir=objdir,
+                log_warnings=params.get("log_warnings", True),
+                check_digests=params.get("check_digests", True),
+                workers=self.workers,
+                level=params.get("level"))
+        return {"valid": passed,
+                "errors": validator.log.num_errors,
+                "warnings": validator.log.num_warnings,
+                "messages": sorted(validator.log.messages)}
+
+    def path(self, params):
+        """Path of an object in a storage root, see module docstring."""
+        store = self.storage_root(_param(params, "root"))
+        return {"path": store.object_path(_param(params, "id"))}
+
+    def list(self, params):
+        """List objects in a storage root, see module docstring."""
+        store = self.storage_root(_param(params, "root"))
+        return {"objects": [{"path": dirpath, "id": identifier} for dirpath, identifier
+                            in store.list_objects(read_inventory=params.get("read_inventory", False))]}
+
+    def extract(self, params):
+        """Extract a version of an object, see module docstring."""
+        objdir = self.object_dir(params)
+        with self.object_lock(objdir):
+            metadata = Object(lax_digests=self.lax_digests).extract(
+                objdir=objdir,
+                version=params.get("version", "head"),
+                dstdir=_param(params, "dst"))
+        return {"version": metadata.version,
+                "created": metadata.created,
+                "message": metadata.message,
+                "name": metadata.name,
+                "address": metadata.address}
+
+    def update(self, params):
+        """Add a new version to an object, see module docstring.
+
+        With "changes" the new version is made from the change list with
+        Object.update_with_changes(), else the new version has the content
+        of "src" as with Object.add_version_with_content(). The object lock
+        is held from reading the current inventory to writing the new one,
+        so concurrent updates of the same object each add a version.
+        """
+        objdir = self.object_dir(params)
+        metadata = VersionMetadata(created=params.get("created"),
+                                   message=params.get("message"),
+                                   name=params.get("name"),
+                                   address=params.get("address"))
+        obj = Object(lax_digests=self.lax_digests)
+        with self.object_lock(objdir):
+            if "changes" in params:
+                inventory = obj.update_with_changes(objdir=objdir,
+                                                    srcdir=params.get("src", "."),
+                                                    changes=params["changes"],
+                                                    metadata=metadata)
+            else:
+                inventory = obj.add_version_with_content(objdir=objdir,
+                                                         srcdir=_param(params, "src"),
+                                                         metadata=metadata)
+        return {"head": inventory.head}
+
+
+def _object_lock_key(objdir):
+    """Key for the lock on objdir, normalized if it is a local path."""
+    if "://" in objdir:
+        return objdir.rstrip("/")
+    return os.path.normpath(os.path.abspath(objdir))
+
+
+def _param(params, name):
+    """Value of required string parameter name.
+
+    Raises:
+        ServerException: if the parameter is missing or not a string
+    """
+    value = params.get(name)
+    if not isinstance(value, str):
+        raise ServerException("Missing or bad parameter: %s" % (name), INVALID_PARAMS)
+    return value
+
+
+def _error_response(request_id, code, message):
+    """JSON-RPC error response."""
+    return {"jsonrpc": "2.0", "id": request_id, "error": {"code": code, "message": message}}
+
+
+def call(socket_path, method, **params):
+    """Make a single request to an OcflServer.
+
+    Arguments:
+        socket_path (str): path of the server's Unix socket
+        method (str): the method name
+        **params: the method parameters
+
+    Returns:
+        dict: the result
+
+    Raises:
+        ServerException: if the server responds with an error, with the
+            JSON-RPC error code
+    """
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.connect(socket_path)
+        with sock.makefile("rwb") as fh:
+            fh.write(json.dumps({"jsonrpc": "2.0", "id": 1, "method": method, "params": params}).encode("utf-8") + b"\n")
+            fh.flush()
+            response = json.loads(fh.readline())
+    if "error" in response:
+        raise ServerException(response["error"]["message"], response["error"]["code"])
+    return response["result"]
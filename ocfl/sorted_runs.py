@@ -0,0 +1,186 @@
+"""Sorted collections of records that spill to disk beyond a memory limit.
+
+Bounded memory validation of objects with very large numbers of files
+needs to reconcile listings of content files with manifest and fixity
+entries without holding them all in dicts and sets. The SortedRuns class
+collects records (tuples of strings and integers) in memory until an
+estimate of their size reaches a limit, then sorts them and writes them
+out to a temporary file as a sorted run. Iterating over a SortedRuns
+instance merges the runs and any records still in memory to generate all
+records in sorted order, so that several sorted streams can be reconciled
+with merge joins.
+
+Example:
+    >>> from ocfl.sorted_runs import SortedRuns
+    >>> with SortedRuns(max_bytes=200) as runs:
+    ...     for name in ("d", "b", "e", "a", "c"):
+    ...         runs.add((name, 1))
+    ...     [r[0] for r in runs]
+    ['a', 'b', 'c', 'd', 'e']
+"""
+import heapq
+import json
+import logging
+import os
+import tempfile
+
+from .inventory_cache import STRING_OVERHEAD
+
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+RECORD_OVERHEAD = 64  # Approximate bytes for a tuple record and its list slot
+
+
+def record_size(record):
+    """Estimate memory used by record in bytes."""
+    size = RECORD_OVERHEAD
+    for value in record:
+        size += STRING_OVERHEAD + len(value) if isinstance(value, str) else STRING_OVERHEAD
+    return size
+
+
+class SortedRuns():
+    """Collection of records generated in sorted order, spilling to disk.
+
+    Records may be added after iteration has started and the collection
+    may be iterated over more than once. Each iteration is a fresh merge of
+    the records present when it starts.
+
+    Attributes:
+        max_bytes (int): estimated memory use of records at which they are
+            written out as a sorted run
+        num_records (int): total number of records added
+        num_runs (int): number of sorted runs written to disk
+    """
+
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES, tmpdir=None):
+        """Initialize SortedRuns.
+
+        Arguments:
+            max_bytes (int): memory limit for records held in memory
+            tmpdir (str or None): directory in which to create the temporary
+                directory for sorted runs, None (default) to use the system
+                default
+        """
+        self.max_bytes = max_bytes
+        self.num_records = 0
+        self.num_runs = 0
+        self._tmpdir = tmpdir
+        self._workdir = None
+        self._records = []
+        self._bytes = 0
+
+    def __enter__(self):
+        """Context manager entry, returns self."""
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        """Context manager exit, removes any temporary files."""
+        self.close()
+
+    def __len__(self):
+        """Return the number of records."""
+        return self.num_records
+
+    def add(self, record):
+        """Add record, writing a sorted run to disk if over the memory limit.
+
+        Arguments:
+            record (tuple): tuple of str and int values
+        """
+        self._records.append(record)
+        self.num_records += 1
+        self._bytes += record_size(record)
+        if self._bytes >= self.max_bytes:
+            self._spill()
+
+    def _run_path(self, n):
+        """Path of the file for sorted run n."""
+        return os.path.join(self._workdir.name, "run%06d.jsonl" % n)
+
+    def _spill(self):
+        """Write the records in memory out as a sorted run."""
+        if self._workdir is None:
+            self._workdir = tempfile.TemporaryDirectory(prefix="ocfl-runs-", dir=self._tmpdir)  # pylint: disable=consider-using-with
+        self._records.sort()
+        with open(self._run_path(self.num_runs), "w", encoding="utf-8") as fh:
+            for record in self._records:
+                fh.write(json.dumps(record))
+                fh.write("\n")
+        logging.debug("Wrote sorted run %d with %d records", self.num_runs, len(self._records))
+        self.num_runs += 1
+        self._records = []
+        self._bytes = 0
+
+    def _read_run(self, n):
+        """Generate records from sorted run n."""
+        with open(self._run_path(n), "r", encoding="utf-8") as fh:
+            for line in fh:
+                yield tuple(json.loads(line))
+
+    def __iter__(self):
+        """Generate all records in sorted order."""
+        self._records.sort()
+        if self.num_runs == 0:
+            return iter(list(self._records))
+        streams = [self._read_run(n) for n in range(self.num_runs)]
+        streams.append(iter(list(self._records)))
+        return heapq.merge(*streams)
+
+    def close(self):
+        """Discard all records and remove any temporary files."""
+        if self._workdir is not None:
+            self._workdir.cleanup()
+            self._workdir = None
+        self._records = []
+        self._bytes = 0
+        self.num_records = 0
+        self.num_runs = 0
+
+
+def grouped(records, key_length=1):
+    """Group sorted records that share the first key_length values.
+
+    Arguments:
+        records: iterable of sorted tuples
+        key_length (int): number of leading values that form the key
+
+    Yields:
+        tuple: (key, [records]) where key is a tuple of the leading values,
+            in sorted order of key
+    """
+    key = None
+    group = []
+    for record in records:
+        this_key = record[:key_length]
+        if this_key != key:
+            if group:
+                yield key, group
+            key = this_key
+            group = []
+        group.append(record)
+    if group:
+        yield key, group
+
+
+class SortedLookup():  # pylint: disable=too-few-public-methods
+    """Look up groups from a sorted stream with keys that only increase.
+
+    Used for merge joins where the driving stream is in the same sort
+    order as the groups, so that each group is read once.
+    """
+
+    def __init__(self, groups):
+        """Initialize SortedLookup with an iterable of (key, value) in key order."""
+        self._groups = iter(groups)
+        self._next = next(self._groups, None)
+
+    def get(self, key, default=None):
+        """Value for key, else default.
+
+        Must be called with keys in non-decreasing order.
+        """
+        while self._next is not None and self._next[0] < key:
+            self._next = next(self._groups, None)
+        if self._next is not None and self._next[0] == key:
+            return self._next[1]
+        return default
@@ -3,19 +3,26 @@
 This code uses PyFilesystem (import fs) exclusively for access to files. This
 should enable application beyond the operating system filesystem.
 """
+from concurrent.futures import ThreadPoolExecutor
 import json
 import logging
 import os.path
 import re
+import threading
 
 from .constants import DEFAULT_SPEC_VERSION, SPEC_VERSIONS_SUPPORTED
 from .namaste import find_namastes, Namaste
+from .inventory import InventoryException
 from .object import Object
-from .fsw import fsw_openfs, fsw_walk, fsw_opendir_as_fs, fsw_copydir
+from .object_utils import ObjectException
+from .new_version import NewVersionException
+from .fsw import fsw_openfs, fsw_walk, fsw_opendir_as_fs, fsw_copydir, fsw_copydirs, fsw_throttle, FswException
 from .validator import Validator
 from .validation_logger import ValidationLogger
+from .version_metadata import VersionMetadata
 
 # Specific layouts
+from .layout import LayoutException
 from .layout_registry import get_layout, layout_is_supported
 
 
@@ -53,7 +60,7 @@ class StorageRoot():
     """Class for handling OCFL Storage Root and include OCFL Objects."""
 
     def __init__(self, root=None, layout_name=None, lax_digests=False,
-                 spec_version=None):
+                 spec_version=None, rate_limiter=None):
         """Initialize OCFL Storage Root.
 
         Arguments:
@@ -62,8 +69,14 @@ class StorageRoot():
             layout_name (str): name of the file layout to use
             lax_digests (bool):
             spec_version (str): OCFL specification version expected
+            rate_limiter (ocfl.fsw.RateLimiter or None): limit on the rate of
+                access to this storage root, in addition to any global limit
+                set with ocfl.fsw.fsw_set_rate_limit(). The same RateLimiter
+                may be shared between storage roots. Default None for no
+                limit
         """
         self.root = root
+        self.rate_limiter = rate_limiter
         self.layout_name = layout_name
         self.layout_description = None
         self.lax_digests = lax_digests
@@ -77,6 +90,7 @@ class StorageRoot():
             "0003-hash-and-id-n-tuple-storage-layout"
         ]
         self.root_fs = None
+        self._root_structure_checked = False
         # Validation records
         self.num_traversal_errors = 0
         self.log = None
@@ -115,7 +129,7 @@ class StorageRoot():
         self.root_fs on success with the open filesystem.
         """
         try:
-            self.root_fs = fsw_openfs(self.root)
+            self.root_fs = fsw_throttle(fsw_openfs(self.root), self.rate_limiter)
         except FileNotFoundError as e:
             raise StorageRootException("Failed to open OCFL storage root filesystem '%s' (%s)" % (self.root, str(e)))
 
@@ -169,10 +183,31 @@ class StorageRoot():
         Raises:
             StorageRootException: on error
         """
-        if self.layout is None:
+        return next(self.identifiers_to_object_paths([identifier]))
+
+    def identifiers_to_object_paths(self, identifiers):
+        """Generate paths to OCFL objects relative to the OCFL storage root.
+
+        Arguments:
+            identifiers: iterable of OCFL Object identifiers
+
+        Yields:
+            str: path to the OCFL Object for each identifier, in the same
+                order
+
+        Raises:
+            StorageRootException: if the storage root has no layout
+            LayoutException: if an identifier cannot be mapped to a path
+
+        If the layout is not set then the storage root structure is read
+        and checked once to find it.
+        """
+        if self.layout is None and not self._root_structure_checked:
             self.open_root_fs()
             self.check_root_structure()
-        return self.layout.identifier_to_path(identifier)
+        if self.layout is None:
+            raise StorageRootException("No layout set for OCFL storage root %s so cannot map identifiers to object paths" % (self.root))
+        yield from self.layout.identifiers_to_paths(identifiers)
 
     def initialize(self, spec_version=None, layout_params=None):
         """Create and initialize a new OCFL Storage Root.
@@ -266,6 +301,7 @@ class StorageRoot():
             # Is there a corresponding extensions dir with params in config.json?
             self.layout.read_layout_params(root_fs=self.root_fs)
         # Other files are allowed...
+        self._root_structure_checked = True
         return True
 
     def parse_layout_file(self):
@@ -309,27 +345,8 @@ class StorageRoot():
                     dirs.remove("extensions")
                 # Ignore any other files in storage root but otherwise continue
                 # to descend
-            elif (len(dirs) + len(files)) == 0:
-                # Empty directory
-                self.traversal_error("E073", path=dirpath)
-            elif len(files) == 0:
-                pass  # Just an intermediate directory
-            else:
-                # Is this directory an OCFL object? Look for any 0= file.
-                zero_eqs = [file for file in files if file.startswith("0=")]
-                if len(zero_eqs) > 1:
-                    self.traversal_error("E003d", path=dirpath)
-                elif len(zero_eqs) == 1:
-                    declaration = zero_eqs[0]
-                    match = re.match(r"""0=ocfl_object_(\d+\.\d+)""", declaration)
-                    if match and match.group(1) in SPEC_VERSIONS_SUPPORTED:
-                        yield dirpath.lstrip("/")
-                    elif match:
-                        self.traversal_error("E004a", path=dirpath, version=match.group(1))
-                    else:
-                        self.traversal_error("E004b", path=dirpath, declaration=declaration)
-                else:
-                    self.traversal_error("E072", path=dirpath)
+            elif self.is_object_directory(dirpath, dirs, files):
+                yield dirpath.lstrip("/")
             # If we are below the root, do not descend further if there
             # are files present because these indicate that we are in
             # an object already.
@@ -338,6 +355,41 @@ class StorageRoot():
                 while len(dirs) > 0:
                     dirs.pop()
 
+    def is_object_directory(self, dirpath, dirs, files):
+        """Check a directory below the storage root found in traversal.
+
+        Arguments:
+            dirpath (str): path of the directory
+            dirs (list): names of the sub-directories of dirpath
+            files (list): names of the files in dirpath
+
+        Returns:
+            bool: True if dirpath is an OCFL object, else False. Any
+                traversal error seen is recorded with traversal_error()
+        """
+        if (len(dirs) + len(files)) == 0:
+            # Empty directory
+            self.traversal_error("E073", path=dirpath)
+        elif len(files) == 0:
+            pass  # Just an intermediate directory
+        else:
+            # Is this directory an OCFL object? Look for any 0= file.
+            zero_eqs = [file for file in files if file.startswith("0=")]
+            if len(zero_eqs) > 1:
+                self.traversal_error("E003d", path=dirpath)
+            elif len(zero_eqs) == 1:
+                declaration = zero_eqs[0]
+                match = re.match(r"""0=ocfl_object_(\d+\.\d+)""", declaration)
+                if match and match.group(1) in SPEC_VERSIONS_SUPPORTED:
+                    return True
+                if match:
+                    self.traversal_error("E004a", path=dirpath, version=match.group(1))
+                else:
+                    self.traversal_error("E004b", path=dirpath, declaration=declaration)
+            else:
+                self.traversal_error("E072", path=dirpath)
+        return False
+
     def validate_extensions_dir(self):
         """Validate content of extensions directory inside storage root.
 
@@ -355,9 +407,15 @@ class StorageRoot():
             else:
                 self.traversal_error("E086", entry=name)
 
-    def list_objects(self):
+    def list_objects(self, read_inventory=False):
         """List contents of this OCFL Storage Root.
 
+        Arguments:
+            read_inventory (bool): if True then always read the identifier
+                from the object inventory. Default False to take the
+                identifier from the object path where the layout is
+                reversible, reading the inventory only where it is not
+
         Yields:
             tuple: for each object, which contains (dirpath, identifier)
 
@@ -369,15 +427,20 @@ class StorageRoot():
         self.check_root_structure()
         self.num_objects = 0
         for dirpath in self.object_paths():
-            obj_fs = fsw_opendir_as_fs(fs=self.root_fs, path=dirpath)
-            # Parse inventory to extract id
-            identifier = Object(obj_fs=obj_fs).id_from_inventory()
+            identifier = None
+            if not read_inventory and self.layout is not None:
+                identifier = self.layout.path_to_identifier(dirpath)
+            if identifier is None:
+                # Parse inventory to extract id
+                obj_fs = fsw_opendir_as_fs(fs=self.root_fs, path=dirpath)
+                identifier = Object(obj_fs=obj_fs).id_from_inventory()
             self.num_objects += 1
             yield (dirpath, identifier)
             # FIXME - maybe do some more stuff in here
 
     def validate_hierarchy(self, validate_objects=True, check_digests=True,
-                           log_warnings=False, max_errors=100):
+                           log_warnings=False, max_errors=100, *, workers=1,
+                           max_memory=None, level=None, fail_fast=False):
         """Validate OCFL Storage Root hierarchy and, optionally, all objects.
 
         Arguments:
@@ -387,6 +450,16 @@ class StorageRoot():
                 file in each object
             log_warnings (bool): True to log warnings as well as errors
             max_errors (int): Number of errors to record before stopping
+            workers (int): number of threads used to read version inventories
+                of each object ahead of their validation, default 1
+            max_memory (int or None): approximate maximum bytes of memory
+                for listings of content files and digests while checking the
+                content of each object, default None for no limit
+            level (str or None): validation level for each object from
+                ocfl.constants.VALIDATION_LEVELS, default None to use
+                check_digests
+            fail_fast (bool): True to stop validation of each object at its
+                first error, default False
 
         Returns:
             tuple of (num_objects, good_objects, errors) where num_objects is
@@ -401,7 +474,11 @@ class StorageRoot():
             if validate_objects:
                 validator = Validator(check_digests=check_digests,
                                       lax_digests=self.lax_digests,
-                                      log_warnings=log_warnings)
+                                      log_warnings=log_warnings,
+                                      workers=workers,
+                                      max_memory=max_memory,
+                                      level=level,
+                                      fail_fast=fail_fast)
                 # FIXME - Should check that all objest are not higher spec
                 # version that storage root https://ocfl.io/1.1/spec/#E081
                 if validator.validate_object(fsw_opendir_as_fs(fs=self.root_fs, path=dirpath)):
@@ -418,7 +495,8 @@ class StorageRoot():
 
     def validate(self, *, validate_objects=True, check_digests=True,
                  log_warnings=False, log_errors=True, max_errors=100,
-                 lang="en"):
+                 lang="en", workers=1, max_memory=None, level=None,
+                 fail_fast=False):
         """Validate OCFL Storage Root, structure, and optionally all objects.
 
         Arguments:
@@ -432,6 +510,17 @@ class StorageRoot():
                 is 100
             lang (str): Language of error and warning descriptions to look for,
                 default is "en"
+            workers (int): number of threads used to read version inventories
+                of each object ahead of their validation, default 1
+            max_memory (int or None): approximate maximum bytes of memory
+                for listings of content files and digests while checking the
+                content of each object, default None for no limit
+            level (str or None): validation level for each object from
+                ocfl.constants.VALIDATION_LEVELS, default None to use
+                check_digests. The "declaration" level is the cheapest
+                useful check for triage of many objects
+            fail_fast (bool): True to stop validation of each object at its
+                first error, default False
 
         Returns:
             bool: True if everything checked is valid, False otherwise
@@ -452,11 +541,123 @@ class StorageRoot():
             self.log.error(e.code, **e.kwargs)
             return False
         self.log.spec_version = self.spec_version
-        self.num_objects, self.good_objects, self.errors = self.validate_hierarchy(validate_objects=validate_objects, check_digests=check_digests, log_warnings=log_warnings, max_errors=max_errors)
+        self.num_objects, self.good_objects, self.errors = self.validate_hierarchy(validate_objects=validate_objects, check_digests=check_digests, log_warnings=log_warnings, max_errors=max_errors, workers=workers, max_memory=max_memory, level=level, fail_fast=fail_fast)
         if self.num_traversal_errors > 0:
             valid = False
         return valid
 
+    def migrate_digests(self, *, digest_algorithm=None, add_fixity=None,
+                        metadata=None, workers=1, digest_workers=1,
+                        check_digests=False, checkpoint=None):
+        """Migrate all objects to a new digest algorithm and/or fixity.
+
+        A new version is added to each object that does not already use
+        digest_algorithm and have all the add_fixity types, using
+        ocfl.Object.start_new_version() to calculate the new digests. When the
+        digest algorithm changes the old one is kept as a fixity type. Objects
+        are migrated concurrently on workers threads, and each object uses
+        digest_workers threads to read its content files.
+
+        If checkpoint is given then the result for each object is appended
+        to that local file as a line of JSON as soon as the object is done.
+        When run again with the same checkpoint file, objects recorded as
+        migrated or skipped are not examined again so an interrupted job can
+        be resumed. Objects that failed are retried.
+
+        Arguments:
+            digest_algorithm (str or None): new digest algorithm, None to keep
+                the current digest algorithm of each object
+            add_fixity (list or None): fixity types to add to each object
+            metadata (ocfl.VersionMetadata or None): metadata for the new
+                versions, default None gives a message describing the migration
+            workers (int): number of objects to migrate concurrently
+            digest_workers (int): number of threads used to read content
+                files within each object
+            check_digests (bool): True to check content against the existing
+                digests while reading it
+            checkpoint (str or None): path of local checkpoint file
+
+        Returns:
+            dict: counts of objects with each status "migrated", "skipped"
+                (already migrated or nothing to do), "done" (recorded in the
+                checkpoint file) and "error"
+
+        Raises:
+            StorageRootException: if the storage root is not valid
+        """
+        self.open_root_fs()
+        self.check_root_structure()
+        add_fixity = set(add_fixity or [])
+        if metadata is None:
+            changes = []
+            if digest_algorithm is not None:
+                changes.append("digest algorithm %s" % digest_algorithm)
+            if len(add_fixity) > 0:
+                changes.append("fixity %s" % ",".join(sorted(add_fixity)))
+            metadata = VersionMetadata(message="Migrate to " + " and ".join(changes))
+        done = _read_checkpoint(checkpoint)
+        counts = {"migrated": 0, "skipped": 0, "done": 0, "error": 0}
+        lock = threading.Lock()
+
+        def _migrate(dirpath):
+            try:
+                status = self._migrate_object_digests(dirpath,
+                                                      digest_algorithm=digest_algorithm,
+                                                      add_fixity=add_fixity,
+                                                      metadata=metadata,
+                                                      workers=digest_workers,
+                                                      check_digests=check_digests)
+                message = None
+            except (ObjectException, NewVersionException, ValueError, OSError) as e:
+                status = "error"
+                message = str(e)
+                logging.error("Failed to migrate object at %s: %s", dirpath, message)
+            with lock:
+                counts[status] += 1
+                _write_checkpoint(checkpoint, dirpath, status, message)
+
+        executor = ThreadPoolExecutor(max_workers=workers)
+        try:
+            futures = []
+            for dirpath in self.object_paths():
+                if done.get(dirpath) in ("migrated", "skipped"):
+                    counts["done"] += 1
+                else:
+                    futures.append(executor.submit(_migrate, dirpath))
+            for future in futures:
+                future.result()
+        finally:
+            executor.shutdown(cancel_futures=True)
+        return counts
+
+    def _migrate_object_digests(self, dirpath, *, digest_algorithm, add_fixity,
+                                metadata, workers, check_digests):
+        """Migrate one object for migrate_digests(), returns status string."""
+        obj_fs = fsw_opendir_as_fs(fs=self.root_fs, path=dirpath)
+        obj = Object(obj_fs=obj_fs, lax_digests=self.lax_digests, workers=workers)
+        # Root inventory alone decides whether migration is needed. An object
+        # that needs it is then validated as a whole by start_new_version(),
+        # which reads the root inventory again, before any content is read
+        inventory = obj.parse_inventory(use_cache=True)
+        # Object digest_algorithm is used for the inventory sidecars
+        obj.digest_algorithm = digest_algorithm or inventory.digest_algorithm
+        old_fixity = set(inventory.fixity.keys())
+        fixity = old_fixity | add_fixity
+        if digest_algorithm is not None and digest_algorithm != inventory.digest_algorithm:
+            fixity.add(inventory.digest_algorithm)
+        elif fixity == old_fixity:
+            logging.info("Object at %s needs no migration", dirpath)
+            return "skipped"
+        nv = obj.start_new_version(objdir=obj_fs,
+                                   digest_algorithm=digest_algorithm,
+                                   fixity=fixity,
+                                   metadata=metadata,
+                                   carry_content_forward=True,
+                                   check_digests=check_digests)
+        obj.write_new_version(nv)
+        logging.info("Migrated object at %s to %s", dirpath, nv.inventory.head)
+        return "migrated"
+
     def add(self, object_path):
         """Add pre-constructed object from object_path.
 
@@ -471,7 +672,8 @@ class StorageRoot():
         """
         self.open_root_fs()
         self.check_root_structure()
-        # Sanity check
+        # Sanity check, reading the inventory rather than trusting a cached
+        # inventory with the same sidecar digest
         o = Object(path=object_path)
         inventory = o.parse_inventory()
         identifier = inventory.id
@@ -486,3 +688,107 @@ class StorageRoot():
         except Exception as e:
             raise StorageRootException("Add object at path %s failed! (%s)" % (path, str(e)))
         return (identifier, path)
+
+    def add_many(self, object_paths, workers=1):
+        """Add many pre-constructed objects, copying them concurrently.
+
+        The identifier of each object is read from its inventory and the
+        destination path determined by the storage layout before any copying
+        starts. Objects with a destination path that already exists in the
+        storage root, or that is the same as for another object being added,
+        are not copied. The other objects are copied with
+        ocfl.fsw.fsw_copydirs() on workers threads. Any partial copy left by a
+        failed copy is removed.
+
+        Arguments:
+            object_paths (iterable): source paths of the objects to add
+            workers (int): number of objects to read and copy concurrently
+
+        Yields:
+            tuple: (object_path, identifier, path, error) for each object as
+                it is finished, where error is None if the object was added,
+                else a message string. The identifier and path are None if
+                they could not be determined
+
+        Raises:
+            StorageRootException: if the storage root is not valid or has no
+                layout
+        """
+        self.open_root_fs()
+        self.check_root_structure()
+        if self.layout is None:
+            raise StorageRootException("No layout set for OCFL storage root %s so cannot add objects" % (self.root))
+
+        def _resolve(object_path):
+            identifier, path = None, None
+            try:
+                o = Object(path=object_path)
+                identifier = o.parse_inventory().id
+                path = self.object_path(identifier)
+                return (object_path, o, identifier, path, None)
+            except (ObjectException, InventoryException, LayoutException, StorageRootException, FswException,
+                    OSError, ValueError) as e:
+                return (object_path, None, identifier, path, "Cannot read object (%s)" % (str(e)))
+
+        executor = ThreadPoolExecutor(max_workers=workers)
+        try:
+            resolved = list(executor.map(_resolve, object_paths))
+        finally:
+            executor.shutdown(cancel_futures=True)
+        num_for_path = {}
+        for (_, o, _, path, _) in resolved:
+            if o is not None:
+                num_for_path[path] = num_for_path.get(path, 0) + 1
+        to_copy = []
+        for (object_path, o, identifier, path, error) in resolved:
+            if error is None:
+                if num_for_path[path] > 1:
+                    error = "Destination path %s is the same as for another object being added" % (path)
+                elif self.root_fs.exists(path):
+                    error = "Destination path %s already exists" % (path)
+            if error is None:
+                to_copy.append((object_path, o, identifier, path))
+            else:
+                logging.error("Add object %s failed: %s", object_path, error)
+                yield (object_path, identifier, path, error)
+        copies = [(o.obj_fs, "/", self.root_fs, path) for (_, o, _, path) in to_copy]
+        for n, e in fsw_copydirs(copies, workers=workers):
+            object_path, _, identifier, path = to_copy[n]
+            error = None
+            if e is not None:
+                error = "Copy to %s failed (%s)" % (path, str(e))
+                logging.error("Add object %s failed: %s", object_path, error)
+                if not isinstance(e, FswException) and self.root_fs.exists(path):
+                    # Copy was started so remove what was written
+                    self.root_fs.rm(path, recursive=True)
+            else:
+                logging.debug("Added object %s at %s", identifier, path)
+            yield (object_path, identifier, path, error)
+
+
+def _read_checkpoint(checkpoint):
+    """Read checkpoint file, returns dict of dirpath -> last status."""
+    done = {}
+    if checkpoint is None or not os.path.exists(checkpoint):
+        return done
+    with open(checkpoint, "r", encoding="utf-8") as fh:
+        for line in fh:
+            try:
+                entry = json.loads(line)
+                done[entry["path"]] = entry["status"]
+            except (ValueError, KeyError, TypeError):
+                # Ignore any partial last line from an interrupted run
+                logging.warning("Ignoring bad line in checkpoint file %s", checkpoint)
+    logging.info("Read %d entries from checkpoint file %s", len(done), checkpoint)
+    return done
+
+
+def _write_checkpoint(checkpoint, dirpath, status, message=None):
+    """Append status of object at dirpath to checkpoint file, if set."""
+    if checkpoint is None:
+        return
+    entry = {"path": dirpath, "status": status}
+    if message is not None:
+        entry["message"] = message
+    with open(checkpoint, "a", encoding="utf-8") as fh:
+        fh.write(json.dumps(entry) + "\n")
@@ -31,6 +31,10 @@ import re
 from .constants import DEFAULT_SPEC_VERSION
 
 
+class FailFastException(Exception):
+    """Exception raised by ValidationLogger.error() in fail fast mode."""
+
+
 class ValidationLogger():
     """Class for OCFL ValidationLogger.
 
@@ -43,7 +47,7 @@ class ValidationLogger():
 
     def __init__(self, *, log_warnings=False, log_errors=True,
                  spec_version=DEFAULT_SPEC_VERSION,
-                 lang="en", validation_codes=None):
+                 lang="en", validation_codes=None, fail_fast=False):
         """Initialize OCFL validation logger.
 
         Arguments:
@@ -61,11 +65,14 @@ class ValidationLogger():
                 on first use of this class. Subsequent instantiations use
                 the same class data. Allows an override to supply the
                 data explicitly
+            fail_fast (bool): True to raise FailFastException from the
+                error() method after logging an error. Default False
         """
         self.log_warnings = log_warnings
         self.log_errors = log_errors
         self.spec_version = spec_version
         self.lang = lang
+        self.fail_fast = fail_fast
         if validation_codes is not None:
             self.validation_codes = validation_codes
         elif self.validation_codes is None:
@@ -136,6 +143,8 @@ class ValidationLogger():
         """Log an error."""
         self.log(code, is_error=True, **args)
         self.num_errors += 1
+        if self.fail_fast:
+            raise FailFastException(code)
 
     def warning(self, code, **args):
         """Log a warning."""
@@ -9,23 +9,51 @@ help someone debug an implementation.
 This code uses PyFilesystem (import fs) exclusively for access to files. This
 should enable application beyond the operating system filesystem.
 """
+from concurrent.futures import ThreadPoolExecutor
+import io
 import json
 import os.path
 import re
 
 from .constants import INVENTORY_FILENAME, SPEC_VERSIONS_SUPPORTED, \
-    DEFAULT_SPEC_VERSION, DEFAULT_CONTENT_DIRECTORY
-from .digest import file_digest, normalized_digest
+    DEFAULT_SPEC_VERSION, DEFAULT_CONTENT_DIRECTORY, VALIDATION_LEVELS
+from .digest import file_digest, bytes_digest, normalized_digest
+from .inventory import Inventory
+from .inventory_cache import inventory_cache
 from .inventory_validator import InventoryValidator
 from .namaste import find_namastes
-from .fsw import fsw_openfs, fsw_walk, fsw_openfile, fsw_files_identical
-from .validation_logger import ValidationLogger
+from .sorted_runs import SortedRuns, SortedLookup, grouped
+from .fsw import fsw_openfs, fsw_walk, fsw_openfile, fsw_files_identical, fsw_listdir_names
+from .validation_logger import ValidationLogger, FailFastException
+
+
+def _read_bytes(fs, path):
+    """Read content of file path in fs, None if it is not present."""
+    try:
+        with fs.open(path, "rb") as fh:
+            return fh.read()
+    except FileNotFoundError:
+        return None
 
 
 class ValidatorAbortException(Exception):
     """Exception class to bail out of validation."""
 
 
+def _additional_digests_by_filepath(records):
+    """Group sorted prior digest records by filepath.
+
+    Generates (filepath, additional_digests) in filepath order where
+    additional_digests is the {filepath: {algorithm: {digest: [versions]}}}
+    dict for just that filepath, as used by check_additional_digests().
+    """
+    for (filepath,), group in grouped(records):
+        digests = {}
+        for _, digest_algorithm, digest, _, version_dir in group:
+            digests.setdefault(digest_algorithm, {}).setdefault(digest, []).append(version_dir)
+        yield filepath, {filepath: digests}
+
+
 class Validator():
     """Class for OCFL Object Validator."""
 
@@ -33,7 +61,8 @@ class Validator():
                  check_digests=True, lax_digests=False,
                  force_spec_version=None,
                  default_spec_version=DEFAULT_SPEC_VERSION,
-                 log=None, lang="en"):
+                 log=None, lang="en", workers=1, max_memory=None,
+                 level=None, fail_fast=False, cache_inventory=False):
         """Initialize OCFL Object Validator object.
 
         Arguments:
@@ -41,7 +70,8 @@ class Validator():
                 (default: False)
             log_errors: True to record errors during validation
                 (default: True)
-            check_digests: True to check digests of files within the objects
+            check_digests: True to check digests of files within the objects,
+                ignored if level is set
             lax_digests: default is False. Set True to allow digests beyond
                 those included in the specification for fixity and to allow
                 non-preferred digest algorithms for content references in the
@@ -58,16 +88,58 @@ class Validator():
                 for validation of multiple objects within a storage root.
             lang: language string (default "en") to pass to the validation
                 logger
+            workers: number of threads used to read and parse version
+                inventories ahead of their validation (default 1 to read
+                each when needed). Validation and the reporting of errors
+                and warnings still happen in version order
+            max_memory: None (default) to hold listings of content files and
+                the digests from all inventories in memory while checking
+                content, else the approximate maximum number of bytes to use
+                for them. With a limit the listings are kept as sorted runs,
+                written to temporary files when the limit is reached, and
+                reconciled with merge joins. Errors are then reported in
+                order of content path
+            level: None (default) to take the validation level from
+                check_digests, else one of the levels in
+                ocfl.constants.VALIDATION_LEVELS. Each level does the checks
+                of the levels before it and skips the work of the levels
+                after it. Without level, check_digests True is the "fixity"
+                level and False is the "content" level except that the
+                inventory sidecar digests are not checked either
+            fail_fast: True to stop validation of an object at the first
+                error, default False. If log is given then fail_fast is set
+                on it only while validate_object() runs, and then restored
+            cache_inventory: True to put the root inventory of a valid
+                object, checked against its sidecar digest, in the inventory
+                cache (see ocfl.inventory_cache) for use by code that will
+                go on to read it. Default False so that validating many
+                objects doesn't fill the cache
+
+        Raises:
+            ValueError: if level is not a known validation level
         """
-        self.check_digests = check_digests
+        if level is None:
+            level = "fixity" if check_digests else "content"
+            self.check_inventory_digests = check_digests
+        elif level not in VALIDATION_LEVELS:
+            raise ValueError("Unknown validation level %s, must be one of %s" % (level, ", ".join(VALIDATION_LEVELS)))
+        else:
+            self.check_inventory_digests = True
+        self.level = level
+        self.check_digests = level in ("digests", "fixity")
         self.lax_digests = lax_digests
         self.force_spec_version = force_spec_version
         self.default_spec_version = default_spec_version
+        self.workers = workers
+        self.max_memory = max_memory
+        self.fail_fast = fail_fast
+        self.cache_inventory = cache_inventory
         self.log = log
         if self.log is None:
             self.log = ValidationLogger(log_warnings=log_warnings,
                                         log_errors=log_errors,
-                                        lang=lang)
+                                        lang=lang,
+                                        fail_fast=fail_fast)
         self.registered_extensions = [
             "0001-digest-algorithms", "0002-flat-direct-storage-layout",
             "0003-hash-and-id-n-tuple-storage-layout", "0004-hashed-n-tuple-storage-layout",
@@ -81,6 +153,8 @@ class Validator():
         self.content_directory_set = None
         self.inventory_digest_files = None
         self.root_inv_validator = None
+        self.root_inventory_digest = None
+        self.prefetched = None
         self.obj_fs = None
         self.initialize()
 
@@ -96,6 +170,8 @@ class Validator():
         self.content_directory = DEFAULT_CONTENT_DIRECTORY
         self.inventory_digest_files = {}  # index by version_dir, algorithms may differ
         self.root_inv_validator = None
+        self.root_inventory_digest = None
+        self.prefetched = {}  # path -> bytes or None if not present, (path, "json") -> parsed
         self.obj_fs = None
 
     def status_str(self, prefix=""):
@@ -119,6 +195,17 @@ class Validator():
         when validating a storage root, for example.
         """
         self.initialize()
+        log_fail_fast = self.log.fail_fast
+        self.log.fail_fast = log_fail_fast or self.fail_fast
+        try:
+            return self._validate_object(path)
+        except FailFastException:
+            return False
+        finally:
+            self.log.fail_fast = log_fail_fast
+
+    def _validate_object(self, path):
+        """Validate OCFL object at path or fsw root, see validate_object()."""
         try:
             if isinstance(path, str):
                 self.obj_fs = fsw_openfs(path)
@@ -160,6 +247,9 @@ class Validator():
         if not self.obj_fs.exists(inv_file):
             self.log.error("E063")
             return False
+        if self.level == "declaration":
+            self.validate_root_inventory_sidecar()
+            return self.log.num_errors == 0
         try:
             inventory, inv_validator = self.validate_inventory(inv_file)
             inventory_is_valid = self.log.num_errors == 0
@@ -172,13 +262,31 @@ class Validator():
             self.validate_inventory_digest(inv_file, self.digest_algorithm)
             # Object root
             self.validate_object_root(all_versions, already_checked=[namaste.filename for namaste in namastes])
-            # Version inventory files
-            (prior_manifest_digests, prior_fixity_digests) = self.validate_version_inventories(all_versions)
-            if inventory_is_valid:
-                # Object content
-                self.validate_content(inventory, all_versions, prior_manifest_digests, prior_fixity_digests)
+            # Version inventory files, the prior digests are closed here
+            # however validation ends (including FailFastException) so that
+            # any sorted run files are removed
+            (prior_manifest_digests, prior_fixity_digests) = self._new_prior_digests()
+            try:
+                self.validate_version_inventories(all_versions,
+                                                  prior_manifest_digests=prior_manifest_digests,
+                                                  prior_fixity_digests=prior_fixity_digests)
+                if inventory_is_valid and self.level != "inventory":
+                    # Object content
+                    self.validate_content(inventory, all_versions, prior_manifest_digests, prior_fixity_digests)
+            finally:
+                if self.max_memory is not None:
+                    prior_manifest_digests.close()
+                    prior_fixity_digests.close()
         except ValidatorAbortException:
             pass
+        if self.cache_inventory and self.log.num_errors == 0 and self.root_inventory_digest is not None:
+            # Valid object with root inventory checked against the sidecar
+            # digest, share the inventory via the inventory cache. The
+            # sidecar is checked at every level (not with check_digests False
+            # and no level), whether or not content digests are checked
+            inv = Inventory(inventory)
+            inv.normalize_digests(self.digest_algorithm)
+            inventory_cache().put((self.digest_algorithm, self.root_inventory_digest), inv)
         return self.log.num_errors == 0
 
     def validate_inventory(self, inv_file, where="root", force_spec_version=None):
@@ -200,8 +308,13 @@ class Validator():
         This method does not look at anything else in the object itself.
         """
         try:
-            with self.obj_fs.open(inv_file, "r") as fh:
-                inventory = json.load(fh)
+            if (inv_file, "json") in self.prefetched:
+                inventory = self.prefetched[(inv_file, "json")]
+            elif self.prefetched.get(inv_file) is not None:
+                inventory = json.loads(self.prefetched[inv_file].decode("utf-8"))
+            else:
+                with self.obj_fs.open(inv_file, "r") as fh:
+                    inventory = json.load(fh)
         except FileNotFoundError:
             self.log.error("E033", where=where, explanation="Inventory not present")
             raise ValidatorAbortException
@@ -210,14 +323,15 @@ class Validator():
             raise ValidatorAbortException
         inv_validator = InventoryValidator(log=self.log, where=where,
                                            lax_digests=self.lax_digests,
-                                           default_spec_version=self.spec_version)
+                                           default_spec_version=self.spec_version,
+                                           reference=self.root_inv_validator)
         inv_validator.validate(inventory, force_spec_version=force_spec_version)
         return inventory, inv_validator
 
     def validate_inventory_digest(self, inv_file, digest_algorithm, where="root"):
         """Validate the appropriate inventory digest file in path."""
         inv_digest_file = inv_file + "." + digest_algorithm
-        if not self.obj_fs.exists(inv_digest_file):
+        if not self._exists(inv_digest_file):
             self.log.error("E058a", where=where, path=inv_digest_file)
         else:
             self.validate_inventory_digest_match(inv_file, inv_digest_file)
@@ -228,21 +342,44 @@ class Validator():
         On error throws exception with debugging string intended to
         be presented to a user.
         """
-        if not self.check_digests:
+        if not self.check_inventory_digests:
             return
         m = re.match(r""".*\.(\w+)$""", inv_digest_file)
         if m:
             digest_algorithm = m.group(1)
             try:
                 digest_recorded = self.read_inventory_digest(inv_digest_file)
-                digest_actual = file_digest(inv_file, digest_algorithm, fs=self.obj_fs)
+                if self.prefetched.get(inv_file) is not None:
+                    digest_actual = bytes_digest(self.prefetched[inv_file], digest_algorithm)
+                else:
+                    digest_actual = file_digest(inv_file, digest_algorithm, fs=self.obj_fs)
                 if digest_actual != digest_recorded:
                     self.log.error("E060", inv_file=inv_file, actual=digest_actual, recorded=digest_recorded, inv_digest_file=inv_digest_file)
+                elif inv_file == INVENTORY_FILENAME:
+                    self.root_inventory_digest = digest_actual
             except ValueError as e:  # pylint: disable=broad-except
                 self.log.error("E061", description=str(e))
         else:
             self.log.error("E058b", inv_digest_file=inv_digest_file)
 
+    def validate_root_inventory_sidecar(self):
+        """Check the root inventory sidecar without parsing the inventory.
+
+        Used for the "declaration" validation level. The digest algorithm is
+        taken from the name of the sidecar, preferring sha512 and then
+        sha256 if there is more than one.
+        """
+        prefix = INVENTORY_FILENAME + "."
+        digest_algorithms = sorted(name[len(prefix):] for name in fsw_listdir_names(self.obj_fs, "")
+                                   if name.startswith(prefix))
+        for digest_algorithm in ("sha512", "sha256"):
+            if digest_algorithm in digest_algorithms:
+                break
+        else:
+            digest_algorithm = digest_algorithms[0] if digest_algorithms else self.digest_algorithm
+        self.digest_algorithm = digest_algorithm
+        self.validate_inventory_digest(INVENTORY_FILENAME, digest_algorithm)
+
     def validate_object_root(self, version_dirs, already_checked):
         """Validate object root.
 
@@ -293,7 +430,20 @@ class Validator():
             else:
                 self.log.error("E067", entry=name)
 
-    def validate_version_inventories(self, version_dirs):
+    def _new_prior_digests(self):
+        """Return a tuple of new, empty, prior manifest and fixity digests.
+
+        These are dicts of file -> algorithm -> digest -> [versions], or if
+        max_memory is set then SortedRuns of (file, algorithm, digest,
+        version_number, version) records which the caller must close.
+        """
+        if self.max_memory is None:
+            return {}, {}
+        return (SortedRuns(max_bytes=self.max_memory // 3),
+                SortedRuns(max_bytes=self.max_memory // 3))
+
+    def validate_version_inventories(self, version_dirs,
+                                     prior_manifest_digests=None, prior_fixity_digests=None):
         """Each version SHOULD have an inventory up to that point.
 
         Also keep a record of any content digests different from those in the root inventory
@@ -301,9 +451,18 @@ class Validator():
 
         version_dirs is an array of version directory names and is assumed to be in
         version sequence (1, 2, 3...).
+
+        prior_manifest_digests and prior_fixity_digests are the containers
+        to add the prior digests to, new ones from _new_prior_digests() are
+        used if they are None.
+
+        Returns a tuple of the prior manifest and fixity digests. These are
+        dicts of file -> algorithm -> digest -> [versions], or if max_memory
+        is set then SortedRuns of (file, algorithm, digest, version_number,
+        version) records.
         """
-        prior_manifest_digests = {}  # file -> algorithm -> digest -> [versions]
-        prior_fixity_digests = {}  # file -> algorithm -> digest -> [versions]
+        if prior_manifest_digests is None or prior_fixity_digests is None:
+            (prior_manifest_digests, prior_fixity_digests) = self._new_prior_digests()
         if len(version_dirs) == 0:
             return prior_manifest_digests, prior_fixity_digests
         first_version = version_dirs[0]
@@ -311,82 +470,173 @@ class Validator():
         last_version = version_dirs[-1]
         prev_version_dir = "NONE"  # will be set for first directory with inventory
         prev_spec_version = "1.0"  # lowest version
+        executor = ThreadPoolExecutor(max_workers=self.workers) if self.workers > 1 else None
+        try:
+            for version_dir in self._prefetch_version_inventories(version_dirs[:-1], executor):
+                (prev_version_dir, prev_spec_version, first_version_content_directory_set) = self._validate_version_inventory(
+                    version_dir, first_version=first_version, last_version=last_version,
+                    prev_version_dir=prev_version_dir, prev_spec_version=prev_spec_version,
+                    first_version_content_directory_set=first_version_content_directory_set,
+                    prior_manifest_digests=prior_manifest_digests, prior_fixity_digests=prior_fixity_digests)
+                self.prefetched.clear()
+            self._validate_version_inventory(
+                last_version, first_version=first_version, last_version=last_version,
+                prev_version_dir=prev_version_dir, prev_spec_version=prev_spec_version,
+                first_version_content_directory_set=first_version_content_directory_set,
+                prior_manifest_digests=prior_manifest_digests, prior_fixity_digests=prior_fixity_digests)
+        finally:
+            self.prefetched.clear()
+            if executor is not None:
+                executor.shutdown(cancel_futures=True)
+        return prior_manifest_digests, prior_fixity_digests
+
+    def _prefetch_version_inventories(self, version_dirs, executor):
+        """Generate version_dirs in order, having prefetched their inventories.
+
+        If executor is None then just generates version_dirs. Otherwise, the
+        reads for up to twice the number of workers version directories are run
+        ahead of the one being generated, and the data for the current one is
+        put in self.prefetched for use by the validation code.
+        """
+        if executor is None:
+            yield from version_dirs
+            return
+        futures = []
+        ahead = iter(version_dirs)
         for version_dir in version_dirs:
-            inv_file = os.path.join(version_dir, INVENTORY_FILENAME)
-            if not self.obj_fs.exists(inv_file):
-                self.log.warning("W010", where=version_dir)
-                continue
-            # There is an inventory file for this version directory, check it
-            if version_dir == last_version:
-                # Don't validate in this case. Per the spec the inventory in the last version
-                # MUST be identical to the copy in the object root, just check that
-                root_inv_file = INVENTORY_FILENAME
-                if not fsw_files_identical(self.obj_fs, inv_file, root_inv_file):
-                    self.log.error("E064", root_inv_file=root_inv_file, inv_file=inv_file)
-                else:
-                    # We could also just compare digest files but this gives a more helpful error for
-                    # which file has the incorrect digest if they don't match
-                    self.validate_inventory_digest(inv_file, self.digest_algorithm, where=version_dir)
-                self.inventory_digest_files[version_dir] = "inventory.json." + self.digest_algorithm
-                this_spec_version = self.spec_version
+            while len(futures) < 2 * self.workers:
+                next_dir = next(ahead, None)
+                if next_dir is None:
+                    break
+                futures.append(executor.submit(self._read_version_inventory, next_dir))
+            self.prefetched.update(futures.pop(0).result())
+            yield version_dir
+
+    def _read_version_inventory(self, version_dir):
+        """Read inventory and sidecar files for version_dir.
+
+        Runs in a worker thread. The sidecar read is the one for the
+        digestAlgorithm given in the inventory. Files that can't be read are
+        left out so that they will be read again in the normal way when
+        needed, and any errors reported then.
+
+        Returns dict of path -> bytes, or None if the file is not present. Also
+        includes the parsed inventory with the key (path, "json") if it is
+        valid JSON.
+        """
+        files = {}
+        inv_file = os.path.join(version_dir, INVENTORY_FILENAME)
+        try:
+            files[inv_file] = _read_bytes(self.obj_fs, inv_file)
+            if files[inv_file] is None:
+                return files
+            inventory = json.loads(files[inv_file].decode("utf-8"))
+            files[(inv_file, "json")] = inventory
+            digest_algorithm = inventory.get("digestAlgorithm")
+            if isinstance(digest_algorithm, str):
+                inv_digest_file = inv_file + "." + digest_algorithm
+                files[inv_digest_file] = _read_bytes(self.obj_fs, inv_digest_file)
+        except Exception:  # pylint: disable=broad-except
+            pass
+        return files
+
+    def _exists(self, path):
+        """Check whether path exists using prefetched data if available."""
+        if path in self.prefetched:
+            return self.prefetched[path] is not None
+        return self.obj_fs.exists(path)
+
+    def _validate_version_inventory(self, version_dir, *, first_version, last_version,
+                                    prev_version_dir, prev_spec_version,
+                                    first_version_content_directory_set,
+                                    prior_manifest_digests, prior_fixity_digests):
+        """Validate inventory of one version in sequence for validate_version_inventories().
+
+        Adds to prior_manifest_digests and prior_fixity_digests.
+
+        Returns tuple of the new values of (prev_version_dir, prev_spec_version,
+        first_version_content_directory_set).
+        """
+        inv_file = os.path.join(version_dir, INVENTORY_FILENAME)
+        if not self._exists(inv_file):
+            self.log.warning("W010", where=version_dir)
+            return prev_version_dir, prev_spec_version, first_version_content_directory_set
+        # There is an inventory file for this version directory, check it
+        if version_dir == last_version:
+            # Don't validate in this case. Per the spec the inventory in the last version
+            # MUST be identical to the copy in the object root, just check that
+            root_inv_file = INVENTORY_FILENAME
+            if not fsw_files_identical(self.obj_fs, inv_file, root_inv_file):
+                self.log.error("E064", root_inv_file=root_inv_file, inv_file=inv_file)
             else:
-                # Note that inventories in prior versions may use different digest
-                # algorithms from the current invenotory. Also, they may accord
-                # with the same or earlier versions of the specification
-                version_inventory, inv_validator = self.validate_inventory(inv_file, where=version_dir)
-                this_spec_version = inv_validator.spec_version
-                digest_algorithm = inv_validator.digest_algorithm
-                self.validate_inventory_digest(inv_file, digest_algorithm, where=version_dir)
-                self.inventory_digest_files[version_dir] = "inventory.json." + digest_algorithm
-                if self.id and "id" in version_inventory:
-                    if version_inventory["id"] != self.id:
-                        self.log.error("E037b", where=version_dir, root_id=self.id, version_id=version_inventory["id"])
-                if first_version:
-                    first_version_content_directory_set = inv_validator.content_directory_set
-                    if not first_version_content_directory_set and self.content_directory_set:
-                        self.log.error("E019", where="root")
-                        first_version_content_directory_set = False  # report E019 just once
-                elif not first_version_content_directory_set and inv_validator.content_directory_set:
-                    # E019 is a rather odd and specific error condition: that if
-                    # the contentDirectory is set for any version it must be set
-                    # the first version. It isn't clear that this is very usefully
-                    # different from E020 that picks up inconsistency between ant
-                    # two versions.
-                    self.log.error("E019", where=version_dir)
+                # We could also just compare digest files but this gives a more helpful error for
+                # which file has the incorrect digest if they don't match
+                self.validate_inventory_digest(inv_file, self.digest_algorithm, where=version_dir)
+            self.inventory_digest_files[version_dir] = "inventory.json." + self.digest_algorithm
+            this_spec_version = self.spec_version
+        else:
+            # Note that inventories in prior versions may use different digest
+            # algorithms from the current invenotory. Also, they may accord
+            # with the same or earlier versions of the specification
+            version_inventory, inv_validator = self.validate_inventory(inv_file, where=version_dir)
+            this_spec_version = inv_validator.spec_version
+            digest_algorithm = inv_validator.digest_algorithm
+            self.validate_inventory_digest(inv_file, digest_algorithm, where=version_dir)
+            self.inventory_digest_files[version_dir] = "inventory.json." + digest_algorithm
+            if self.id and "id" in version_inventory:
+                if version_inventory["id"] != self.id:
+                    self.log.error("E037b", where=version_dir, root_id=self.id, version_id=version_inventory["id"])
+            if first_version:
+                first_version_content_directory_set = inv_validator.content_directory_set
+                if not first_version_content_directory_set and self.content_directory_set:
+                    self.log.error("E019", where="root")
                     first_version_content_directory_set = False  # report E019 just once
-                if self.content_directory != inv_validator.content_directory:
-                    self.log.error("E020", where=version_dir, root_content_directory=self.content_directory, version_content_directory=inv_validator.content_directory)
-                if "manifest" in version_inventory:
-                    # Check that all files listed in prior inventories are in manifest
-                    not_seen = set(prior_manifest_digests.keys())
-                    for digest in version_inventory["manifest"]:
-                        for filepath in version_inventory["manifest"][digest]:
-                            # We rely on the validation to check that anything present is OK
-                            if filepath in not_seen:
-                                not_seen.remove(filepath)
-                    if len(not_seen) > 0:
-                        self.log.error("E023b", where=version_dir, missing_filepaths=", ".join(sorted(not_seen)))
-                    # Record all prior digests
-                    for unnormalized_digest in version_inventory["manifest"]:
+            elif not first_version_content_directory_set and inv_validator.content_directory_set:
+                # E019 is a rather odd and specific error condition: that if
+                # the contentDirectory is set for any version it must be set
+                # the first version. It isn't clear that this is very usefully
+                # different from E020 that picks up inconsistency between ant
+                # two versions.
+                self.log.error("E019", where=version_dir)
+                first_version_content_directory_set = False  # report E019 just once
+            if self.content_directory != inv_validator.content_directory:
+                self.log.error("E020", where=version_dir, root_content_directory=self.content_directory, version_content_directory=inv_validator.content_directory)
+            if "manifest" in version_inventory and self.max_memory is not None:
+                self._add_prior_manifest_bounded(version_dir, digest_algorithm, version_inventory["manifest"], prior_manifest_digests)
+            elif "manifest" in version_inventory:
+                # Check that all files listed in prior inventories are in manifest
+                not_seen = set(prior_manifest_digests.keys())
+                for digest in version_inventory["manifest"]:
+                    for filepath in version_inventory["manifest"][digest]:
+                        # We rely on the validation to check that anything present is OK
+                        if filepath in not_seen:
+                            not_seen.remove(filepath)
+                if len(not_seen) > 0:
+                    self.log.error("E023b", where=version_dir, missing_filepaths=", ".join(sorted(not_seen)))
+                # Record all prior digests
+                for unnormalized_digest in version_inventory["manifest"]:
+                    digest = normalized_digest(unnormalized_digest, digest_type=digest_algorithm)
+                    for filepath in version_inventory["manifest"][unnormalized_digest]:
+                        if filepath not in prior_manifest_digests:
+                            prior_manifest_digests[filepath] = {}
+                        if digest_algorithm not in prior_manifest_digests[filepath]:
+                            prior_manifest_digests[filepath][digest_algorithm] = {}
+                        if digest not in prior_manifest_digests[filepath][digest_algorithm]:
+                            prior_manifest_digests[filepath][digest_algorithm][digest] = []
+                        prior_manifest_digests[filepath][digest_algorithm][digest].append(version_dir)
+            # Is this inventory an appropriate prior version of the object root inventory?
+            if self.root_inv_validator is not None:
+                self.root_inv_validator.validate_as_prior_version(inv_validator)
+            # Fixity blocks are independent in each version. Record all values and the versions
+            # they occur in for later checks against content
+            if "fixity" in version_inventory:
+                for digest_algorithm in version_inventory["fixity"]:
+                    for unnormalized_digest in version_inventory["fixity"][digest_algorithm]:
                         digest = normalized_digest(unnormalized_digest, digest_type=digest_algorithm)
-                        for filepath in version_inventory["manifest"][unnormalized_digest]:
-                            if filepath not in prior_manifest_digests:
-                                prior_manifest_digests[filepath] = {}
-                            if digest_algorithm not in prior_manifest_digests[filepath]:
-                                prior_manifest_digests[filepath][digest_algorithm] = {}
-                            if digest not in prior_manifest_digests[filepath][digest_algorithm]:
-                                prior_manifest_digests[filepath][digest_algorithm][digest] = []
-                            prior_manifest_digests[filepath][digest_algorithm][digest].append(version_dir)
-                # Is this inventory an appropriate prior version of the object root inventory?
-                if self.root_inv_validator is not None:
-                    self.root_inv_validator.validate_as_prior_version(inv_validator)
-                # Fixity blocks are independent in each version. Record all values and the versions
-                # they occur in for later checks against content
-                if "fixity" in version_inventory:
-                    for digest_algorithm in version_inventory["fixity"]:
-                        for unnormalized_digest in version_inventory["fixity"][digest_algorithm]:
-                            digest = normalized_digest(unnormalized_digest, digest_type=digest_algorithm)
-                            for filepath in version_inventory["fixity"][digest_algorithm][unnormalized_digest]:
+                        for filepath in version_inventory["fixity"][digest_algorithm][unnormalized_digest]:
+                            if self.max_memory is not None:
+                                prior_fixity_digests.add((filepath, digest_algorithm, digest, int(version_dir[1:]), version_dir))
+                            else:
                                 if filepath not in prior_fixity_digests:
                                     prior_fixity_digests[filepath] = {}
                                 if digest_algorithm not in prior_fixity_digests[filepath]:
@@ -394,23 +644,40 @@ class Validator():
                                 if digest not in prior_fixity_digests[filepath][digest_algorithm]:
                                     prior_fixity_digests[filepath][digest_algorithm][digest] = []
                                 prior_fixity_digests[filepath][digest_algorithm][digest].append(version_dir)
-            # We are validating the inventories in sequence and each new version must
-            # follow the same or later spec version to previous inventories
-            if prev_spec_version > this_spec_version:
-                self.log.error("E103", where=version_dir, this_spec_version=this_spec_version,
-                               prev_version_dir=prev_version_dir, prev_spec_version=prev_spec_version)
-            prev_version_dir = version_dir
-            prev_spec_version = this_spec_version
-        return prior_manifest_digests, prior_fixity_digests
-
-    def validate_content(self, inventory, version_dirs, prior_manifest_digests, prior_fixity_digests):
-        """Validate file presence and content against inventory.
+        # We are validating the inventories in sequence and each new version must
+        # follow the same or later spec version to previous inventories
+        if prev_spec_version > this_spec_version:
+            self.log.error("E103", where=version_dir, this_spec_version=this_spec_version,
+                           prev_version_dir=prev_version_dir, prev_spec_version=prev_spec_version)
+        return version_dir, this_spec_version, first_version_content_directory_set
+
+    def _add_prior_manifest_bounded(self, version_dir, digest_algorithm, manifest, prior_manifest_digests):
+        """Check and record manifest of a prior version inventory with bounded memory.
+
+        Reports E023b for any files listed in earlier inventories that are
+        not in manifest, using a merge join of the sorted content paths in
+        manifest with the sorted prior_manifest_digests records. Then adds
+        records for manifest to prior_manifest_digests.
+        """
+        filepaths = SortedLookup(((filepath,), True) for filepath in
+                                 sorted(filepath for filepaths in manifest.values() for filepath in filepaths))
+        not_seen = [key[0] for key, _ in grouped(prior_manifest_digests) if not filepaths.get(key, False)]
+        if len(not_seen) > 0:
+            self.log.error("E023b", where=version_dir, missing_filepaths=", ".join(not_seen))
+        version_number = int(version_dir[1:])
+        for unnormalized_digest, filepaths in manifest.items():
+            digest = normalized_digest(unnormalized_digest, digest_type=digest_algorithm)
+            for filepath in filepaths:
+                prior_manifest_digests.add((filepath, digest_algorithm, digest, version_number, version_dir))
+
+    def list_content(self, version_dirs, add_file):
+        """Check entries in version directories and list content files.
 
-        The root inventory in `inventory` is assumed to be valid and safe to use
-        for construction of file paths etc..
+        Arguments:
+            version_dirs - list of version directories to check
+            add_file - function called with the path of each content file
+                found (`v1/content/something` etc.)
         """
-        files_seen = set()
-        # Check files in each version directory
         for version_dir in version_dirs:
             try:
                 # Check contents of version directory except content_directory
@@ -427,7 +694,7 @@ class Validator():
                             if dirpath != "/" + content_path and (len(dirs) + len(files)) == 0:
                                 self.log.error("E024", where=version_dir, path=dirpath)
                             for file in files:
-                                files_seen.add(os.path.join(dirpath, file).lstrip("/"))
+                                add_file(os.path.join(dirpath, file).lstrip("/"))
                                 num_content_files_in_version += 1
                         if num_content_files_in_version == 0:
                             self.log.warning("W003", where=version_dir)
@@ -437,6 +704,19 @@ class Validator():
                         self.log.error("E015", where=version_dir, entry=entry)
             except (FileNotFoundError):
                 self.log.error("E046a", version_dir=version_dir)
+
+    def validate_content(self, inventory, version_dirs, prior_manifest_digests, prior_fixity_digests):
+        """Validate file presence and content against inventory.
+
+        The root inventory in `inventory` is assumed to be valid and safe to use
+        for construction of file paths etc..
+        """
+        if self.max_memory is not None:
+            self.validate_content_bounded(inventory, version_dirs, prior_manifest_digests, prior_fixity_digests)
+            return
+        files_seen = set()
+        # Check files in each version directory
+        self.list_content(version_dirs, files_seen.add)
         # Extract any digests in fixity and organize by filepath
         fixity_digests = {}
         if "fixity" in inventory:
@@ -460,7 +740,7 @@ class Validator():
                         self.log.error("E092b", where="root", content_path=filepath)
                     else:
                         if self.check_digests:
-                            content_digest = file_digest(filepath, digest_type=self.digest_algorithm, fs=self.obj_fs)
+                            content_digest = self.content_digest(filepath, self.digest_algorithm)
                             if content_digest != normalized_digest(digest, digest_type=self.digest_algorithm):
                                 self.log.error("E092a", where="root", digest_algorithm=self.digest_algorithm, digest=digest, content_path=filepath, content_digest=content_digest)
                             known_digests = {self.digest_algorithm: content_digest}
@@ -474,6 +754,78 @@ class Validator():
         if len(files_seen) > 0:
             self.log.error("E023a", where="root", extra_files=", ".join(sorted(files_seen)))
 
+    def validate_content_bounded(self, inventory, version_dirs, prior_manifest_digests, prior_fixity_digests):
+        """Validate file presence and content against inventory with bounded memory.
+
+        Makes the same checks as validate_content() for the case where
+        max_memory is set. Records for the content files present and for the
+        root manifest and fixity entries are collected in one SortedRuns
+        instance and reconciled in a single pass in content path order. The
+        prior manifest and fixity digest records from
+        validate_version_inventories() are joined in the same order.
+        """
+        with SortedRuns(max_bytes=self.max_memory // 3) as entries:
+            # Records are (filepath, kind, digest_algorithm, digest) where kind is
+            # 0 for a file present, 1 for a manifest entry, 2 for a fixity entry
+            self.list_content(version_dirs, lambda filepath: entries.add((filepath, 0, "", "")))
+            for digest, filepaths in inventory.get("manifest", {}).items():
+                for filepath in filepaths:
+                    entries.add((filepath, 1, "", digest))
+            for digest_algorithm, block in inventory.get("fixity", {}).items():
+                for digest, filepaths in block.items():
+                    for filepath in filepaths:
+                        entries.add((filepath, 2, digest_algorithm, digest))
+            prior_manifest = SortedLookup(_additional_digests_by_filepath(prior_manifest_digests))
+            prior_fixity = SortedLookup(_additional_digests_by_filepath(prior_fixity_digests))
+            extra_files = []
+            for (filepath,), group in grouped(entries):
+                present = group[0][1] == 0
+                fixity_digests = {}
+                for _, kind, digest_algorithm, digest in group:
+                    if kind != 2:
+                        pass
+                    elif present:
+                        fixity_digests.setdefault(filepath, {}).setdefault(digest_algorithm, {})[digest] = ["root"]
+                    else:
+                        self.log.error("E093b", where="root", digest_algorithm=digest_algorithm, digest=digest, content_path=filepath)
+                in_manifest = False
+                for _, kind, _, digest in group:
+                    if kind != 1:
+                        continue
+                    in_manifest = True
+                    if not present:
+                        self.log.error("E092b", where="root", content_path=filepath)
+                        continue
+                    if self.check_digests:
+                        content_digest = self.content_digest(filepath, self.digest_algorithm)
+                        if content_digest != normalized_digest(digest, digest_type=self.digest_algorithm):
+                            self.log.error("E092a", where="root", digest_algorithm=self.digest_algorithm, digest=digest, content_path=filepath, content_digest=content_digest)
+                        known_digests = {self.digest_algorithm: content_digest}
+                        self.check_additional_digests(filepath, known_digests, fixity_digests, "E093a")
+                        self.check_additional_digests(filepath, known_digests, prior_manifest.get(filepath, {}), "E092a")
+                        self.check_additional_digests(filepath, known_digests, prior_fixity.get(filepath, {}), "E093a")
+                    present = False  # any further manifest entry for filepath is an error
+                if present and not in_manifest:
+                    extra_files.append(filepath)
+            # Files not mentioned in the inventory
+            if len(extra_files) > 0:
+                self.log.error("E023a", where="root", extra_files=", ".join(extra_files))
+
+    def content_digest(self, filepath, digest_algorithm):
+        """Digest of content file filepath in the object.
+
+        Subclasses may override this to supply digests computed in some
+        other way, such as ahead of validation.
+
+        Arguments:
+            filepath (str): path of file in object
+            digest_algorithm (str): digest algorithm to use
+
+        Returns:
+            str: the digest
+        """
+        return file_digest(filepath, digest_type=digest_algorithm, fs=self.obj_fs)
+
     def check_additional_digests(self, filepath, known_digests, additional_digests, error_code):
         """Check all the additional digests for filepath.
 
@@ -493,8 +845,11 @@ class Validator():
                 if digest_algorithm in known_digests:
                     # Don't recompute anything, just use it if we've seen it before
                     content_digest = known_digests[digest_algorithm]
+                elif self.level != "fixity":
+                    # Only digests with algorithms already computed are checked
+                    continue
                 else:
-                    content_digest = file_digest(filepath, digest_type=digest_algorithm, fs=self.obj_fs)
+                    content_digest = self.content_digest(filepath, digest_algorithm)
                     known_digests[digest_algorithm] = content_digest
                 for digest in additional_digests[filepath][digest_algorithm]:
                     if content_digest != normalized_digest(digest, digest_type=digest_algorithm):
@@ -511,9 +866,12 @@ class Validator():
             Exception: if there is an error reading the digest or it has
                 the wrong format
         """
-        with fsw_openfile(inv_digest_file, "r", fs=self.obj_fs) as fh:
-            line = fh.readline()
-            # we ignore any following lines, could raise exception
+        if self.prefetched.get(inv_digest_file) is not None:
+            line = io.StringIO(self.prefetched[inv_digest_file].decode("utf-8")).readline()
+        else:
+            with fsw_openfile(inv_digest_file, "r", fs=self.obj_fs) as fh:
+                line = fh.readline()
+                # we ignore any following lines, could raise exception
         m = re.match(r"""(\w+)\s+(\S+)\s*$""", line)
         if not m:
             raise ValueError("Bad inventory digest file %s, wrong format" % (inv_digest_file))
@@ -0,0 +1,236 @@
+"""Read-only filesystem view of one version of an OCFL Object.
+
+The OCFLVersionFileSystem class presents the logical paths of a version of an
+ocfl.Object as an fsspec filesystem. Opening a logical path resolves it via the
+inventory state and manifest to a content path within the object, and then
+opens that file on the object filesystem. No content is copied, so this is an
+alternative to ocfl.Object.extract() for read-only access.
+
+Example:
+    >>> import ocfl
+    >>> obj = ocfl.Object(path="fixtures/1.1/good-objects/spec-ex-full")
+    >>> vfs = ocfl.OCFLVersionFileSystem(obj=obj, version="v2")
+    >>> vfs.ls("", detail=False)
+    ['empty.txt', 'empty2.txt', 'foo']
+    >>> vfs.cat_file("foo/bar.xml")[:5]
+    b'<?xml'
+
+The open_logical() function opens a single logical file without building
+an index of the whole version, for repeated access to individual files:
+
+    >>> from ocfl.version_fs import open_logical
+    >>> with open_logical(obj, "foo/bar.xml", version="v2") as fh:
+    ...     fh.read(5)
+    b'<?xml'
+"""
+import os.path
+
+from .fsw import AbstractFileSystem
+from .object_utils import ObjectException
+
+
+class OCFLVersionFileSystem(AbstractFileSystem):
+    """Read-only fsspec filesystem for the logical paths of an object version.
+
+    Listings and file information are served from an index built from the
+    inventory when the filesystem is created. File sizes are read from the
+    object filesystem only when first needed, with one directory listing
+    for each content directory involved.
+
+    Attributes:
+        obj (ocfl.Object): the object, with obj_fs open
+        inventory (ocfl.Inventory): parsed inventory of the object
+        version (str): version directory of the version presented
+    """
+
+    protocol = "ocfl"
+    root_marker = ""
+    cachable = False  # Instances depend on object state, don't reuse
+
+    def __init__(self, obj=None, version="head", path=None, inventory=None, **kwargs):
+        """Initialize OCFLVersionFileSystem.
+
+        Arguments:
+            obj (ocfl.Object or None): the object to present, which must
+                have an open obj_fs
+            version (str): version directory ("v1", etc.) or "head" (default)
+                for the latest version
+            path (str or None): alternative to obj, path or fsw filesystem
+                URL of the object to open
+            inventory (ocfl.Inventory or None): previously parsed inventory
+                of the object, else None (default) to parse it here
+            **kwargs: passed to AbstractFileSystem
+
+        Raises:
+            ocfl.ObjectException: if the object cannot be opened or the
+                version doesn't exist
+        """
+        super().__init__(**kwargs)
+        if obj is None:
+            from .object import Object  # pylint: disable=import-outside-toplevel; avoid import loop
+            obj = Object(path=path)
+        self.obj = obj
+        self.inventory = obj.parse_inventory(use_cache=True) if inventory is None else inventory
+        if version == "head":
+            version = self.inventory.head
+        elif version not in self.inventory.version_directories:
+            raise ObjectException("Object does not include a version '%s'" % (version))
+        self.version = version
+        self._files = {}  # logical_path -> content_path
+        self._dirs = {"": set()}  # logical directory -> set of child names
+        self._sizes = None  # content_path -> size, lazily loaded
+        manifest = self.inventory.manifest
+        for digest, logical_paths in self.inventory.version(version).state.items():
+            content_path = manifest[digest][0]
+            for logical_path in logical_paths:
+                self._files[logical_path] = content_path
+                child = logical_path
+                parent = os.path.dirname(child)
+                while True:
+                    if parent in self._dirs:
+                        self._dirs[parent].add(child)
+                        break
+                    self._dirs[parent] = set([child])
+                    child = parent
+                    parent = os.path.dirname(child)
+
+    @classmethod
+    def _strip_protocol(cls, path):
+        """Remove any protocol prefix and leading and trailing slashes."""
+        path = super()._strip_protocol(path)
+        return path.strip("/")
+
+    def _content_size(self, content_path):
+        """Size in bytes of the content file at content_path."""
+        if self._sizes is None:
+            self._sizes = {}
+            obj_fs = self.obj.obj_fs
+            for dirpath in set(os.path.dirname(p) for p in self._files.values()):
+                for info in obj_fs.ls(dirpath, detail=True):
+                    self._sizes[info["name"].lstrip("/")] = info["size"]
+        if content_path not in self._sizes:
+            self._sizes[content_path] = self.obj.obj_fs.info(content_path)["size"]
+        return self._sizes[content_path]
+
+    def content_path(self, path):
+        """Content path within the object for logical path.
+
+        Arguments:
+            path (str): logical path in this version
+
+        Returns:
+            str: the content path of the file relative to the object root
+
+        Raises:
+            FileNotFoundError: if path is not a file in this version
+        """
+        path = self._strip_protocol(path)
+        if path not in self._files:
+            raise FileNotFoundError(path)
+        return self._files[path]
+
+    def info(self, path, **kwargs):
+        """Details of a logical path.
+
+        Returns:
+            dict: with name, type ("file" or "directory") and size keys,
+                files also have a content_path key
+        """
+        path = self._strip_protocol(path)
+        if path in self._files:
+            content_path = self._files[path]
+            return {"name": path, "type": "file",
+                    "size": self._content_size(content_path),
+                    "content_path": content_path}
+        if path in self._dirs:
+            return {"name": path, "type": "directory", "size": 0}
+        raise FileNotFoundError(path)
+
+    def ls(self, path, detail=True, **kwargs):
+        """List a logical directory, or a single logical file.
+
+        Arguments:
+            path (str): logical directory path, "" for the root
+            detail (bool): True (default) to return a list of info dicts,
+                False to return a list of paths
+
+        Returns:
+            list: sorted entries
+        """
+        path = self._strip_protocol(path)
+        if path in self._dirs:
+            names = sorted(self._dirs[path])
+        elif path in self._files:
+            names = [path]
+        else:
+            raise FileNotFoundError(path)
+        if detail:
+            return [self.info(name) for name in names]
+        return names
+
+    def exists(self, path, **kwargs):
+        """Check whether a logical file or directory exists."""
+        path = self._strip_protocol(path)
+        return path in self._files or path in self._dirs
+
+    def _open(self, path, mode="rb", block_size=None, autocommit=True,
+              cache_options=None, **kwargs):
+        """Open the content file for a logical path for reading.
+
+        Raises:
+            NotImplementedError: if mode is not a read mode
+            FileNotFoundError: if path is not a file in this version
+        """
+        if mode != "rb":
+            raise NotImplementedError("OCFLVersionFileSystem is read-only")
+        return self.obj.obj_fs.open(self.content_path(path), "rb")
+
+
+def open_logical(obj, logical_path, version="head", objdir=None):
+    """Open the file for a logical path in a version of an object.
+
+    Arguments:
+        obj (ocfl.Object): the object
+        logical_path (str): logical path of the file within the version
+        version (str): version ("v1", etc.) or "head" (default) for latest
+        objdir (str or None): directory for the object, else None (default)
+            to use the currently open object filesystem
+
+    Returns:
+        file-like: binary file handle open for reading the content
+
+    Raises:
+        ocfl.ObjectException: if the version or logical path doesn't exist
+
+    Unlike OCFLVersionFileSystem no index of the version is built for each
+    call. The parsed inventory, and the map of logical paths to content
+    paths for each version used, are kept in the inventory cache and reused
+    for as long as the root inventory sidecar is unchanged, so repeated
+    calls cost one small read of the sidecar plus the open of the content
+    file.
+    """
+    if objdir is not None:
+        obj.open_obj_fs(objdir)
+    entry = obj.inventory_cache_entry()
+    inv = entry.inventory
+    if version == "head":
+        version = inv.head
+    elif version not in inv.version_directories:
+        raise ObjectException("Object does not include a version '%s'" % (version))
+    logical_path_maps = entry.derived.setdefault("logical_path_maps", {})
+    if version not in logical_path_maps:
+        logical_path_maps[version] = _logical_path_map(inv, version)
+    logical_path_map = logical_path_maps[version]
+    if logical_path not in logical_path_map:
+        raise ObjectException("Logical path %s not found in %s" % (logical_path, version))
+    return obj.obj_fs.open(logical_path_map[logical_path], "rb")
+
+
+def _logical_path_map(inv, version):
+    """Return map from logical path to content path for version in inv."""
+    manifest = inv.manifest
+    logical_path_map = {}
+    for digest, logical_paths in inv.version(version).state.items():
+        for logical_path in logical_paths:
+            logical_path_map[logical_path] = manifest[digest][0]
+    return logical_path_map
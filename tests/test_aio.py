@@ -0,0 +1,142 @@
+"""Asyncio API tests."""
+import asyncio
+import filecmp
+import os
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+from unittest import mock
+
+from fsspec.implementations.asyn_wrapper import AsyncFileSystemWrapper
+from fsspec.implementations.dirfs import DirFileSystem
+from fsspec.implementations.local import LocalFileSystem
+
+import ocfl.aio
+from ocfl.aio import AsyncFs
+from ocfl.object import Object
+from ocfl.object_utils import ObjectException
+from ocfl.storage_root import StorageRoot
+from ocfl.version_metadata import VersionMetadata
+
+GOOD_ROOT = "extra_fixtures/1.0/good-storage-roots/reg-extension-dir-root"
+GOOD_OBJECT = GOOD_ROOT + "/a47/817/83d/cec/ark%3a123%2fabc"
+
+
+def async_local_fs(path):
+    """AsyncFs for local path through a filesystem in asynchronous mode."""
+    fs = AsyncFileSystemWrapper(LocalFileSystem(), asynchronous=True)
+    return AsyncFs(DirFileSystem(path=os.path.abspath(path), fs=fs, asynchronous=True), max_requests=4)
+
+
+class TestAll(unittest.IsolatedAsyncioTestCase):
+    """TestAll class to run tests."""
+
+    def setUp(self):
+        """Set up temporary directory."""
+        self.tempdir = tempfile.mkdtemp(prefix="test_aio")
+
+    def tearDown(self):
+        """Remove temporary directory."""
+        shutil.rmtree(self.tempdir)
+
+    async def test_async_fs(self):
+        """Test AsyncFs class with sync and async filesystems."""
+        for afs in (await AsyncFs.open("tests/testdata"), async_local_fs("tests/testdata")):
+            self.assertEqual(afs.is_async, isinstance(afs.fs.fs, AsyncFileSystemWrapper))
+            self.assertIn("hello_out_there.txt", await afs.ls("files"))
+            entries = await afs.walk("files")
+            self.assertEqual(entries["hello_out_there.txt"]["type"], "file")
+            self.assertEqual(await afs.cat("files/hello_out_there.txt", start=0, end=5), b"Hello")
+            self.assertEqual((await afs.opendir("files").digests("hello_out_there.txt", ["md5"]))["md5"],
+                             "9c7ec1389a61f1e15185bd976672bc63")
+            # Ranged reads
+            with mock.patch("ocfl.aio.RANGE_SIZE", 5):
+                self.assertEqual(await afs.digests("files/hello_out_there.txt", ["md5", "sha1"], size=18),
+                                 await afs.digests("files/hello_out_there.txt", ["md5", "sha1"]))
+            await afs.close()
+        afs = await AsyncFs.open(self.tempdir)
+        await afs.pipe("a/b/c.txt", b"abc")
+        self.assertEqual(await afs.cat("a/b/c.txt"), b"abc")
+        with self.assertRaises(FileNotFoundError):
+            await AsyncFs.open(os.path.join(self.tempdir, "does-not-exist"))
+
+    async def test_validate_object(self):
+        """Test validate_object gives the same result as Object.validate."""
+        dirs = [GOOD_OBJECT]
+        for fixtures in ("extra_fixtures/1.0/good-objects", "extra_fixtures/1.0/bad-objects"):
+            dirs += [os.path.join(fixtures, d) for d in sorted(os.listdir(fixtures)) if not d.endswith(".zip")]
+        for objdir in dirs:
+            for level in ("inventory", "fixity"):
+                passed, validator = Object().validate(objdir=objdir, level=level)
+                apassed, avalidator = await ocfl.aio.validate_object(objdir, level=level)
+                self.assertEqual(apassed, passed, objdir)
+                self.assertEqual(sorted(avalidator.log.messages), sorted(validator.log.messages), objdir)
+        # Digests are computed ahead of validation
+        passed, validator = await ocfl.aio.validate_object(async_local_fs(GOOD_OBJECT))
+        self.assertTrue(passed)
+        self.assertIn(("v1/content/a_file.txt", "sha512"), validator.digests)
+        passed, validator = await ocfl.aio.validate_object(os.path.join(self.tempdir, "does-not-exist"))
+        self.assertFalse(passed)
+        self.assertIn("E003e", validator.log.codes)
+
+    async def test_create_and_extract(self):
+        """Test create and extract functions."""
+        objdir = os.path.join(self.tempdir, "obj")
+        obj = Object(identifier="http://example.org/aio", digest_algorithm="sha256")
+        inventory = await ocfl.aio.create(obj, "tests/testdata/files", objdir,
+                                          metadata=VersionMetadata(message="Async", name="A", address="mailto:a@example.org"))
+        self.assertEqual(inventory.head, "v1")
+        passed, validator = Object().validate(objdir=objdir)
+        self.assertTrue(passed, str(validator))
+        with self.assertRaises(ObjectException):
+            await ocfl.aio.create(obj, "tests/testdata/files", objdir)
+        dstdir = os.path.join(self.tempdir, "v1")
+        metadata = await ocfl.aio.extract(async_local_fs(objdir), "head", dstdir)
+        self.assertEqual(metadata.message, "Async")
+        comparison = filecmp.dircmp("tests/testdata/files", dstdir)
+        self.assertEqual(comparison.left_only + comparison.right_only + comparison.diff_files, [])
+        with self.assertRaises(ObjectException):
+            await ocfl.aio.extract(objdir, "v1", dstdir)
+        with self.assertRaises(ObjectException):
+            await ocfl.aio.extract(objdir, "v2", os.path.join(self.tempdir, "v2"))
+
+    async def test_object_paths_and_list_objects(self):
+        """Test object_paths and list_objects functions."""
+        for root in ("extra_fixtures/1.0/good-storage-roots/simple-root", GOOD_ROOT):
+            store = StorageRoot(root=root)
+            expected = sorted(store.list_objects())
+            self.assertEqual(sorted([p async for p in ocfl.aio.object_paths(StorageRoot(root=root))]),
+                             [p for p, _ in expected])
+            for read_inventory in (False, True):
+                astore = StorageRoot(root=root)
+                objects = [o async for o in ocfl.aio.list_objects(astore, read_inventory=read_inventory)]
+                self.assertEqual(sorted(objects), expected)
+                self.assertEqual(astore.num_objects, len(expected))
+        # Traversal errors are recorded as for StorageRoot.object_paths()
+        store = StorageRoot(root="extra_fixtures/1.0/bad-storage-roots/E072_root_with_file_not_in_object")
+        self.assertEqual([p async for p in ocfl.aio.object_paths(store)], ["dir2/minimal_no_content"])
+        self.assertEqual(store.num_traversal_errors, 1)
+
+    async def test_concurrency_limit(self):
+        """Test that requests in flight are limited by the semaphore."""
+        fs = DirFileSystem(path=os.path.abspath("tests/testdata"), fs=LocalFileSystem(), skip_instance_cache=True)
+        afs = AsyncFs(fs, max_requests=2)
+        lock = threading.Lock()
+        counts = {"now": 0, "max": 0}
+        cat_file = fs.cat_file
+
+        def counting_cat_file(*args, **kwargs):
+            with lock:
+                counts["now"] += 1
+                counts["max"] = max(counts["max"], counts["now"])
+            time.sleep(0.01)
+            with lock:
+                counts["now"] -= 1
+            return cat_file(*args, **kwargs)
+
+        fs.cat_file = counting_cat_file
+        data = await asyncio.gather(*(afs.cat("files/hello_out_there.txt") for _ in range(10)))
+        self.assertEqual(len(set(data)), 1)
+        self.assertEqual(counts["max"], 2)
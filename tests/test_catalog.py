@@ -0,0 +1,43 @@
+"""Catalog tests."""
+import os
+import shutil
+import tempfile
+import unittest
+
+from ocfl.catalog import catalog_records
+from ocfl.storage_root import StorageRoot
+
+
+class TestAll(unittest.TestCase):
+    """TestAll class to run tests."""
+
+    def test_catalog_records(self):
+        """Test catalog_records function."""
+        tempdir = tempfile.mkdtemp(prefix="test_catalog")
+        root = os.path.join(tempdir, "root")
+        shutil.copytree("extra_fixtures/1.0/good-storage-roots/simple-root", root)
+        s = StorageRoot(root=root)
+        records = list(catalog_records(s, workers=2))
+        self.assertEqual(len(records), 11)
+        self.assertEqual(s.num_objects, 3)
+        self.assertEqual(s.errors, [])
+        self.assertIn({"id": "ark:123/abc", "version": "v1", "logical_path": "a_file.txt",
+                       "content_path": "v1/content/a_file.txt",
+                       "digest": "43a43fe8a8a082d3b5343dfaf2fd0c8b8e370675b1f376e92e9994612c33ea255b11298269d72f797399ebb94edeefe53df243643676548f584fb8603ca53a0f",
+                       "size": 20}, records)
+        self.assertEqual(sorted(set(r["version"] for r in records if r["id"] == "ark:/12345/bcd987")), ["v1", "v2", "v3"])
+        # Object that can't be read is skipped
+        with open(os.path.join(root, "ark%3A123%2Fabc", "inventory.json"), "w", encoding="utf-8") as fh:
+            fh.write("not json")
+        records = list(catalog_records(s))
+        self.assertEqual(len(records), 10)
+        self.assertEqual(s.num_objects, 2)
+        self.assertEqual([e[0] for e in s.errors], ["ark%3A123%2Fabc"])
+        # As is an object with an inventory that is not a JSON object
+        with open(os.path.join(root, "ark%3A%2F12345%2Fbcd987", "inventory.json"), "w", encoding="utf-8") as fh:
+            fh.write("[1,2]")
+        with open(os.path.join(root, "ark%3A%2F12345%2Fbcd987", "inventory.json.sha512"), "w", encoding="utf-8") as fh:
+            fh.write("abc123 inventory.json\n")
+        self.assertEqual(len(list(catalog_records(s))), 1)
+        self.assertEqual(s.num_objects, 1)
+        self.assertEqual(sorted(e[0] for e in s.errors), ["ark%3A%2F12345%2Fbcd987", "ark%3A123%2Fabc"])
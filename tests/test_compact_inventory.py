@@ -0,0 +1,101 @@
+"""Compact inventory tests."""
+import json
+import tracemalloc
+import unittest
+
+from ocfl.compact_inventory import DigestTable, PathTable
+from ocfl.inventory import Inventory, InventoryException
+
+SPEC_EX_FULL_INVENTORY = "extra_fixtures/1.0/good-storage-roots/simple-root/ark%3A%2F12345%2Fbcd987/inventory.json"
+
+
+class TestAll(unittest.TestCase):
+    """TestAll class to run tests."""
+
+    def test_digest_table(self):
+        """Test DigestTable class."""
+        dt = DigestTable(["ff00", "00ff", "a1b2", "00ff"])
+        self.assertEqual(len(dt), 3)
+        self.assertEqual([dt[n] for n in range(3)], ["00ff", "a1b2", "ff00"])
+        self.assertEqual(dt.index("a1b2"), 1)
+        dt.freeze()
+        self.assertEqual(dt.index("00ff"), 0)
+        self.assertEqual(dt.index("ff00"), 2)
+        self.assertRaises(KeyError, dt.index, "A1B2")
+        self.assertRaises(KeyError, dt.index, "a1b2c3")
+        self.assertRaises(KeyError, dt.index, "a1b3")
+        self.assertRaises(IndexError, dt.__getitem__, 3)
+        # Digests that are not all hex of the same length are stored as strings
+        dt = DigestTable(["abc...123", "00ff"])
+        dt.freeze()
+        self.assertEqual(dt.index("abc...123"), 1)
+        self.assertRaises(KeyError, dt.index, "abc")
+
+    def test_path_table(self):
+        """Test PathTable class."""
+        pt = PathTable()
+        a = pt.add("v1/content/a/b.txt")
+        b = pt.add("v2/content/a/b.txt")
+        self.assertEqual(pt.add("v1/content/a/b.txt"), a)
+        self.assertNotEqual(a, b)
+        pt.freeze()
+        self.assertEqual(pt.path(a), "v1/content/a/b.txt")
+        self.assertEqual(pt.path(b), "v2/content/a/b.txt")
+        self.assertEqual(pt.path(0), "")
+
+    def test_compact(self):
+        """Test Inventory.compact() gives the same view of the inventory."""
+        inv = Inventory(filepath=SPEC_EX_FULL_INVENTORY)
+        cinv = inv.compact()
+        self.assertEqual(json.loads(cinv.as_json()), inv.data)
+        self.assertEqual(cinv.id, inv.id)
+        self.assertEqual(cinv.head, "v3")
+        self.assertEqual(cinv.content, inv.content)
+        self.assertEqual(sorted(cinv.content_paths), sorted(inv.content_paths))
+        self.assertEqual(cinv.fixity["md5"], inv.fixity["md5"])
+        for digest in inv.manifest:
+            self.assertIn(digest, cinv.manifest)
+            self.assertEqual(cinv.content_path_for_digest(digest), inv.content_path_for_digest(digest))
+        self.assertNotIn("abcd", cinv.manifest)
+        self.assertEqual(cinv.content_paths_for_digest("abcd"), [])
+        for vdir in inv.version_directories:
+            version, cversion = inv.version(vdir), cinv.version(vdir)
+            self.assertEqual(cversion.created, version.created)
+            self.assertEqual(cversion.message, version.message)
+            self.assertEqual(cversion.user_name, version.user_name)
+            self.assertEqual(dict(cversion.state), version.state)
+            for logical_path in version.logical_paths:
+                self.assertEqual(cversion.content_path_for_logical_path(logical_path),
+                                 version.content_path_for_logical_path(logical_path))
+        self.assertEqual(cinv.diff_versions("v1", "v3"), inv.diff_versions("v1", "v3"))
+        # Read-only
+        with self.assertRaises(TypeError):
+            cinv.manifest["abcd"] = ["v4/content/a"]
+        with self.assertRaises(TypeError):
+            cinv.current_version.created = "2026-01-01T00:00:00Z"
+        # Bad inventory
+        inv.version("v1").state["abcd"] = ["not_in_manifest"]
+        self.assertRaises(InventoryException, inv.compact)
+
+    def test_compact_memory(self):
+        """Test that compact inventory uses much less memory."""
+        manifest = {}
+        state = {}
+        for n in range(2000):
+            digest = "%0128x" % (n * 7919)
+            manifest[digest] = ["v1/content/a_directory/file%05d.txt" % n]
+            state[digest] = ["a_directory/file%05d.txt" % n]
+        data = {"manifest": manifest, "versions": {}}
+        for vnum in range(1, 6):
+            data["versions"]["v%d" % vnum] = {"state": dict(state)}
+        inventory_json = json.dumps(data)
+        tracemalloc.start()
+        inv = Inventory(json.loads(inventory_json))
+        inv_size = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        tracemalloc.start()
+        cinv = inv.compact()
+        compact_size = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        self.assertEqual(len(cinv.version("v5").state), 2000)
+        self.assertLess(compact_size, inv_size / 3)
@@ -0,0 +1,91 @@
+"""ContentIndex tests."""
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+from ocfl.content_index import ContentIndex, ContentIndexException
+from ocfl.object import Object
+from ocfl.storage_root import StorageRoot
+from ocfl.version_metadata import VersionMetadata
+
+
+class TestAll(unittest.TestCase):
+    """TestAll class to run tests."""
+
+    def setUp(self):
+        """Set up temporary directory for index and storage root."""
+        self.tempdir = tempfile.mkdtemp(prefix="test_content_index")
+
+    def tearDown(self):
+        """Remove temporary directory."""
+        shutil.rmtree(self.tempdir)
+
+    def test_init(self):
+        """Test initialization."""
+        self.assertRaises(ContentIndexException, ContentIndex, os.path.join(self.tempdir, "no/such/dir/index.db"))
+        with ContentIndex(os.path.join(self.tempdir, "index.db")) as index:
+            self.assertEqual(index.find_digest("abc"), [])
+            self.assertEqual(index.stats()["objects"], 0)
+
+    def test_update_read_ahead(self):
+        """Test update reads a bounded number of objects ahead of writing."""
+        store = StorageRoot(root="extra_fixtures/1.0/good-storage-roots/simple-root")
+        store.open_root_fs()
+        object_paths = list(store.object_paths())
+        consumed = []
+
+        def _object_paths():
+            for dirpath in object_paths:
+                consumed.append(dirpath)
+                yield dirpath
+
+        written = []
+        with ContentIndex(os.path.join(self.tempdir, "index.db")) as index:
+            write_object = index._write_object  # pylint: disable=protected-access
+            with mock.patch.object(store, "object_paths", _object_paths), \
+                    mock.patch.object(index, "_write_object",
+                                      lambda *args: written.append(len(consumed)) or write_object(*args)):
+                self.assertEqual(index.update(store)["added"], 3)
+        self.assertEqual(written, [2, 3, 3])
+
+    def test_update_and_find(self):
+        """Test update, find_digest, find_logical_path and stats methods."""
+        root = os.path.join(self.tempdir, "root")
+        shutil.copytree("extra_fixtures/1.0/good-storage-roots/simple-root", root)
+        store = StorageRoot(root=root)
+        db_path = os.path.join(self.tempdir, "index.db")
+        with ContentIndex(db_path) as index:
+            self.assertEqual(index.update(store, workers=2),
+                             {"added": 3, "updated": 0, "unchanged": 0, "removed": 0, "error": 0})
+            found = index.find_logical_path("a_file.txt")
+            self.assertEqual([(r["id"], r["version"]) for r in found],
+                             [("ark:123/abc", "v1"), ("http://example.org/minimal_mixed_digests", "v1")])
+            self.assertEqual(found[0]["content_path"], "v1/content/a_file.txt")
+            self.assertEqual(len(index.find_digest(found[0]["digest"].upper())), 2)
+            stats = index.stats()
+            self.assertEqual(stats["objects"], 3)
+            self.assertEqual(stats["duplicate_bytes"], 20)
+        # Add a version to one object and remove another, only those change
+        objdir = os.path.join(root, "ark%3A123%2Fabc")
+        Object(path=objdir).add_version_with_content(objdir=objdir, srcdir="extra_fixtures/content/dupe-files",
+                                                     metadata=VersionMetadata())
+        shutil.rmtree(os.path.join(root, "ark%3A%2F12345%2Fbcd987"))
+        with ContentIndex(db_path) as index:
+            self.assertEqual(index.update(store),
+                             {"added": 0, "updated": 1, "unchanged": 1, "removed": 1, "error": 0})
+            found = index.find_logical_path("file1_dupe.txt")
+            self.assertEqual([(r["id"], r["version"], r["content_path"]) for r in found],
+                             [("ark:123/abc", "v2", "v2/content/file1.txt")])
+            self.assertEqual(index.stats()["objects"], 2)
+        # Object with an inventory that is not a JSON object is an error and
+        # its entries are left unchanged
+        with open(os.path.join(objdir, "inventory.json"), "w", encoding="utf-8") as fh:
+            fh.write("[1,2]")
+        with open(os.path.join(objdir, "inventory.json.sha512"), "w", encoding="utf-8") as fh:
+            fh.write("abc123 inventory.json\n")
+        with ContentIndex(db_path) as index:
+            self.assertEqual(index.update(store),
+                             {"added": 0, "updated": 0, "unchanged": 1, "removed": 0, "error": 1})
+            self.assertEqual(index.stats()["objects"], 2)
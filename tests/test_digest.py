@@ -5,7 +5,7 @@ import sys
 from fsspec.implementations.local import LocalFileSystem
 from fsspec.implementations.dirfs import DirFileSystem
 
-from ocfl.digest import file_digest, string_digest, digest_regex, normalized_digest
+from ocfl.digest import MultiDigester, file_digest, file_digests, file_multi_digest, file_multi_digests, bytes_digest, string_digest, digest_regex, normalized_digest
 
 
 class TestAll(unittest.TestCase):
@@ -49,6 +49,53 @@ class TestAll(unittest.TestCase):
         self.assertEqual(file_digest("files/hello_out_there.txt", "md5", fs=td_fs),
                          "9c7ec1389a61f1e15185bd976672bc63")
 
+    def test_file_digests(self):
+        """Test file_digests method, serial and parallel."""
+        td_fs = DirFileSystem("tests/testdata", LocalFileSystem())
+        files = ["files/hello_out_there.txt", "files/empty"]
+        expected = {"files/hello_out_there.txt": "9c7ec1389a61f1e15185bd976672bc63",
+                    "files/empty": "d41d8cd98f00b204e9800998ecf8427e"}
+        self.assertEqual(file_digests([], "md5", fs=td_fs), {})
+        self.assertEqual(file_digests(files, "md5", fs=td_fs), expected)
+        self.assertEqual(file_digests(files, "md5", fs=td_fs, workers=4), expected)
+        self.assertEqual(file_digests(files, "md5", fs=td_fs, workers=4,
+                                      sizes={"files/hello_out_there.txt": 35}), expected)
+        self.assertRaises(FileNotFoundError, file_digests, files + ["files/does_not_exist"],
+                          "md5", fs=td_fs, workers=4)
+
+    def test_file_multi_digest(self):
+        """Test file_multi_digest and file_multi_digests methods."""
+        td_fs = DirFileSystem("tests/testdata", LocalFileSystem())
+        self.assertEqual(file_multi_digest("files/hello_out_there.txt", ["md5", "sha1"], fs=td_fs),
+                         {"md5": "9c7ec1389a61f1e15185bd976672bc63",
+                          "sha1": file_digest("files/hello_out_there.txt", "sha1", fs=td_fs)})
+        self.assertRaises(ValueError, file_multi_digest, "files/empty", ["md5", "bad"], fs=td_fs)
+        digests = file_multi_digests(["files/hello_out_there.txt", "files/empty"], ["md5"], fs=td_fs, workers=2)
+        self.assertEqual(digests, {"files/hello_out_there.txt": {"md5": "9c7ec1389a61f1e15185bd976672bc63"},
+                                   "files/empty": {"md5": "d41d8cd98f00b204e9800998ecf8427e"}})
+        self.assertRaises(ValueError, file_multi_digests, ["files/empty"], ["bad"], fs=td_fs)
+
+    def test_multi_digester(self):
+        """Test MultiDigester class."""
+        digester = MultiDigester(["md5", "sha256-spec-ex"])
+        for chunk in (b"Sunny ", b"San ", b"Rafael\n"):
+            digester.update(chunk)
+        self.assertEqual(digester.digests(),
+                         {"md5": bytes_digest(b"Sunny San Rafael\n", "md5"),
+                          "sha256-spec-ex": bytes_digest(b"Sunny San Rafael\n", "sha256-spec-ex")})
+        self.assertRaises(ValueError, MultiDigester, ["md5", "bad"])
+
+    def test_bytes_digest(self):
+        """Test bytes_digest method."""
+        self.assertEqual(bytes_digest(b"", "md5"),
+                         "d41d8cd98f00b204e9800998ecf8427e")
+        self.assertEqual(bytes_digest(b"Sunny San Rafael\n", "sha1"),
+                         "14ca9011850fe349fb29e056a1fcfe018e035b44")
+        self.assertEqual(bytes_digest(b"", "blake2b-160"),
+                         "3345524abf6bbe1809449224b5972c41790b6cf2")
+        self.assertEqual(bytes_digest(b"", "sha256-spec-ex"), "e3b0c4...855")
+        self.assertRaises(ValueError, bytes_digest, b"", "bad-digest-type")
+
     def test_string_digest(self):
         """Test string_digest method."""
         self.assertEqual(string_digest(txt="Sunny San Rafael\n", digest_type="md5"),
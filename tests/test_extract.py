@@ -0,0 +1,42 @@
+"""Extract tests."""
+import os
+import tempfile
+import unittest
+
+from ocfl.extract import update_extracted
+from ocfl.object import Object, ObjectException
+
+
+class TestAll(unittest.TestCase):
+    """TestAll class to run tests."""
+
+    def test_update_extracted(self):
+        """Test update_extracted function."""
+        objdir = "extra_fixtures/1.0/good-storage-roots/simple-root/ark%3A%2F12345%2Fbcd987"
+        tempdir = tempfile.mkdtemp(prefix="test_update_extracted")
+        dstdir = os.path.join(tempdir, "out")
+        oo = Object()
+        oo.extract(objdir, "v1", dstdir)
+        self.assertEqual(set(os.listdir(dstdir)), set(["foo", "empty.txt", "image.tiff"]))
+        # v1 -> v2 changes bar.xml, removes image.tiff, adds empty2.txt
+        metadata = update_extracted(oo, objdir, dstdir, "v1", "v2", check_base=True)
+        self.assertEqual(metadata.version, "v2")
+        self.assertEqual(set(os.listdir(dstdir)), set(["foo", "empty.txt", "empty2.txt"]))
+        with open(os.path.join(dstdir, "foo/bar.xml"), "rb") as fh:
+            bar_v2 = fh.read()
+        with open(os.path.join(objdir, "v2/content/foo/bar.xml"), "rb") as fh:
+            self.assertEqual(bar_v2, fh.read())
+        # v2 -> head (v3)
+        update_extracted(oo, objdir, dstdir, "v2", check_base=True)
+        self.assertEqual(set(os.listdir(dstdir)), set(["foo", "empty2.txt", "image.tiff"]))
+        # and back to v1, removing empty2.txt
+        update_extracted(oo, objdir, dstdir, "head", "v1")
+        self.assertEqual(set(os.listdir(dstdir)), set(["foo", "empty.txt", "image.tiff"]))
+        # Base check fails if dstdir doesn't hold from_version
+        self.assertRaises(ObjectException, update_extracted, oo, objdir, dstdir, "v2", "v3", check_base=True)
+        os.remove(os.path.join(dstdir, "image.tiff"))
+        self.assertRaises(ObjectException, update_extracted, oo, objdir, dstdir, "v1", "v3", check_base=True)
+        # Bad versions and destination
+        self.assertRaises(ObjectException, update_extracted, oo, objdir, dstdir, "v9", "v3")
+        self.assertRaises(ObjectException, update_extracted, oo, objdir, dstdir, "v1", "v9")
+        self.assertRaises(ObjectException, update_extracted, oo, objdir, os.path.join(tempdir, "nope"), "v1", "v2")
@@ -1,9 +1,17 @@
 """Fsw tests."""
+import asyncio
+import datetime
 import unittest
 
+from fsspec.implementations.asyn_wrapper import AsyncFileSystemWrapper
+from fsspec.implementations.local import LocalFileSystem
+
 from ocfl.fsw import (FswException, _fsw_s3_urlparse, _fsw_relpath, fsw_openfs,
                       fsw_opendir_as_fs, fsw_walk, fsw_walk_files, fsw_listdir_names,
-                      fsw_files_identical, fsw_readtext, fsw_copydir)
+                      fsw_files_identical, fsw_readtext, fsw_copydir, fsw_copydirs,
+                      RateLimiter, ThrottledFileSystem, fsw_throttle,
+                      fsw_set_rate_limit, fsw_rate_limiter, fsw_walk_files_info,
+                      fsw_info_mtime, fsw_openfs_async, fsw_closefs_async)
 
 
 class TestAll(unittest.TestCase):
@@ -185,3 +193,121 @@ class TestAll(unittest.TestCase):
         # and check nothing else
         self.assertEqual(sorted(fsw_walk_files(dst_fs, "g")),
                          ['bb.txt', 'c/.c.txt', 'c/cc.txt'])
+
+    def test11_rate_limiter(self):
+        """Test RateLimiter class."""
+        now = [0.0]
+        sleeps = []
+
+        def sleep(seconds):
+            sleeps.append(seconds)
+            now[0] += seconds
+
+        rl = RateLimiter(bytes_per_sec=100, ops_per_sec=10, burst=1.0,
+                         clock=lambda: now[0], sleep=sleep)
+        # Burst of 1s worth without delay
+        rl.acquire(nbytes=100)
+        rl.acquire(ops=10)
+        self.assertEqual(sleeps, [])
+        # Then delays to keep to the rate
+        rl.acquire(nbytes=50)
+        self.assertAlmostEqual(sleeps[-1], 0.5)
+        # ...allowing for time that has passed in the previous delay
+        rl.acquire(ops=10)
+        self.assertAlmostEqual(sleeps[-1], 0.5)
+        self.assertEqual(rl.total_bytes, 150)
+        self.assertEqual(rl.total_ops, 20)
+        self.assertAlmostEqual(rl.total_delay, 1.0)
+        # No limits, no delay
+        rl = RateLimiter(clock=lambda: now[0], sleep=sleep)
+        n = len(sleeps)
+        rl.acquire(nbytes=10 ** 9, ops=10 ** 6)
+        self.assertEqual(len(sleeps), n)
+
+    def test12_throttled_file_system(self):
+        """Test ThrottledFileSystem, fsw_throttle and fsw_set_rate_limit."""
+        rl = RateLimiter()
+        fs = fsw_openfs("temp://")
+        fs.mkdirs("v1/content")
+        fs.write_text("inventory.json", "{}", encoding="utf-8")
+        fs.write_text("v1/content/a_file.txt", "Only file", encoding="utf-8")
+        self.assertIs(fsw_throttle(fs, None), fs)
+        tfs = fsw_throttle(fs, rl)
+        self.assertIsInstance(tfs, ThrottledFileSystem)
+        self.assertIn("inventory.json", fsw_listdir_names(tfs, ""))
+        self.assertEqual(rl.total_ops, 1)
+        with tfs.open("v1/content/a_file.txt", "rb") as fh:
+            self.assertEqual(fh.read(), b"Only file")
+        self.assertEqual(rl.total_ops, 2)
+        self.assertEqual(rl.total_bytes, 9)
+        self.assertEqual(fsw_readtext("v1/content/a_file.txt", fs=tfs), "Only file")
+        self.assertEqual(rl.total_bytes, 18)
+        # Global limit applies to newly opened filesystems
+        try:
+            self.assertIsNone(fsw_rate_limiter())
+            fsw_set_rate_limit(bytes_per_sec=1e9)
+            self.assertEqual(fsw_rate_limiter().bytes_per_sec, 1e9)
+            tfs = fsw_openfs("temp://")
+            self.assertIsInstance(tfs, ThrottledFileSystem)
+            with tfs.open("a_file.txt", "wb") as fh:
+                fh.write(b"Only file")
+            with tfs.open("a_file.txt", "rb") as fh:
+                self.assertEqual(fh.read(), b"Only file")
+            self.assertEqual(fsw_rate_limiter().total_bytes, 18)
+            fsw_set_rate_limit()
+            self.assertIsNone(fsw_rate_limiter())
+        finally:
+            fsw_set_rate_limit()
+
+    def test13_fsw_walk_files_info(self):
+        """Test fsw_walk_files_info and fsw_info_mtime."""
+        fs = fsw_openfs("extra_fixtures/content")
+        files = fsw_walk_files_info(fs, "dupe-files")
+        self.assertEqual(sorted(files.keys()), ["file1.txt", "file1_dupe.txt"])
+        self.assertEqual(files["file1.txt"]["size"], 10)
+        self.assertIsInstance(fsw_info_mtime(files["file1.txt"]), float)
+        self.assertEqual(fsw_info_mtime({"mtime": 12}), 12.0)
+        dt = datetime.datetime(2001, 9, 9, 1, 46, 40, tzinfo=datetime.timezone.utc)
+        self.assertEqual(fsw_info_mtime({"LastModified": dt}), 1000000000.0)
+        self.assertIsNone(fsw_info_mtime({"size": 1}))
+
+    def test14_fsw_copydirs(self):
+        """Test fsw_copydirs."""
+        src_fs = fsw_openfs("extra_fixtures/content")
+        dst_fs = fsw_openfs("temp://")
+        dst_fs.mkdirs("exists")
+        copies = [(src_fs, "dupe-files", dst_fs, "a"),
+                  (src_fs, "dedupe_content", dst_fs, "b/c"),
+                  (src_fs, "does_not_exist", dst_fs, "d"),
+                  (src_fs, "dupe-files", dst_fs, "exists")]
+        results = dict(fsw_copydirs(copies, workers=2))
+        self.assertEqual(sorted(results.keys()), [0, 1, 2, 3])
+        self.assertIsNone(results[0])
+        self.assertIsNone(results[1])
+        self.assertIsInstance(results[2], FswException)
+        self.assertIsInstance(results[3], FswException)
+        self.assertEqual(sorted(fsw_walk_files(dst_fs, "a")), ["file1.txt", "file1_dupe.txt"])
+        self.assertIn("v2/empty4.txt", list(fsw_walk_files(dst_fs, "b/c")))
+        self.assertEqual(list(fsw_copydirs([])), [])
+
+    def test15_fsw_openfs_async(self):
+        """Test fsw_openfs_async and fsw_closefs_async."""
+        async def _open(fs_url):
+            fs = await fsw_openfs_async(fs_url)
+            names = sorted(fs.listdir("", detail=False))
+            await fsw_closefs_async(fs)
+            return fs, names
+
+        # Local filesystem is opened as with fsw_openfs, not in asynchronous mode
+        fs, names = asyncio.run(_open("tests/testdata/files"))
+        self.assertFalse(getattr(fs, "asynchronous", False))
+        self.assertEqual(names, ["empty", "hello_out_there.txt"])
+        self.assertRaises(FileNotFoundError, asyncio.run, _open("tests/testdata/does-not-exist"))
+
+        # Subdirectory of a filesystem in asynchronous mode stays asynchronous
+        async def _subdir():
+            fs = AsyncFileSystemWrapper(LocalFileSystem(), asynchronous=True)
+            subfs = fsw_opendir_as_fs(fs, "tests/testdata")
+            return subfs.asynchronous, await subfs._exists("files/empty")  # pylint: disable=protected-access
+
+        self.assertEqual(asyncio.run(_subdir()), (True, True))
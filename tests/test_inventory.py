@@ -279,6 +279,19 @@ class TestVersion(unittest.TestCase):
         self.assertEqual(inv.find_logical_path("file1_added_v1_moved"), ("v2", "v1/content/file1"))
         self.assertEqual(inv.find_logical_path("file3_added_v2"), ("v2", "v2/content/file3"))
 
+    def test_diff_versions(self):
+        """Test diff_versions method."""
+        inv = Inventory()
+        inv.add_version(state={"d1": ["a", "b"]})  # v1
+        inv.add_version(state={"d1": ["a"], "d2": ["c"]})  # v2
+        inv.add_version(state={"d2": ["a", "c"]})  # v3
+        self.assertEqual(inv.diff_versions("v1", "v1"), [])
+        self.assertEqual(inv.diff_versions(None, "v1"), [("A", "d1", "a"), ("A", "d1", "b")])
+        self.assertEqual(inv.diff_versions("v1", "v2"), [("A", "d2", "c"), ("D", "d1", "b")])
+        self.assertEqual(inv.diff_versions("v1", "v3"),
+                         [("A", "d2", "a"), ("A", "d2", "c"), ("D", "d1", "a"), ("D", "d1", "b")])
+        self.assertEqual(inv.diff_versions("v3", "v2"), [("A", "d1", "a"), ("D", "d2", "a")])
+
     def test_delete_logical_path(self):
         """Test delete_logical_path method."""
         inv = Inventory()
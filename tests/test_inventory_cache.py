@@ -0,0 +1,107 @@
+"""InventoryCache tests."""
+import os
+import shutil
+import tempfile
+import unittest
+
+from ocfl.inventory import Inventory
+from ocfl.inventory_cache import InventoryCache, inventory_cache, estimate_inventory_size, \
+    read_sidecar_key
+from ocfl.fsw import fsw_openfs
+from ocfl.object import Object
+from ocfl.storage_root import StorageRoot
+from ocfl.validator import Validator
+
+SIMPLE_ROOT = "extra_fixtures/1.0/good-storage-roots/simple-root"
+SPEC_EX_FULL = SIMPLE_ROOT + "/ark%3A%2F12345%2Fbcd987"
+
+
+class TestAll(unittest.TestCase):
+    """TestAll class to run tests."""
+
+    def setUp(self):
+        """Start each test with an empty process-wide cache."""
+        inventory_cache().clear()
+
+    def _inventory(self, num_files):
+        """Inventory with num_files in one version."""
+        state = {("%032x" % n): ["file%d.txt" % n] for n in range(num_files)}
+        manifest = {d: ["v1/content/" + p[0]] for d, p in state.items()}
+        return Inventory({"manifest": manifest, "versions": {"v1": {"state": state}}})
+
+    def test_lru_eviction(self):
+        """Test size-aware LRU eviction."""
+        size = estimate_inventory_size(self._inventory(10))
+        # 10 digests of 32 chars in manifest and state, paths of 20 and 9 chars
+        self.assertEqual(size, 10 * (4 * 56 + 2 * 32 + 20 + 9))
+        cache = InventoryCache(max_bytes=2 * size)
+        cache.put(("md5", "a"), self._inventory(10))
+        cache.put(("md5", "b"), self._inventory(10))
+        self.assertEqual(len(cache), 2)
+        self.assertEqual(cache.total_bytes, 2 * size)
+        # Access a so that b is least recently used
+        self.assertIsNotNone(cache.get(("md5", "a")))
+        cache.put(("md5", "c"), self._inventory(10))
+        self.assertIsNone(cache.get(("md5", "b")))
+        self.assertIsNotNone(cache.get(("md5", "a")))
+        self.assertIsNotNone(cache.get(("md5", "c")))
+        self.assertEqual((cache.hits, cache.misses), (3, 1))
+        # Too big to be cached at all
+        entry = cache.put(("md5", "d"), self._inventory(100))
+        self.assertEqual(len(entry.inventory.manifest), 100)
+        self.assertIsNone(cache.get(("md5", "d")))
+        self.assertEqual(len(cache), 2)
+        # Replace entry with same key
+        cache.put(("md5", "a"), self._inventory(5))
+        self.assertEqual(len(cache), 2)
+        self.assertLess(cache.total_bytes, 2 * size)
+        cache.resize(size)
+        self.assertEqual(len(cache), 1)
+        self.assertIsNone(cache.get(("md5", "c")))
+        self.assertIsNone(cache.get(None))
+        cache.clear()
+        self.assertEqual((len(cache), cache.total_bytes, cache.hits), (0, 0, 0))
+
+    def test_read_sidecar_key(self):
+        """Test read_sidecar_key function."""
+        obj_fs = fsw_openfs(SPEC_EX_FULL)
+        key = read_sidecar_key(obj_fs)
+        self.assertEqual(key[0], "sha512")
+        self.assertRegex(key[1], r"""^[0-9a-f]{128}$""")
+        self.assertEqual(read_sidecar_key(obj_fs, ["md5", "sha512"]), key)
+        tempdir = tempfile.mkdtemp(prefix="test_read_sidecar_key")
+        try:
+            self.assertIsNone(read_sidecar_key(fsw_openfs(tempdir)))
+            with open(os.path.join(tempdir, "inventory.json.sha256"), "w", encoding="utf-8") as fh:
+                fh.write("not a sidecar")
+            self.assertIsNone(read_sidecar_key(fsw_openfs(tempdir), ["sha256"]))
+        finally:
+            shutil.rmtree(tempdir)
+
+    def test_shared_cache(self):
+        """Test sharing of cached inventories across Validator, Object and StorageRoot."""
+        cache = inventory_cache()
+        self.assertTrue(Validator(check_digests=True).validate_object(SPEC_EX_FULL))
+        self.assertEqual(len(cache), 0)
+        self.assertTrue(Validator(check_digests=True, cache_inventory=True).validate_object(SPEC_EX_FULL))
+        self.assertEqual(len(cache), 1)
+        # Object reads of the same inventory hit the cache
+        inv = Object(path=SPEC_EX_FULL).parse_inventory(use_cache=True)
+        self.assertEqual(cache.hits, 1)
+        self.assertEqual(inv.head, "v3")
+        self.assertIs(Object(path=SPEC_EX_FULL).parse_inventory(use_cache=True), inv)
+        # Listing a storage root populates then uses the cache
+        root = StorageRoot(root=SIMPLE_ROOT)
+        self.assertEqual(len(list(root.list_objects())), 3)
+        self.assertEqual(len(cache), 3)
+        hits = cache.hits
+        self.assertEqual(len(list(root.list_objects())), 3)
+        self.assertEqual(cache.hits, hits + 3)
+        # Validation without digest checks doesn't add to the cache
+        cache.clear()
+        self.assertTrue(Validator(check_digests=False, cache_inventory=True).validate_object(SPEC_EX_FULL))
+        self.assertEqual(len(cache), 0)
+        # Nor does validation of a storage root
+        root = StorageRoot(root=SIMPLE_ROOT)
+        root.validate()
+        self.assertEqual(len(cache), 0)
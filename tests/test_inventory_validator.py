@@ -24,6 +24,11 @@ class TLogger():
         """Number of errors."""
         return len(self.errors)
 
+    @property
+    def num_warnings(self):
+        """Number of warnings."""
+        return len(self.warns)
+
     def clear(self):
         """Clear records."""
         self.errors = []
@@ -197,14 +202,14 @@ class TestAll(unittest.TestCase):
         """Test _validate_versions method."""
         log = TLogger()
         iv = InventoryValidator(log=log, default_spec_version="1.0")
-        self.assertEqual(iv._validate_versions({}, [], set()), [])
+        self.assertEqual(iv._validate_versions({}, [], set()), set())
         self.assertEqual(len(log.errors), 0)
         log.clear()
-        self.assertEqual(iv._validate_versions({}, [], set()), [])
+        self.assertEqual(iv._validate_versions({}, [], set()), set())
         self.assertEqual(len(log.errors), 0)
         log.clear()
         # First, no useful data
-        self.assertEqual(iv._validate_versions({"v1": {}}, ["v1"], set()), [])
+        self.assertEqual(iv._validate_versions({"v1": {}}, ["v1"], set()), set())
         self.assertIn("E048", log.errors)
         self.assertIn("E048c", log.errors)
         self.assertIn("W007a", log.warns)
@@ -215,42 +220,42 @@ class TestAll(unittest.TestCase):
                            "message": "A useful message",
                            "state": {},
                            "user": {"name": "A Person", "address": "info:uri1"}}}
-        self.assertEqual(iv._validate_versions(versions, ["v1"], set()), [])
+        self.assertEqual(iv._validate_versions(versions, ["v1"], set()), set())
         self.assertEqual(log.errors, [])
         log.clear()
         versions["v1"]["created"] = {}  # not a string
-        self.assertEqual(iv._validate_versions(versions, ["v1"], set()), [])
+        self.assertEqual(iv._validate_versions(versions, ["v1"], set()), set())
         self.assertIn("E049d", log.errors)
         log.clear()
         versions["v1"]["created"] = "not a datetime"
-        self.assertEqual(iv._validate_versions(versions, ["v1"], set()), [])
+        self.assertEqual(iv._validate_versions(versions, ["v1"], set()), set())
         self.assertIn("E049c", log.errors)
         log.clear()
         versions["v1"]["created"] = "2010-03-30T21:24:00"  # no timezone
-        self.assertEqual(iv._validate_versions(versions, ["v1"], set()), [])
+        self.assertEqual(iv._validate_versions(versions, ["v1"], set()), set())
         self.assertIn("E049a", log.errors)
         log.clear()
         versions["v1"]["created"] = "2010-03-30T21:24Z"  # no seconds
-        self.assertEqual(iv._validate_versions(versions, ["v1"], set()), [])
+        self.assertEqual(iv._validate_versions(versions, ["v1"], set()), set())
         self.assertIn("E049b", log.errors)
         log.clear()
         versions["v1"]["created"] = "2010-03-30T21:24:00Z"
         versions["v1"]["message"] = {}  # not a string
-        self.assertEqual(iv._validate_versions(versions, ["v1"], set()), [])
+        self.assertEqual(iv._validate_versions(versions, ["v1"], set()), set())
         self.assertIn("E094", log.errors)
         log.clear()
         versions["v1"]["message"] = "A message"
         versions["v1"]["user"] = "A string"  # not a dict
-        self.assertEqual(iv._validate_versions(versions, ["v1"], set()), [])
+        self.assertEqual(iv._validate_versions(versions, ["v1"], set()), set())
         self.assertIn("E054a", log.errors)
         log.clear()
         versions["v1"]["user"] = {"name": {}, "address": {}}  # not strings
-        self.assertEqual(iv._validate_versions(versions, ["v1"], set()), [])
+        self.assertEqual(iv._validate_versions(versions, ["v1"], set()), set())
         self.assertIn("E054b", log.errors)
         self.assertIn("E054c", log.errors)
         log.clear()
         versions["v1"]["user"] = {"name": "A Person"}  # no address
-        self.assertEqual(iv._validate_versions(versions, ["v1"], set()), [])
+        self.assertEqual(iv._validate_versions(versions, ["v1"], set()), set())
         self.assertIn("W008", log.warns)
 
     def test__validate_state_block(self):
@@ -258,29 +263,50 @@ class TestAll(unittest.TestCase):
         log = TLogger()
         iv = InventoryValidator(log=log)
         iv.digest_algorithm = "sha512"
-        self.assertEqual(iv._validate_state_block({}, "v1", set()), [])
+        self.assertEqual(iv._validate_state_block({}, "v1", set()), set())
         self.assertEqual(len(log.errors), 0)
         log.clear()
-        self.assertEqual(iv._validate_state_block("invalid", "v1", set()), [])
+        self.assertEqual(iv._validate_state_block("invalid", "v1", set()), set())
         self.assertIn("E050c", log.errors)
         log.clear()
-        self.assertEqual(iv._validate_state_block({"not a digest": []}, "v1", set()), [])
+        self.assertEqual(iv._validate_state_block({"not a digest": []}, "v1", set()), set())
         self.assertIn("E050d", log.errors)
         log.clear()
         d = "4a89417821564b1e1956130569c390dd6122b51296ec620cadd0555ff5aae21c2a17383a194290fc95c73c63261bd8cb77ac275c85e6300cd711fa132fe8706e"
-        self.assertEqual(iv._validate_state_block({d: "not a list"}, "v1", set()), [])
+        self.assertEqual(iv._validate_state_block({d: "not a list"}, "v1", set()), set())
         self.assertIn("E050e", log.errors)
         log.clear()
-        self.assertEqual(iv._validate_state_block({d: ["good path", "a/./b"]}, "v1", set()), [d])
+        self.assertEqual(iv._validate_state_block({d: ["good path", "a/./b"]}, "v1", set()), {d})
         self.assertIn("E052", log.errors)
         log.clear()
-        self.assertEqual(iv._validate_state_block({d: ["good path", "/"]}, "v1", set()), [d])
+        self.assertEqual(iv._validate_state_block({d: ["good path", "/"]}, "v1", set()), {d})
         self.assertIn("E053", log.errors)
         log.clear()
         # Finally a good case
         d2 = "ae16b7632ee42fafd6b510e94a4951b2346ad90a1eff4baae2d7c0d5481515de61dcbc9a8d01f4824ab5215f033858189331859fb5b75fea5809230c63bad34a"
-        self.assertEqual(iv._validate_state_block({d2: ["path2", "good/path3"]}, "v1", set([d, d2])), [d2])
+        self.assertEqual(iv._validate_state_block({d2: ["path2", "good/path3"]}, "v1", set([d, d2])), {d2})
+        self.assertEqual(log.errors, [])
+        # Paths that look unusual but are good, and bad paths that could be
+        # missed by the fast path for common cases
+        good = [".hidden", "a/.b/c", "a/..b", "...", "a/b."]
+        self.assertEqual(iv._validate_state_block({d2: good}, "v1", set([d2])), {d2})
         self.assertEqual(log.errors, [])
+        for path, code in (("", "E052"), (".", "E052"), ("a//b", "E052"), ("a/./b", "E052"),
+                           ("a/..", "E052"), ("/a", "E053"), ("a/", "E053")):
+            log.clear()
+            iv._validate_state_block({d2: [path]}, "v1", set([d2]))
+            self.assertEqual(log.errors, [code], "for path " + repr(path))
+        # Missing manifest, no set of digests
+        log.clear()
+        self.assertEqual(iv._validate_state_block({"not a digest": [], d2: ["a"]}, "v1", None), {d2})
+        self.assertEqual(sorted(log.errors), ["E050d", "E050f"])
+        # Missing manifest in a whole inventory
+        log.clear()
+        iv.validate({"id": "like:uri", "type": "https://ocfl.io/1.1/spec/#inventory", "digestAlgorithm": "sha512",
+                     "head": "v1", "versions": {"v1": {"created": "2020-01-01T00:00:00Z",
+                                                       "state": {"not a digest": ["b"], d2: ["a"]}}}})
+        self.assertIn("E041a", log.errors)
+        self.assertIn("E050d", log.errors)
 
     def test__check_digests_present_and_used(self):
         """Test _check_digests_present_and_used."""
@@ -346,6 +372,56 @@ class TestAll(unittest.TestCase):
         iv.validate_as_prior_version(prior)
         self.assertEqual(log.errors, ["E066c"])
 
+    def test_reference(self):
+        """Test use of reference to avoid revalidating and comparing identical version blocks."""
+        user = {"name": "A", "address": "mailto:a@example.org"}
+        root_inv = {"id": "info:a", "type": "https://ocfl.io/1.1/spec/#inventory",
+                    "digestAlgorithm": "sha512", "head": "v2",
+                    "manifest": {"a" * 128: ["v1/content/f1"], "b" * 128: ["v2/content/f2"]},
+                    "versions": {"v1": {"created": "2026-01-01T00:00:00Z", "message": "m1", "user": user,
+                                        "state": {"a" * 128: ["f1"]}},
+                                 "v2": {"created": "2026-01-02T00:00:00Z", "message": "m2", "user": user,
+                                        "state": {"a" * 128: ["f1"], "b" * 128: ["f2"]}}}}
+        prior_inv = json.loads(json.dumps(root_inv))
+        prior_inv["head"] = "v1"
+        del prior_inv["manifest"]["b" * 128]
+        del prior_inv["versions"]["v2"]
+        log = TLogger()
+        iv = InventoryValidator(log=log)
+        self.assertTrue(iv.validate(root_inv))
+        self.assertEqual(iv.clean_versions, set(["v1", "v2"]))
+        prior = InventoryValidator(log=log, reference=iv)
+        self.assertTrue(prior.validate(prior_inv))
+        self.assertEqual(prior.reference_versions, set(["v1"]))
+        self.assertTrue(iv.validate_as_prior_version(prior))
+        self.assertEqual((log.errors, log.warns), ([], []))
+        # Different metadata is validated and compared
+        prior_inv["versions"]["v1"]["message"] = "different"
+        prior = InventoryValidator(log=log, reference=iv)
+        self.assertTrue(prior.validate(prior_inv))
+        self.assertEqual(prior.reference_versions, set())
+        self.assertTrue(iv.validate_as_prior_version(prior))
+        self.assertEqual(log.warns, ["W011"])
+        log.clear()
+        # Same version block but different content path is also compared
+        prior_inv["versions"]["v1"]["message"] = "m1"
+        prior_inv["manifest"]["a" * 128] = ["v1/content/f1-moved"]
+        prior = InventoryValidator(log=log, reference=iv)
+        self.assertTrue(prior.validate(prior_inv))
+        self.assertEqual(prior.reference_versions, set())
+        self.assertFalse(iv.validate_as_prior_version(prior))
+        self.assertEqual(log.errors, ["E066c"])
+        log.clear()
+        # Errors in an identical block are still reported
+        root_inv["versions"]["v1"]["created"] = "bad-date"
+        prior_inv = json.loads(json.dumps(root_inv))
+        iv = InventoryValidator(log=log)
+        self.assertFalse(iv.validate(root_inv))
+        self.assertEqual(iv.clean_versions, set(["v2"]))
+        prior = InventoryValidator(log=log, reference=iv)
+        self.assertFalse(prior.validate(prior_inv))
+        self.assertEqual(log.errors, ["E049c", "E049c"])
+
     def test__compare_states_for_version(self):
         """Test _compare_states_for_version method."""
         log = TLogger()
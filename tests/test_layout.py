@@ -2,6 +2,7 @@
 import unittest
 import unittest.mock
 from ocfl.layout import Layout, LayoutException
+from ocfl.layout_nnnn_tuple_tree import Layout_NNNN_Tuple_Tree
 from ocfl.fsw import fsw_openfs
 
 
@@ -44,6 +45,22 @@ class TestAll(unittest.TestCase):
         self.assertEqual(layout.decode("http%3a%2f%2Fa.b.c"), "http://a.b.c")
         self.assertRaises(LayoutException, layout.identifier_to_path, "id")
 
+    def test_identifiers_to_paths(self):
+        """Test identifiers_to_paths method."""
+        layout = Layout_NNNN_Tuple_Tree(tuple_size=2)
+        self.assertEqual(list(layout.identifiers_to_paths([])), [])
+        self.assertEqual(list(layout.identifiers_to_paths(["abcd", "ab", "abcd"])),
+                         ["ab/cd/abcd", "ab/ab", "ab/cd/abcd"])
+        with unittest.mock.patch.object(layout, "identifier_to_path", return_value="memo-missed") as to_path:
+            self.assertEqual(list(layout.identifiers_to_paths(["abcd"])), ["ab/cd/abcd"])
+            to_path.assert_not_called()
+        # Change of configuration discards memo
+        layout.check_tuple_size(3)
+        self.assertEqual(list(layout.identifiers_to_paths(["abcd"])), ["abc/d/abcd"])
+        # Errors
+        self.assertRaises(LayoutException, list, layout.identifiers_to_paths(["a", ""]))
+        self.assertRaises(LayoutException, list, Layout().identifiers_to_paths(["id"]))
+
     def test_read_layout_params(self):
         """Test read_layout_params."""
         root_fs = fsw_openfs("extra_fixtures/extension_configs")
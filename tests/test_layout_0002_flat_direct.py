@@ -22,3 +22,11 @@ class TestAll(unittest.TestCase):
         # Exception cases
         for bad_id in ("", ".", os.path.join("a", "b")):
             self.assertRaises(Exception, d.identifier_to_path, bad_id)
+
+    def test_path_to_identifier(self):
+        """Test path_to_identifier."""
+        d = Layout_0002_Flat_Direct()
+        self.assertEqual(d.path_to_identifier("this n that"), "this n that")
+        self.assertEqual(d.path_to_identifier("..hor_rib:lé-$id"), "..hor_rib:lé-$id")
+        for bad_path in ("", ".", os.path.join("a", "b")):
+            self.assertEqual(d.path_to_identifier(bad_path), None)
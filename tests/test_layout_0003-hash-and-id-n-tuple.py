@@ -1,7 +1,7 @@
 """Layout_0003_Hash_And_Id_N_Tuple: Hashed Truncated N-tuple Trees with Object ID layout tests."""
 import unittest
 from ocfl.layout import LayoutException
-from ocfl.layout_0003_hash_and_id_n_tuple import Layout_0003_Hash_And_Id_N_Tuple, _percent_encode, _id_to_path
+from ocfl.layout_0003_hash_and_id_n_tuple import Layout_0003_Hash_And_Id_N_Tuple, _percent_encode, _get_encapsulation_directory, _id_to_path
 
 
 class TestAll(unittest.TestCase):
@@ -12,6 +12,12 @@ class TestAll(unittest.TestCase):
         self.assertEqual(_percent_encode("."), "%2e")
         self.assertEqual(_percent_encode("ç"), "%c3%a7")
 
+    def test__get_encapsulation_directory(self):
+        """Test _get_encapsulation_directory function."""
+        self.assertEqual(_get_encapsulation_directory("Az09-_", digest="abc"), "Az09-_")
+        self.assertEqual(_get_encapsulation_directory("a b\x00ç😀", digest="abc"), "a%20b%00%c3%a7%f0%9f%98%80")
+        self.assertEqual(_get_encapsulation_directory("." * 40, digest="abc"), "%2e" * 33 + "%-abc")
+
     def test__id_to_path(self):
         """Test _id_to_path function."""
         self.assertEqual(_id_to_path(identifier="object-01", digest_algorithm="sha256", tuple_size=3, number_of_tuples=3),
@@ -113,3 +119,15 @@ class TestAll(unittest.TestCase):
         # From the extension
         self.assertEqual(d.identifier_to_path("object-01"), "3c0/ff4/240/object-01")
         self.assertEqual(d.identifier_to_path("..hor/rib:le-$id"), "487/326/d8c/%2e%2ehor%2frib%3ale-%24id")
+
+    def test_path_to_identifier(self):
+        """Test path_to_identifier."""
+        d = Layout_0003_Hash_And_Id_N_Tuple()
+        self.assertEqual(d.path_to_identifier("3c0/ff4/240/object-01"), "object-01")
+        self.assertEqual(d.path_to_identifier("487/326/d8c/%2e%2ehor%2frib%3ale-%24id"), "..hor/rib:le-$id")
+        self.assertEqual(d.path_to_identifier("373/529/21a/%2e%2eHor%2frib%3al%c3%a8-%24id"), "..Hor/rib:lè-$id")
+        # Wrong hash path, bad UTF-8, truncated
+        self.assertEqual(d.path_to_identifier("3c0/ff4/241/object-01"), None)
+        self.assertEqual(d.path_to_identifier("3c0/ff4/240/%ff"), None)
+        long_object_id = "abcdefghij" * 26
+        self.assertEqual(d.path_to_identifier(d.identifier_to_path(long_object_id)), None)
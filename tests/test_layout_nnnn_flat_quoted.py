@@ -13,3 +13,12 @@ class TestAll(unittest.TestCase):
         self.assertRaises(LayoutException, layout.identifier_to_path, "")
         self.assertEqual(layout.identifier_to_path("abc"), "abc")
         self.assertEqual(layout.identifier_to_path("this n that"), "this+n+that")
+
+    def test_path_to_identifier(self):
+        """Test path_to_identifier."""
+        layout = Layout_NNNN_Flat_Quoted()
+        self.assertEqual(layout.path_to_identifier("abc"), "abc")
+        self.assertEqual(layout.path_to_identifier("this+n+that"), "this n that")
+        self.assertEqual(layout.path_to_identifier("ark%3A123%2Fabc"), "ark:123/abc")
+        self.assertEqual(layout.path_to_identifier("this%20n%20that"), None)  # not as quoted by layout
+        self.assertEqual(layout.path_to_identifier(""), None)
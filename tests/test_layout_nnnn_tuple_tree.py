@@ -48,3 +48,11 @@ class TestAll(unittest.TestCase):
         self.assertEqual(layout.identifier_to_path("abcdefg"), "abc/def/g/abcdefg")
         self.assertEqual(layout.identifier_to_path("abcdefgh"), "abc/def/gh/abcdefgh")
         self.assertEqual(layout.identifier_to_path("abcdefghi"), "abc/def/ghi/abcdefghi")
+
+    def test_path_to_identifier(self):
+        """Test identifier from path."""
+        layout = Layout_NNNN_Tuple_Tree(tuple_size=2)
+        self.assertEqual(layout.path_to_identifier("ab/cd/e/abcde"), "abcde")
+        self.assertEqual(layout.path_to_identifier(layout.identifier_to_path("info:a/b c")), "info:a/b c")
+        self.assertEqual(layout.path_to_identifier("ab/abcde"), None)
+        self.assertEqual(layout.path_to_identifier(""), None)
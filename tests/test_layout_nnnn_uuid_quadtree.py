@@ -45,3 +45,12 @@ class TestAll(unittest.TestCase):
         self.assertRaises(Exception, uuqt.identifier_to_path, "6ba7b810-9dad-11d1-80b4-00c04fd430c8")
         self.assertRaises(Exception, uuqt.identifier_to_path, "uuid:6ba7b810-9dad-11d1-80b4-00c04fd430c8")
         self.assertRaises(Exception, uuqt.identifier_to_path, "urn:uuid:6ba7b810-9dad-11d1-80b4-00c04fd430cX")
+
+    def test04_path_to_identifier(self):
+        """Test identifier from path."""
+        uuqt = Layout_NNNN_UUID_Quadtree()
+        self.assertEqual(uuqt.path_to_identifier("6ba7/b810/9dad/11d1/80b4/00c0/4fd4/30c8"),
+                         "urn:uuid:6ba7b810-9dad-11d1-80b4-00c04fd430c8")
+        self.assertEqual(uuqt.path_to_identifier("6ba7/b810/9dad/11d1/80b4/00c0/4fd4"), None)
+        self.assertEqual(uuqt.path_to_identifier("6ba7/b810/9dad/11d1/80b4/00c0/4fd4/30cX"), None)
+        self.assertEqual(uuqt.path_to_identifier("6ba7b/810/9dad/11d1/80b4/00c0/4fd4/30c8"), None)
@@ -1,7 +1,7 @@
 """Layout registry tests."""
 import unittest
 from ocfl.layout import Layout
-from ocfl.layout_registry import add_layout, get_layout, layout_is_supported
+from ocfl.layout_registry import add_layout, get_layout, layout_is_supported, layout_names
 
 
 class TestAll(unittest.TestCase):
@@ -17,6 +17,9 @@ class TestAll(unittest.TestCase):
         # Unknown
         self.assertFalse(layout_is_supported("unknown"))
         self.assertRaises(Exception, get_layout, "unknown")
+        self.assertIn("0003-hash-and-id-n-tuple-storage-layout", layout_names())
+        self.assertIn("flat-direct", layout_names())
+        self.assertNotIn("unknown", layout_names())
 
     def test_add_layout(self):
         """Test addition of new Layout class."""
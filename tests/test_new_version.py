@@ -179,6 +179,68 @@ class TestNewVersion(unittest.TestCase):
         nv.rename("lp1", "lp3")
         self.assertEqual(set(nv.inventory.current_version.logical_paths), set(["lp2", "lp3"]))
 
+    def test_rename_added_in_version(self):
+        """Test rename of a logical path added in this version keeps its content."""
+        nv = NewVersion.first_version(identifier="obj_id", srcdir="extra_fixtures/content/dupe-files")
+        nv.add("file1.txt", "lp0")
+        nv.rename("lp0", "lp1")
+        self.assertEqual(nv.inventory.current_version.logical_paths, ["lp1"])
+        self.assertEqual(nv.inventory.content_paths, ["v1/content/file1.txt"])
+        self.assertEqual(nv.files_to_copy, {"file1.txt": "v1/content/file1.txt"})
+
+    def test_apply_changes(self):
+        """Test apply_changes method."""
+        inv = Inventory()
+        inv.spec_version = "1.1"
+        inv.id = "test"
+        inv.digest_algorithm = "sha512"
+        inv.init_manifest_and_versions()
+        inv.add_version("v1", state={"digestA": ["a.txt", "b.txt"], "digestC": ["c.txt"]})
+        inv.manifest = {"digestA": ["v1/content/a.txt"], "digestC": ["v1/content/c.txt"]}
+        nv = NewVersion.next_version(inventory=inv, srcdir="extra_fixtures/content/dupe-files",
+                                     carry_content_forward=True)
+        nv.apply_changes([{"op": "replace", "path": "a.txt", "src": "file1.txt"},
+                          {"op": "add", "path": "new/d.txt", "src": "file1_dupe.txt"},
+                          {"op": "add", "path": "file1.txt"},
+                          {"op": "delete", "path": "file1.txt"},
+                          {"op": "rename", "path": "c.txt", "to": "new/c.txt"},
+                          {"op": "delete", "path": "b.txt"}])
+        self.assertEqual(sorted(nv.inventory.current_version.logical_paths),
+                         ["a.txt", "new/c.txt", "new/d.txt"])
+        self.assertEqual(nv.inventory.current_version.state["digestC"], ["new/c.txt"])
+        # Only one copy of the duplicate files is added
+        self.assertEqual(nv.files_to_copy, {"file1.txt": "v2/content/file1.txt"})
+        # Bad changes
+        self.assertRaises(NewVersionException, nv.apply_changes, [{"path": "a.txt"}])
+        self.assertRaises(NewVersionException, nv.apply_changes, ["a.txt"])
+        self.assertRaises(NewVersionException, nv.apply_changes, [{"op": "zap", "path": "a.txt"}])
+        self.assertRaises(NewVersionException, nv.apply_changes, [{"op": "rename", "path": "a.txt"}])
+        self.assertRaises(NewVersionException, nv.apply_changes, [{"op": "add", "path": "a.txt", "src": "file1.txt"}])
+        self.assertRaises(NewVersionException, nv.apply_changes, [{"op": "replace", "path": "nope.txt", "src": "file1.txt"}])
+        self.assertRaises(NewVersionException, nv.apply_changes, [{"op": "delete", "path": "nope.txt"}])
+
+    def test_add_from_srcdir(self):
+        """Test add_from_srcdir method is the same with parallel digests."""
+        jsons = []
+        for workers in (1, 4):
+            nv = NewVersion.first_version(identifier="obj_id", srcdir="extra_fixtures/content",
+                                          workers=workers)
+            nv.created = "2001-01-01T01:01:01Z"
+            nv.add_from_srcdir()
+            jsons.append(nv.inventory.as_json())
+            self.assertEqual(len(nv.inventory.current_version.logical_paths), 6)
+            self.assertEqual(len(nv.files_to_copy), 2)
+        self.assertEqual(jsons[0], jsons[1])
+        # Fixity is added for content files
+        nv = NewVersion.first_version(identifier="obj_id", srcdir="extra_fixtures/content/dupe-files",
+                                      fixity=["md5"])
+        nv.add_from_srcdir()
+        self.assertEqual(nv.inventory.fixity, {"md5": {"3c825ca59d58209eae5924221497780c": ["v1/content/file1.txt"]}})
+        nv.delete("file1.txt")
+        nv.delete("file1_dupe.txt")
+        self.assertEqual(nv.inventory.fixity, {"md5": {}})
+        self.assertEqual(nv.files_to_copy, {})
+
     def test_setters_getters(self):
         """Test setters and getters for created, message, user_name and user_address."""
         nv = NewVersion.first_version(identifier="obj_id")
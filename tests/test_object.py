@@ -3,6 +3,7 @@ import json
 import os
 import tempfile
 import unittest
+from unittest import mock
 
 from ocfl.inventory import Inventory
 from ocfl.fsw import fsw_openfs, fsw_listdir_names, fsw_readtext
@@ -169,6 +170,130 @@ class TestAll(unittest.TestCase):
                               'inventory.json', 'inventory.json.sha512',
                               'v1', 'v2']))
 
+    def test11a_update_with_changes(self):
+        """Test update_with_changes method."""
+        tempdir = tempfile.mkdtemp(prefix='test_update_with_changes')
+        objdir = os.path.join(tempdir, '1')
+        oo = Object(identifier='uri:changes')
+        oo.create(srcdir='extra_fixtures/content/dedupe_content/v1',
+                  metadata=VersionMetadata(),
+                  objdir=objdir)
+        inv = oo.update_with_changes(objdir=objdir,
+                                     srcdir='extra_fixtures/content/dupe-files',
+                                     changes=[{"op": "add", "path": "dir/file1.txt", "src": "file1.txt"},
+                                              {"op": "delete", "path": "empty1.txt"},
+                                              {"op": "rename", "path": "empty2.txt", "to": "dir/empty2.txt"}],
+                                     metadata=VersionMetadata(message="Changes"))
+        self.assertEqual(inv.head, "v2")
+        self.assertEqual(sorted(inv.current_version.logical_paths),
+                         ["dir/empty2.txt", "dir/file1.txt", "empty3.txt"])
+        self.assertEqual(os.listdir(os.path.join(objdir, 'v2/content')), ['file1.txt'])
+        (passed, _) = oo.validate(objdir=objdir)
+        self.assertTrue(passed)
+        # No changes gives a new version with the same state
+        inv = oo.update_with_changes(objdir=objdir)
+        self.assertEqual(inv.head, "v3")
+        self.assertEqual(inv.version("v3").state, inv.version("v2").state)
+
+    def test11b_add_version_with_content_detect_changes(self):
+        """Test add_version_with_content with detect_changes."""
+        tempdir = tempfile.mkdtemp(prefix='test_detect_changes')
+        srcdir = os.path.join(tempdir, 'src')
+        objdir = os.path.join(tempdir, 'obj')
+        os.mkdir(srcdir)
+        for name in ('a.txt', 'b.txt', 'c.txt', 'd.txt'):
+            with open(os.path.join(srcdir, name), 'w', encoding='utf-8') as fh:
+                fh.write(name + ' v1')
+            os.utime(os.path.join(srcdir, name), (1000000000, 1000000000))
+        oo = Object(identifier='uri:detect')
+        oo.create(srcdir=srcdir,
+                  metadata=VersionMetadata(created='2100-01-01T00:00:00Z'),
+                  objdir=objdir)
+        # a.txt changes size, b.txt changes content but not size and is
+        # modified after v1 was written (the created time in the future is
+        # not used), c.txt changes content but not size or time so
+        # is not detected, d.txt is deleted and e.txt is new
+        for name, content in (('a.txt', 'a.txt version 2'), ('b.txt', 'b.txt v2'),
+                              ('c.txt', 'c.txt v2'), ('e.txt', 'e.txt v2')):
+            with open(os.path.join(srcdir, name), 'w', encoding='utf-8') as fh:
+                fh.write(content)
+        os.utime(os.path.join(srcdir, 'c.txt'), (1000000000, 1000000000))
+        os.remove(os.path.join(srcdir, 'd.txt'))
+        inv = oo.add_version_with_content(objdir=objdir, srcdir=srcdir,
+                                          metadata=VersionMetadata(),
+                                          detect_changes=True)
+        self.assertEqual(sorted(os.listdir(os.path.join(objdir, 'v2/content'))),
+                         ['a.txt', 'b.txt', 'e.txt'])
+        self.assertEqual(inv.version('v2').content_path_for_logical_path('c.txt'), 'v1/content/c.txt')
+        (passed, _) = oo.validate(objdir=objdir)
+        self.assertTrue(passed)
+        # Without change detection the change to c.txt is found
+        inv = oo.add_version_with_content(objdir=objdir, srcdir=srcdir,
+                                          metadata=VersionMetadata())
+        self.assertEqual(os.listdir(os.path.join(objdir, 'v3/content')), ['c.txt'])
+        # Only the directories of the previous version content are listed
+        nv = oo.start_new_version(objdir=objdir)
+        with mock.patch.object(oo.obj_fs, 'ls', wraps=oo.obj_fs.ls) as mock_ls:
+            (previous_files, not_modified_since) = oo._previous_version_files(nv)  # pylint: disable=protected-access
+        self.assertEqual(sorted(c.args[0] for c in mock_ls.call_args_list), ['v2/content', 'v3', 'v3/content'])
+        self.assertEqual({p: size for p, (_, size) in previous_files.items()},
+                         {'a.txt': 15, 'b.txt': 8, 'c.txt': 8, 'e.txt': 8})
+        self.assertEqual(not_modified_since, os.stat(os.path.join(objdir, 'v3/inventory.json')).st_mtime)
+
+    def test11c_migrate_digests(self):
+        """Test change of digest algorithm and fixity in start_new_version."""
+        tempdir = tempfile.mkdtemp(prefix='test_migrate')
+        objdir = os.path.join(tempdir, 'obj')
+        oo = Object(identifier='uri:migrate', digest_algorithm='sha256', workers=2)
+        oo.create(srcdir='extra_fixtures/content/dupe-files',
+                  metadata=VersionMetadata(),
+                  objdir=objdir)
+        # Migrate to sha512 with md5 and sha256 fixity, sha256 digests are
+        # copied from the old manifest, md5 calculated along with sha512
+        oo.digest_algorithm = 'sha512'
+        oo.fixity = ['md5', 'sha256']
+        inv = oo.update_with_changes(objdir=objdir, srcdir='extra_fixtures/content/dedupe_content/v1',
+                                     changes=[{"op": "add", "path": "empty1.txt"}],
+                                     metadata=VersionMetadata())
+        self.assertEqual(inv.digest_algorithm, 'sha512')
+        self.assertEqual(inv.manifest['21268cae9ad4d1e63df87c11d67cece80143448c9d2819d843b7a08fdee076c66c0163e4a54bb6df6277a04f7a21040f52a1e1b2f060c6110e286556ef7c6c2f'],
+                         ['v1/content/file1.txt'])
+        self.assertEqual(inv.fixity['md5'], {'3c825ca59d58209eae5924221497780c': ['v1/content/file1.txt'],
+                                             'd41d8cd98f00b204e9800998ecf8427e': ['v2/content/empty1.txt']})
+        self.assertEqual(inv.fixity['sha256'], {'8ff1d293923dde8fa49a3227b4a4b4faad94f73cd1c41c60e712d4f1e421a788': ['v1/content/file1.txt'],
+                                                'e3b0c44298fc1c149afbf4c8996fb92427ae41e4649b934ca495991b7852b855': ['v2/content/empty1.txt']})
+        (passed, _) = oo.validate(objdir=objdir)
+        self.assertTrue(passed)
+        # Changed content is found when checking digests in migration
+        with open(os.path.join(objdir, 'v1/content/file1.txt'), 'w', encoding='utf-8') as fh:
+            fh.write('corrupted!')
+        oo.digest_algorithm = 'sha256'
+        self.assertRaises(ObjectException, oo.start_new_version, objdir=objdir,
+                          digest_algorithm='sha256', check_digests=True)
+
+    def test11d_write_new_version_declaration(self):
+        """Test update of object declaration when spec version changes."""
+        tempdir = tempfile.mkdtemp(prefix='test_declaration')
+        objdir = os.path.join(tempdir, 'obj')
+        Object(identifier='uri:declaration', spec_version='1.0').create(srcdir='extra_fixtures/content/dupe-files',
+                                                                        metadata=VersionMetadata(),
+                                                                        objdir=objdir)
+        # New declaration is written before the old one is removed
+        has_new_declaration = []
+
+        def _listdir_names(fs, path):
+            has_new_declaration.append(os.path.exists(os.path.join(objdir, '0=ocfl_object_1.1')))
+            return fsw_listdir_names(fs, path)
+
+        oo = Object(spec_version='1.1')
+        with mock.patch('ocfl.object.fsw_listdir_names', _listdir_names):
+            oo.add_version_with_content(objdir=objdir, srcdir='extra_fixtures/content/dedupe_content/v1',
+                                        metadata=VersionMetadata())
+        self.assertTrue(has_new_declaration[-1])
+        self.assertEqual(sorted(n for n in os.listdir(objdir) if n.startswith('0=')), ['0=ocfl_object_1.1'])
+        (passed, _) = oo.validate(objdir=objdir)
+        self.assertTrue(passed)
+
     def test12_tree(self):
         """Test tree method."""
         s = Object(spec_version='1.0').tree(objdir='fixtures/1.0/good-objects/minimal_one_version_one_file')
@@ -3,7 +3,8 @@
 import unittest
 from ocfl.object_utils import ObjectException, remove_first_directory, \
     make_unused_filepath, first_version_directory, next_version_directory, \
-    find_path_type, parse_version_directory
+    find_path_type, parse_version_directory, versions_missing_from
+from ocfl.inventory import Inventory
 
 
 class TestAll(unittest.TestCase):
@@ -79,3 +80,28 @@ class TestAll(unittest.TestCase):
         self.assertRaises(ObjectException, parse_version_directory, "v0000")
         self.assertRaises(ObjectException, parse_version_directory, "vv")
         self.assertRaises(ObjectException, parse_version_directory, "v000001")
+
+    def test_versions_missing_from(self):
+        """Test versions_missing_from function."""
+        v1 = {"created": "2026-01-01T00:00:00Z", "state": {"abc": ["a.txt"]}}
+        v2 = {"created": "2026-01-02T00:00:00Z", "state": {"abc": ["a.txt", "b.txt"]}}
+        inv = Inventory({"id": "info:a", "versions": {"v1": v1, "v2": v2}})
+        self.assertEqual(versions_missing_from(inv, Inventory({"id": "info:a", "versions": {}})), ["v1", "v2"])
+        self.assertEqual(versions_missing_from(inv, Inventory({"id": "info:a", "versions": {"v1": v1}})), ["v2"])
+        self.assertEqual(versions_missing_from(inv, inv), [])
+        self.assertRaises(ObjectException, versions_missing_from, inv, Inventory({"id": "info:b", "versions": {"v1": v1}}))
+        self.assertRaises(ObjectException, versions_missing_from, inv, Inventory({"id": "info:a", "versions": {"v1": v2}}))
+        self.assertRaises(ObjectException, versions_missing_from,
+                          Inventory({"id": "info:a", "versions": {"v1": v1}}), inv)
+        # Change of digest algorithm rewrites the digests of earlier versions
+        replica = Inventory({"id": "info:a", "digestAlgorithm": "sha256",
+                             "manifest": {"abc": ["v1/content/a.txt"]},
+                             "versions": {"v1": v1}})
+        migrated = Inventory({"id": "info:a", "digestAlgorithm": "sha512",
+                              "manifest": {"def": ["v1/content/a.txt"], "ghi": ["v2/content/b.txt"]},
+                              "versions": {"v1": {"created": "2026-01-01T00:00:00Z", "state": {"def": ["a.txt"]}},
+                                           "v2": {"created": "2026-01-02T00:00:00Z",
+                                                  "state": {"def": ["a.txt"], "ghi": ["b.txt"]}}}})
+        self.assertEqual(versions_missing_from(migrated, replica), ["v2"])
+        migrated.manifest["def"] = ["v1/content/other.txt"]
+        self.assertRaises(ObjectException, versions_missing_from, migrated, replica)
@@ -0,0 +1,134 @@
+"""Replication tests."""
+import json
+import os
+import shutil
+import tempfile
+import unittest
+import unittest.mock
+
+from ocfl.fsw import fsw_copydirs
+from ocfl.object import Object, ObjectException
+from ocfl.replication import replicate_object, sync_storage_root, compare_storage_roots
+from ocfl.storage_root import StorageRoot, StorageRootException
+from ocfl.version_metadata import VersionMetadata
+
+
+class TestAll(unittest.TestCase):
+    """TestAll class to run tests."""
+
+    def test_replicate_object(self):
+        """Test replicate_object function."""
+        tempdir = tempfile.mkdtemp(prefix='test_replicate')
+        objdir = os.path.join(tempdir, 'obj')
+        replica = os.path.join(tempdir, 'replica')
+        oo = Object(identifier='uri:replicate', digest_algorithm='sha256')
+        oo.create(srcdir='extra_fixtures/content/dupe-files',
+                  metadata=VersionMetadata(),
+                  objdir=objdir)
+        self.assertEqual(replicate_object(oo, replica, objdir=objdir), ['v1'])
+        self.assertEqual(replicate_object(oo, replica), [])
+        # Add two versions, with a partial copy of v2 left in the replica
+        oo.add_version_with_content(objdir=objdir, srcdir='extra_fixtures/content/dedupe_content/v1',
+                                    metadata=VersionMetadata())
+        oo.add_version_with_content(objdir=objdir, srcdir='extra_fixtures/content/dedupe_content/v2',
+                                    metadata=VersionMetadata())
+        os.makedirs(os.path.join(replica, 'v2/content'))
+        with open(os.path.join(replica, 'v2/content/partial.txt'), 'w', encoding='utf-8') as fh:
+            fh.write('partial')
+        self.assertEqual(replicate_object(oo, replica, objdir=objdir, workers=2, level='fixity'), ['v2', 'v3'])
+        self.assertFalse(os.path.exists(os.path.join(replica, 'v2/content/partial.txt')))
+        (passed, _) = oo.validate(objdir=replica)
+        self.assertTrue(passed)
+        # New version with a change of digest algorithm rewrites the digests
+        # of earlier versions, the replica is still updated
+        oo.digest_algorithm = 'sha512'
+        oo.update_with_changes(objdir=objdir, srcdir='extra_fixtures/content/dedupe_content/v1',
+                               changes=[{"op": "delete", "path": "empty4.txt"}],
+                               metadata=VersionMetadata())
+        self.assertEqual(replicate_object(oo, replica, objdir=objdir), ['v4'])
+        (passed, _) = oo.validate(objdir=replica)
+        self.assertTrue(passed)
+        # Different object, or replica with different versions
+        other = Object(identifier='uri:other', digest_algorithm='sha256')
+        other.create(srcdir='extra_fixtures/content/dupe-files',
+                     metadata=VersionMetadata(),
+                     objdir=os.path.join(tempdir, 'other'))
+        self.assertRaises(ObjectException, replicate_object, other, replica)
+        self.assertRaises(ObjectException, replicate_object, Object(path=objdir), os.path.join(tempdir, 'other'))
+
+    def test_sync_storage_root(self):
+        """Test sync_storage_root function."""
+        tempdir = tempfile.mkdtemp(prefix="test_sync")
+        root = os.path.join(tempdir, "root")
+        shutil.copytree("extra_fixtures/1.0/good-storage-roots/reg-extension-dir-root", root)
+        dst_root = os.path.join(tempdir, "dst")
+        s = StorageRoot(root=root)
+        self.assertEqual(sync_storage_root(s, dst_root, workers=2), {"updated": 1, "unchanged": 0, "error": 0})
+        dst = StorageRoot(root=dst_root)
+        self.assertTrue(dst.validate(validate_objects=True, check_digests=True))
+        self.assertEqual(dst.layout_name, "0003-hash-and-id-n-tuple-storage-layout")
+        self.assertEqual(sync_storage_root(s, dst_root), {"updated": 0, "unchanged": 1, "error": 0})
+        # Add a version to the object, only that is copied
+        objdir = os.path.join(root, s.object_path("ark:123/abc"))
+        Object(path=objdir).add_version_with_content(objdir=objdir, srcdir="extra_fixtures/content/dupe-files",
+                                                     metadata=VersionMetadata())
+        with unittest.mock.patch("ocfl.replication.fsw_copydirs", wraps=fsw_copydirs) as copydirs:
+            self.assertEqual(sync_storage_root(s, dst_root, level="content"), {"updated": 1, "unchanged": 0, "error": 0})
+            self.assertEqual([c[3] for c in copydirs.call_args[0][0]], ["v2"])
+        self.assertTrue(dst.validate(validate_objects=True, check_digests=True))
+        # Objects with bad inventories are errors, the others are synced and
+        # nothing is left in the destination for them. One has the sidecar
+        # of the good inventory so fails the check of the replica, the
+        # other cannot be read
+        for name, data in (("bad/json", "{not json"), ("bad/type", "[1,2]")):
+            shutil.copytree(objdir, os.path.join(root, name))
+            with open(os.path.join(root, name, "inventory.json"), "w", encoding="utf-8") as fh:
+                fh.write(data)
+        with open(os.path.join(root, "bad/type/inventory.json.sha512"), "w", encoding="utf-8") as fh:
+            fh.write("abc123 inventory.json\n")
+        self.assertEqual(sync_storage_root(s, dst_root, workers=2), {"updated": 0, "unchanged": 1, "error": 2})
+        self.assertFalse(os.path.exists(os.path.join(dst_root, "bad")))
+        self.assertTrue(dst.validate(validate_objects=True))
+        # Mismatched destination
+        self.assertRaises(StorageRootException, sync_storage_root,
+                          StorageRoot(root="extra_fixtures/1.0/good-storage-roots/simple-root"), dst_root)
+
+    def test_compare_storage_roots(self):
+        """Test compare_storage_roots function."""
+        tempdir = tempfile.mkdtemp(prefix="test_compare")
+        root = os.path.join(tempdir, "root")
+        shutil.copytree("extra_fixtures/1.0/good-storage-roots/simple-root", root)
+        dst_root = os.path.join(tempdir, "dst")
+        s = StorageRoot(root=root)
+        sync_storage_root(s, dst_root)
+        self.assertEqual([e["status"] for e in compare_storage_roots(s, dst_root, workers=2)], ["same", "same", "same"])
+        # Remove one object, add a version to another, and change the id of a third
+        shutil.rmtree(os.path.join(dst_root, "ark%3A%2F12345%2Fbcd987"))
+        objdir = os.path.join(root, "ark%3A123%2Fabc")
+        Object(path=objdir).add_version_with_content(objdir=objdir, srcdir="extra_fixtures/content/dupe-files",
+                                                     metadata=VersionMetadata())
+        objdir = os.path.join(dst_root, "http%3A%2F%2Fexample.org%2Fminimal_mixed_digests")
+        shutil.copytree(objdir, os.path.join(dst_root, "extra"))
+        with open(os.path.join(objdir, "inventory.json"), "r", encoding="utf-8") as fh:
+            inventory = json.load(fh)
+        inventory["id"] = "info:other"
+        with open(os.path.join(objdir, "inventory.json"), "w", encoding="utf-8") as fh:
+            json.dump(inventory, fh)
+        os.remove(os.path.join(objdir, "inventory.json.sha512"))
+        entries = list(compare_storage_roots(s, dst_root, workers=2))
+        self.assertEqual(entries[0], {"path": "ark%3A%2F12345%2Fbcd987", "status": "missing"})
+        self.assertEqual(entries[1], {"path": "ark%3A123%2Fabc", "id": "ark:123/abc",
+                                      "status": "missing-versions", "missing_versions": ["v2"]})
+        self.assertEqual(entries[2]["status"], "divergent")
+        self.assertIn("info:other", entries[2]["message"])
+        self.assertEqual(entries[3], {"path": "extra", "status": "extra"})
+        # Sync just the objects reported missing
+        paths = [e["path"] for e in entries if e["status"] in ("missing", "missing-versions")]
+        self.assertEqual(sync_storage_root(s, dst_root, object_paths=paths), {"updated": 2, "unchanged": 0, "error": 0})
+        self.assertEqual([e["status"] for e in compare_storage_roots(s, dst_root)], ["same", "same", "divergent", "extra"])
+        # Object with an inventory that is not a JSON object is an error
+        with open(os.path.join(root, "ark%3A123%2Fabc", "inventory.json"), "w", encoding="utf-8") as fh:
+            fh.write("[1,2]")
+        with open(os.path.join(root, "ark%3A123%2Fabc", "inventory.json.sha512"), "w", encoding="utf-8") as fh:
+            fh.write("abc123 inventory.json\n")
+        self.assertEqual([e["status"] for e in compare_storage_roots(s, dst_root)], ["same", "error", "divergent", "extra"])
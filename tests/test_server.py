@@ -0,0 +1,139 @@
+"""OcflServer tests."""
+import json
+import os
+import shutil
+import socket
+import tempfile
+import threading
+import unittest
+
+from ocfl.server import OcflServer, ServerException, call, METHOD_NOT_FOUND, INVALID_PARAMS, OPERATION_FAILED, \
+    PARSE_ERROR
+
+ROOT = "extra_fixtures/1.0/good-storage-roots/reg-extension-dir-root"
+
+
+class TestAll(unittest.TestCase):
+    """TestAll class to run tests."""
+
+    def setUp(self):
+        """Start server on a socket in a temporary directory."""
+        self.tempdir = tempfile.mkdtemp(prefix="test_server")
+        self.socket_path = os.path.join(self.tempdir, "ocfl.sock")
+        self.server = OcflServer(self.socket_path)
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+
+    def tearDown(self):
+        """Stop server and remove temporary directory."""
+        self.server.shutdown()
+        self.server.server_close()
+        self.thread.join()
+        shutil.rmtree(self.tempdir)
+
+    def test_init(self):
+        """Test initialization with existing socket path."""
+        self.assertRaises(ServerException, OcflServer, self.socket_path)
+
+    def test_path_and_list(self):
+        """Test path and list methods, with the storage root kept."""
+        self.assertEqual(call(self.socket_path, "path", root=ROOT, id="ark:123/abc"),
+                         {"path": "a47/817/83d/cec/ark%3a123%2fabc"})
+        self.assertEqual(list(self.server._roots.keys()), [ROOT])  # pylint: disable=protected-access
+        self.assertEqual(call(self.socket_path, "list", root=ROOT),
+                         {"objects": [{"path": "a47/817/83d/cec/ark%3a123%2fabc", "id": "ark:123/abc"}]})
+        self.assertEqual(call(self.socket_path, "list", root=ROOT, read_inventory=True)["objects"][0]["id"],
+                         "ark:123/abc")
+        with self.assertRaises(ServerException) as cm:
+            call(self.socket_path, "list", root=os.path.join(self.tempdir, "no-root"))
+        self.assertEqual(cm.exception.code, OPERATION_FAILED)
+
+    def test_validate(self):
+        """Test validate method."""
+        result = call(self.socket_path, "validate", root=ROOT, id="ark:123/abc")
+        self.assertTrue(result["valid"])
+        self.assertEqual(result["errors"], 0)
+        result = call(self.socket_path, "validate", path="extra_fixtures/1.0/bad-objects/E033_inventory_bad_json",
+                      level="inventory")
+        self.assertFalse(result["valid"])
+        self.assertTrue(any("E033" in m for m in result["messages"]))
+
+    def test_extract_and_update(self):
+        """Test extract and update methods."""
+        objdir = os.path.join(self.tempdir, "obj")
+        shutil.copytree(os.path.join(ROOT, "a47/817/83d/cec/ark%3a123%2fabc"), objdir)
+        dstdir = os.path.join(self.tempdir, "v1")
+        result = call(self.socket_path, "extract", path=objdir, version="head", dst=dstdir)
+        self.assertEqual(result["version"], "v1")
+        self.assertEqual(os.listdir(dstdir), ["a_file.txt"])
+        with open(os.path.join(dstdir, "new.txt"), "w", encoding="utf-8") as fh:
+            fh.write("new\n")
+        result = call(self.socket_path, "update", path=objdir, src=dstdir, message="v2", name="A", address="mailto:a@example.org")
+        self.assertEqual(result, {"head": "v2"})
+        result = call(self.socket_path, "update", path=objdir, src=dstdir,
+                      changes=[{"op": "delete", "path": "new.txt"}], message="v3")
+        self.assertEqual(result, {"head": "v3"})
+        self.assertTrue(call(self.socket_path, "validate", path=objdir)["valid"])
+        # Extract into a non-empty directory fails
+        with self.assertRaises(ServerException) as cm:
+            call(self.socket_path, "extract", path=objdir, dst=dstdir)
+        self.assertEqual(cm.exception.code, OPERATION_FAILED)
+
+    def test_concurrent_updates(self):
+        """Test concurrent updates of one object each add a version."""
+        objdir = os.path.join(self.tempdir, "obj")
+        shutil.copytree(os.path.join(ROOT, "a47/817/83d/cec/ark%3a123%2fabc"), objdir)
+        heads = []
+
+        def _update(n):
+            srcdir = os.path.join(self.tempdir, "src%d" % n)
+            os.mkdir(srcdir)
+            with open(os.path.join(srcdir, "file%d.txt" % n), "w", encoding="utf-8") as fh:
+                fh.write("file %d\n" % n)
+            heads.append(call(self.socket_path, "update", path=objdir, src=srcdir, message="update %d" % n)["head"])
+
+        threads = [threading.Thread(target=_update, args=(n,)) for n in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(sorted(heads), ["v2", "v3", "v4", "v5"])
+        self.assertTrue(call(self.socket_path, "validate", path=objdir)["valid"])
+
+    def test_object_lock(self):
+        """Test object locks are shared for one object and then forgotten."""
+        objdir = self.server.object_dir({"root": ROOT, "id": "ark:123/abc"})
+        key = os.path.abspath(os.path.join(ROOT, "a47/817/83d/cec/ark%3a123%2fabc"))
+        acquired = threading.Event()
+
+        def _lock_path():
+            with self.server.object_lock(key + "/"):
+                acquired.set()
+
+        with self.server.object_lock(objdir):
+            self.assertEqual(list(self.server._object_locks), [key])  # pylint: disable=protected-access
+            thread = threading.Thread(target=_lock_path)
+            thread.start()
+            self.assertFalse(acquired.wait(0.2))
+        thread.join()
+        self.assertTrue(acquired.is_set())
+        self.assertEqual(self.server._object_locks, {})  # pylint: disable=protected-access
+
+    def test_errors(self):
+        """Test error responses and multiple requests on one connection."""
+        with self.assertRaises(ServerException) as cm:
+            call(self.socket_path, "delete", root=ROOT)
+        self.assertEqual(cm.exception.code, METHOD_NOT_FOUND)
+        with self.assertRaises(ServerException) as cm:
+            call(self.socket_path, "path", root=ROOT)
+        self.assertEqual(cm.exception.code, INVALID_PARAMS)
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.connect(self.socket_path)
+            with sock.makefile("rwb") as fh:
+                fh.write(b"not json\n")
+                fh.write(b'{"jsonrpc": "2.0", "method": "path", "params": {"root": "%s", "id": "x"}}\n' % ROOT.encode())
+                fh.write(b'{"jsonrpc": "2.0", "id": 7, "method": "path", "params": {"root": "%s", "id": "x"}}\n' % ROOT.encode())
+                fh.flush()
+                self.assertEqual(json.loads(fh.readline())["error"]["code"], PARSE_ERROR)
+                # No response to the notification without id
+                self.assertEqual(json.loads(fh.readline())["id"], 7)
@@ -0,0 +1,48 @@
+"""SortedRuns tests."""
+import os
+import random
+import unittest
+
+from ocfl.sorted_runs import SortedRuns, SortedLookup, grouped, record_size
+
+
+class TestAll(unittest.TestCase):
+    """TestAll class to run tests."""
+
+    def test_sorted_runs(self):
+        """Test SortedRuns in memory and spilled to disk."""
+        records = [("file%05d" % n, n % 7, "v%d" % (n % 3)) for n in range(1000)]
+        random.Random(1).shuffle(records)
+        with SortedRuns() as runs:
+            for record in records:
+                runs.add(record)
+            self.assertEqual(len(runs), 1000)
+            self.assertEqual(runs.num_runs, 0)
+            self.assertEqual(list(runs), sorted(records))
+        with SortedRuns(max_bytes=100 * record_size(records[0])) as runs:
+            for record in records:
+                runs.add(record)
+            self.assertEqual(runs.num_runs, 10)
+            workdir = runs._workdir.name  # pylint: disable=protected-access
+            self.assertTrue(os.path.isdir(workdir))
+            self.assertEqual(list(runs), sorted(records))
+            # Can add more and iterate again
+            runs.add(("a", 1, "v1"))
+            self.assertEqual(list(runs)[0], ("a", 1, "v1"))
+            self.assertEqual(len(list(runs)), 1001)
+        self.assertFalse(os.path.exists(workdir))
+        self.assertEqual(len(runs), 0)
+
+    def test_grouped_and_lookup(self):
+        """Test grouped() and SortedLookup."""
+        records = [("a", 1), ("a", 2), ("b", 1), ("d", 3)]
+        groups = list(grouped(records))
+        self.assertEqual(groups, [(("a",), [("a", 1), ("a", 2)]),
+                                  (("b",), [("b", 1)]),
+                                  (("d",), [("d", 3)])])
+        self.assertEqual(list(grouped([])), [])
+        lookup = SortedLookup((key[0], len(group)) for key, group in groups)
+        self.assertEqual(lookup.get("a"), 2)
+        self.assertEqual(lookup.get("c", 0), 0)
+        self.assertEqual(lookup.get("d"), 1)
+        self.assertEqual(lookup.get("e"), None)
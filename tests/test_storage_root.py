@@ -2,13 +2,17 @@
 """Storage root tests."""
 import io
 import logging
+import json
 import os
+import shutil
 import tempfile
 import unittest
+import unittest.mock
 
 from ocfl.storage_root import StorageRoot, StorageRootException
 from ocfl.layout_registry import get_layout
 from ocfl.layout_0002_flat_direct import Layout_0002_Flat_Direct
+from ocfl.object import Object
 from ocfl.validation_logger import ValidationLogger
 
 
@@ -83,6 +87,34 @@ class TestAll(unittest.TestCase):
         self.assertEqual(s.object_path("id1"), "id1")
         s = StorageRoot(root="z/a", layout_name="nnnn-uuid-quadtree")
         self.assertEqual(s.object_path("urn:uuid:6ba7b810-9dad-11d1-80b4-00c04fd430c8"), "6ba7/b810/9dad/11d1/80b4/00c0/4fd4/30c8")
+        # Layout read from storage root, structure checked just once
+        s = StorageRoot(root="extra_fixtures/1.0/good-storage-roots/reg-extension-dir-root")
+        self.assertEqual(list(s.identifiers_to_object_paths(["ark:123/abc", "ark:123/abc"])),
+                         ["a47/817/83d/cec/ark%3a123%2fabc", "a47/817/83d/cec/ark%3a123%2fabc"])
+        with unittest.mock.patch.object(s, "check_root_structure") as check:
+            self.assertEqual(s.object_path("ark:123/abc"), "a47/817/83d/cec/ark%3a123%2fabc")
+            check.assert_not_called()
+        # No layout
+        s = StorageRoot(root="extra_fixtures/1.0/good-storage-roots/simple-root")
+        self.assertRaises(StorageRootException, s.object_path, "id1")
+        with unittest.mock.patch.object(s, "check_root_structure") as check:
+            self.assertRaises(StorageRootException, s.object_path, "id1")
+            check.assert_not_called()
+
+    def test_list_objects(self):
+        """Test list_objects method."""
+        s = StorageRoot(root="extra_fixtures/1.0/good-storage-roots/reg-extension-dir-root")
+        with unittest.mock.patch("ocfl.storage_root.Object.id_from_inventory") as id_from_inventory:
+            self.assertEqual(list(s.list_objects()), [("a47/817/83d/cec/ark%3a123%2fabc", "ark:123/abc")])
+            id_from_inventory.assert_not_called()
+        self.assertEqual(s.num_objects, 1)
+        self.assertEqual(list(s.list_objects(read_inventory=True)), [("a47/817/83d/cec/ark%3a123%2fabc", "ark:123/abc")])
+        # No layout so must read inventories
+        s = StorageRoot(root="extra_fixtures/1.0/good-storage-roots/simple-root")
+        self.assertEqual(sorted(s.list_objects()),
+                         [("ark%3A%2F12345%2Fbcd987", "ark:/12345/bcd987"),
+                          ("ark%3A123%2Fabc", "ark:123/abc"),
+                          ("http%3A%2F%2Fexample.org%2Fminimal_mixed_digests", "http://example.org/minimal_mixed_digests")])
 
     def test_initialize(self):
         """Test initialize method."""
@@ -206,3 +238,85 @@ class TestAll(unittest.TestCase):
         s = StorageRoot(root="zip://extra_fixtures/1.0/bad-storage-roots/E069_no_declaration_file.zip")
         self.assertFalse(s.validate())
         self.assertIn("E069a", s.log.codes)
+
+    def test_add(self):
+        """Test add method."""
+        tempdir = tempfile.mkdtemp(prefix="test_add")
+        s = StorageRoot(root=os.path.join(tempdir, "root"), layout_name="0003-hash-and-id-n-tuple-storage-layout")
+        s.initialize()
+        src = "extra_fixtures/1.0/good-storage-roots/simple-root/ark%3A123%2Fabc"
+        # Copy with corrupt inventory but the original sidecar is not added,
+        # even with the original inventory in the inventory cache
+        bad = os.path.join(tempdir, "bad")
+        shutil.copytree(src, bad)
+        with open(os.path.join(bad, "inventory.json"), "w", encoding="utf-8") as fh:
+            fh.write("{garbage")
+        Object(path=src).parse_inventory(use_cache=True)
+        self.assertRaises(ValueError, s.add, bad)
+        self.assertEqual(s.add(src), ("ark:123/abc", s.object_path("ark:123/abc")))
+        self.assertRaises(StorageRootException, s.add, src)
+        self.assertEqual([i for (_, i) in s.list_objects()], ["ark:123/abc"])
+
+    def test_add_many(self):
+        """Test add_many method."""
+        tempdir = tempfile.mkdtemp(prefix="test_add_many")
+        s = StorageRoot(root=os.path.join(tempdir, "root"), layout_name="0003-hash-and-id-n-tuple-storage-layout")
+        s.initialize()
+        src = "extra_fixtures/1.0/good-storage-roots/simple-root"
+        objects = [os.path.join(src, "ark%3A123%2Fabc"),
+                   os.path.join(src, "ark%3A%2F12345%2Fbcd987"),
+                   os.path.join(src, "ark%3A%2F12345%2Fbcd987"),  # collision
+                   os.path.join(tempdir, "does_not_exist")]
+        results = list(s.add_many(objects, workers=2))
+        self.assertEqual(len(results), 4)
+        errors = sorted((r[0], r[3]) for r in results if r[3] is not None)
+        self.assertEqual(len(errors), 3)
+        self.assertEqual(errors[0][0], os.path.join(tempdir, "does_not_exist"))
+        self.assertIn("Cannot read object", errors[0][1])
+        self.assertIn("same as for another object", errors[1][1])
+        self.assertIn("same as for another object", errors[2][1])
+        self.assertIn((os.path.join(src, "ark%3A123%2Fabc"), "ark:123/abc", s.object_path("ark:123/abc"), None), results)
+        self.assertTrue(s.validate(validate_objects=True))
+        self.assertEqual(s.num_objects, 1)
+        # Adding again finds the existing object
+        results = list(s.add_many(objects[:2]))
+        self.assertIn("already exists", results[0][3])
+        self.assertIsNone(results[1][3])
+        self.assertEqual(sorted(i for (_, i) in s.list_objects()), ["ark:/12345/bcd987", "ark:123/abc"])
+        # Sources with bad inventories are reported, the others are added
+        for name, data in (("bad_json", "{not json"), ("bad_type", "[1,2]")):
+            shutil.copytree(objects[0], os.path.join(tempdir, name))
+            with open(os.path.join(tempdir, name, "inventory.json"), "w", encoding="utf-8") as fh:
+                fh.write(data)
+        good = "extra_fixtures/1.0/good-storage-roots/simple-root/http%3A%2F%2Fexample.org%2Fminimal_mixed_digests"
+        results = list(s.add_many([os.path.join(tempdir, "bad_json"), os.path.join(tempdir, "bad_type"), good],
+                                  workers=2))
+        self.assertEqual(len(results), 3)
+        errors = sorted(r[0] for r in results if r[3] is not None and "Cannot read object" in r[3])
+        self.assertEqual(errors, [os.path.join(tempdir, "bad_json"), os.path.join(tempdir, "bad_type")])
+        self.assertIn((good, "http://example.org/minimal_mixed_digests",
+                       s.object_path("http://example.org/minimal_mixed_digests"), None), results)
+
+    def test_migrate_digests(self):
+        """Test migrate_digests method with checkpoint."""
+        tempdir = tempfile.mkdtemp(prefix="test_migrate_digests")
+        root = os.path.join(tempdir, "root")
+        shutil.copytree("extra_fixtures/1.0/good-storage-roots/simple-root", root)
+        checkpoint = os.path.join(tempdir, "checkpoint.jsonl")
+        # Record one object as already done in checkpoint, as if resuming
+        with open(checkpoint, "w", encoding="utf-8") as fh:
+            fh.write(json.dumps({"path": "ark%3A123%2Fabc", "status": "migrated"}) + "\n")
+        s = StorageRoot(root=root)
+        counts = s.migrate_digests(digest_algorithm="sha256", add_fixity=["md5"],
+                                   workers=2, checkpoint=checkpoint)
+        self.assertEqual(counts, {"migrated": 2, "skipped": 0, "done": 1, "error": 0})
+        with open(checkpoint, "r", encoding="utf-8") as fh:
+            self.assertEqual(len(fh.readlines()), 3)
+        self.assertTrue(os.path.exists(os.path.join(root, "ark%3A%2F12345%2Fbcd987", "inventory.json.sha256")))
+        self.assertTrue(os.path.exists(os.path.join(root, "ark%3A123%2Fabc", "inventory.json.sha512")))
+        # Without checkpoint, the last object is migrated and the others
+        # need no change
+        counts = s.migrate_digests(digest_algorithm="sha256", add_fixity=["md5"])
+        self.assertEqual(counts, {"migrated": 1, "skipped": 2, "done": 0, "error": 0})
+        self.assertTrue(s.validate(validate_objects=True, check_digests=True))
+        self.assertEqual(s.good_objects, 3)
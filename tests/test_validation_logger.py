@@ -1,6 +1,6 @@
 """ValidationLogger tests."""
 import unittest
-from ocfl.validation_logger import ValidationLogger
+from ocfl.validation_logger import ValidationLogger, FailFastException
 
 
 class TestAll(unittest.TestCase):
@@ -70,6 +70,12 @@ class TestAll(unittest.TestCase):
         vl.error("E333")
         self.assertEqual(vl.num_errors, 1)
         self.assertIn("Unknown error: E333 - params ({})", vl.messages[-1])
+        # Fail fast
+        vl = ValidationLogger(fail_fast=True)
+        vl.warning("W333")
+        self.assertRaises(FailFastException, vl.error, "E333")
+        self.assertEqual(vl.num_errors, 1)
+        self.assertIn("Unknown error: E333 - params ({})", vl.messages[-1])
 
     def test_warning(self):
         """Test warning method."""
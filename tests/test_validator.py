@@ -1,7 +1,12 @@
 """Validator tests."""
 import os
 import os.path
+import shutil
+import tempfile
 import unittest
+from unittest import mock
+from ocfl.sorted_runs import SortedRuns
+from ocfl.validation_logger import ValidationLogger
 from ocfl.validator import Validator
 
 
@@ -223,3 +228,86 @@ class TestAll(unittest.TestCase):
                 filepath = extra_fixture_maybe_zip(os.path.join(base_dir, name))
                 v = Validator()
                 self.assertTrue(v.validate_object(filepath), msg="for object at " + filepath)
+
+    def test06_workers(self):
+        """Check that validation with worker threads gives the same results."""
+        paths = ["extra_fixtures/1.0/good-storage-roots/simple-root/ark%3A%2F12345%2Fbcd987"]
+        for fixtures in ("extra_fixtures/1.0/bad-objects", "extra_fixtures/1.1/bad-objects"):
+            for name in sorted(os.listdir(fixtures)):
+                if not name.endswith(".zip"):
+                    paths.append(os.path.join(fixtures, name))
+        for path in paths:
+            results = []
+            for workers in (1, 4):
+                validator = Validator(log_warnings=True, workers=workers)
+                results.append((validator.validate_object(path), str(validator)))
+            self.assertEqual(results[0], results[1], "Results differ for " + path)
+
+    def test07_max_memory(self):
+        """Check that bounded memory validation gives the same results."""
+        paths = ["extra_fixtures/1.0/good-storage-roots/simple-root/ark%3A%2F12345%2Fbcd987"]
+        for fixtures in ("extra_fixtures/1.0/bad-objects", "extra_fixtures/1.1/bad-objects"):
+            for name in sorted(os.listdir(fixtures)):
+                if not name.endswith(".zip"):
+                    paths.append(os.path.join(fixtures, name))
+        for path in paths:
+            results = []
+            # A tiny limit so that every record is spilled to disk
+            for max_memory in (None, 100):
+                validator = Validator(log_warnings=True, max_memory=max_memory)
+                results.append((validator.validate_object(path), validator.log.codes))
+            self.assertEqual(results[0], results[1], "Results differ for " + path)
+
+    def test08_levels(self):
+        """Check validation levels and fail fast."""
+        self.assertRaises(ValueError, Validator, level="everything")
+        good = "extra_fixtures/1.0/good-storage-roots/simple-root/ark%3A%2F12345%2Fbcd987"
+        for level in ("declaration", "inventory", "content", "digests", "fixity"):
+            self.assertTrue(Validator(level=level).validate_object(good), "level " + level)
+        # Each bad object is valid up to the level before the one that
+        # detects the error
+        for name, first_bad_level in (("E033_inventory_bad_json", "inventory"),
+                                      ("E050_state_digest_different_case", "inventory"),
+                                      ("E046_missing_version_dir", "content"),
+                                      ("E092_bad_manifest_digest", "digests"),
+                                      ("E093_fixity_digest_mismatch_in_v1", "fixity")):
+            path = os.path.join("extra_fixtures/1.0/bad-objects", name)
+            valid = True
+            for level in ("declaration", "inventory", "content", "digests", "fixity"):
+                if level == first_bad_level:
+                    valid = False
+                self.assertEqual(Validator(level=level).validate_object(path), valid,
+                                 "for %s at level %s" % (name, level))
+        # Bad inventory digest is found at the declaration level
+        tmpdir = tempfile.mkdtemp()
+        try:
+            obj = os.path.join(tmpdir, "obj")
+            shutil.copytree(good, obj)
+            with open(os.path.join(obj, "inventory.json"), "a", encoding="utf-8") as fh:
+                fh.write(" ")
+            validator = Validator(level="declaration")
+            self.assertFalse(validator.validate_object(obj))
+            self.assertEqual(list(validator.log.codes), ["E060"])
+        finally:
+            shutil.rmtree(tmpdir)
+        # Fail fast
+        path = "extra_fixtures/1.0/bad-objects/E066_changed_v1_logical_path"
+        validator = Validator()
+        self.assertFalse(validator.validate_object(path))
+        self.assertGreater(validator.log.num_errors, 1)
+        validator = Validator(fail_fast=True)
+        self.assertFalse(validator.validate_object(path))
+        self.assertEqual(validator.log.num_errors, 1)
+        # Fail fast with max_memory closes the sorted runs
+        close = SortedRuns.close
+        with mock.patch.object(SortedRuns, "close", autospec=True, side_effect=close) as mock_close:
+            validator = Validator(fail_fast=True, max_memory=1000)
+            self.assertFalse(validator.validate_object(path))
+            self.assertEqual(mock_close.call_count, 2)
+        # Fail fast on a shared log is only set during validation
+        log = ValidationLogger()
+        validator = Validator(log=log, fail_fast=True)
+        self.assertFalse(log.fail_fast)
+        self.assertFalse(validator.validate_object(path))
+        self.assertEqual(log.num_errors, 1)
+        self.assertFalse(log.fail_fast)
@@ -0,0 +1,80 @@
+"""OCFLVersionFileSystem tests."""
+import os
+import tempfile
+import unittest
+
+from ocfl.object import Object, ObjectException
+from ocfl.version_fs import OCFLVersionFileSystem, open_logical
+from ocfl.version_metadata import VersionMetadata
+
+SPEC_EX_FULL = "extra_fixtures/1.0/good-storage-roots/simple-root/ark%3A%2F12345%2Fbcd987"
+
+
+class TestAll(unittest.TestCase):
+    """TestAll class to run tests."""
+
+    def test_init(self):
+        """Test initialization."""
+        vfs = OCFLVersionFileSystem(path=SPEC_EX_FULL)
+        self.assertEqual(vfs.version, "v3")
+        vfs = OCFLVersionFileSystem(obj=Object(path=SPEC_EX_FULL), version="v1")
+        self.assertEqual(vfs.version, "v1")
+        self.assertRaises(ObjectException, OCFLVersionFileSystem, path=SPEC_EX_FULL, version="v4")
+
+    def test_ls_info_find(self):
+        """Test ls, info and find methods."""
+        vfs = OCFLVersionFileSystem(path=SPEC_EX_FULL, version="v2")
+        self.assertEqual(vfs.ls("", detail=False), ["empty.txt", "empty2.txt", "foo"])
+        self.assertEqual(vfs.ls("ocfl:///foo/", detail=False), ["foo/bar.xml"])
+        self.assertEqual(vfs.ls("foo/bar.xml", detail=False), ["foo/bar.xml"])
+        self.assertRaises(FileNotFoundError, vfs.ls, "image.tiff")
+        info = vfs.info("foo/bar.xml")
+        self.assertEqual(info["type"], "file")
+        self.assertEqual(info["size"], 272)
+        self.assertEqual(info["content_path"], "v2/content/foo/bar.xml")
+        self.assertEqual(vfs.info("foo")["type"], "directory")
+        self.assertRaises(FileNotFoundError, vfs.info, "bar")
+        self.assertEqual(vfs.find(""), ["empty.txt", "empty2.txt", "foo/bar.xml"])
+        self.assertTrue(vfs.exists("foo"))
+        self.assertFalse(vfs.exists("image.tiff"))
+        self.assertTrue(vfs.isdir("foo"))
+        self.assertTrue(vfs.isfile("empty2.txt"))
+
+    def test_open(self):
+        """Test open via content path resolution."""
+        vfs = OCFLVersionFileSystem(path=SPEC_EX_FULL, version="v3")
+        # empty2.txt is stored in v1 as empty.txt
+        self.assertEqual(vfs.content_path("empty2.txt"), "v1/content/empty.txt")
+        self.assertEqual(vfs.cat_file("empty2.txt"), b"")
+        with vfs.open("foo/bar.xml", "r") as fh:
+            self.assertTrue(fh.read().startswith("<?xml"))
+        self.assertRaises(FileNotFoundError, vfs.open, "empty.txt")
+        self.assertRaises(NotImplementedError, vfs.open, "foo/bar.xml", "wb")
+
+    def test_open_logical(self):
+        """Test open_logical function and inventory caching."""
+        oo = Object(path=SPEC_EX_FULL)
+        with open_logical(oo, "foo/bar.xml", version="v1") as fh:
+            self.assertTrue(fh.read().startswith(b"<?xml"))
+        inv = oo.parse_inventory(use_cache=True)
+        self.assertIs(oo.parse_inventory(use_cache=True), inv)
+        self.assertIsNot(oo.parse_inventory(), inv)
+        with open_logical(oo, "empty2.txt") as fh:
+            self.assertEqual(fh.read(), b"")
+        self.assertIs(oo.parse_inventory(use_cache=True), inv)
+        self.assertRaises(ObjectException, open_logical, oo, "empty.txt")
+        self.assertRaises(ObjectException, open_logical, oo, "empty.txt", "v4")
+        # Cache is invalidated when the root inventory sidecar changes
+        tempdir = tempfile.mkdtemp(prefix="test_open_logical")
+        objdir = os.path.join(tempdir, "obj")
+        metadata = VersionMetadata(created="2026-01-01T00:00:00Z", message="A version",
+                                   name="A Person", address="mailto:a@example.org")
+        oo = Object(identifier="uri:open_logical")
+        oo.create(srcdir="extra_fixtures/content/dupe-files", metadata=metadata, objdir=objdir)
+        inv = oo.parse_inventory(use_cache=True)
+        self.assertIs(oo.parse_inventory(use_cache=True), inv)
+        oo.add_version_with_content(objdir=objdir, srcdir="extra_fixtures/content/dedupe_content/v2",
+                                    metadata=metadata)
+        with open_logical(oo, "empty4.txt", objdir=objdir) as fh:
+            self.assertEqual(fh.read(), b"")
+        self.assertEqual(oo.parse_inventory(use_cache=True).head, "v2")